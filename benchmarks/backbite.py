@@ -0,0 +1,45 @@
+# python -m benchmarks.backbite [--moves N] [--seed SEED]
+#
+# How long hamiltonian_path takes to build a path on big grids, and how many
+# backbite moves per second the Backbite strategy makes on it afterwards
+# (a move reverses the end of the path, so it gets slower as the path gets longer).
+
+import argparse
+import random
+import time
+
+from saw.construct import Backbite
+from saw.feasibility import random_start
+
+GRIDS = [(100, 100), (301, 301), (1000, 1000), (1001, 1001)]
+
+
+def measure(rows, cols, moves, seed):
+    rng = random.Random(seed)
+    walker = Backbite(rows, cols, random_start(rows, cols, rng), rng)
+
+    started = time.perf_counter()
+    walker.build()
+    build = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(moves):
+        walker.move()
+    seconds = time.perf_counter() - started
+    return build, moves / seconds, walker.accepted
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.backbite")
+    parser.add_argument("--moves", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    print("%-10s %10s %12s %9s" % ("grid", "build ms", "moves/s", "accepted"))
+    for rows, cols in GRIDS:
+        build, rate, accepted = measure(rows, cols, args.moves, args.seed)
+        print("%-10s %10.1f %12.0f %9d" % ("%dx%d" % (rows, cols), build * 1000, rate, accepted))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# python -m benchmarks.batch [--walks N] [--seed SEED]  (needs numpy)
+#
+# Walks per second of rosenbluth_walk (one walk at a time in python) against
+# sample_walks with and without perm, and the weighted mean squared end-to-end
+# distance each of them estimates (they should agree).
+
+import argparse
+import random
+import time
+
+from saw.batch import rosenbluth_walk, sample_walks, weighted_mean
+from saw.grid import DIRECTIONS
+
+STEPS = [10, 25, 50]
+
+
+def scalar(walks, steps, seed):
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    total, weighted = 0.0, 0.0
+    for _ in range(walks):
+        directions, weight = rosenbluth_walk(steps, rng)
+        if weight:
+            x = sum(DIRECTIONS[d][0] for d in directions)
+            y = sum(DIRECTIONS[d][1] for d in directions)
+            total += weight
+            weighted += weight * (x * x + y * y)
+    return walks / (time.perf_counter() - started), weighted / total
+
+
+def batch(walks, steps, seed, perm):
+    started = time.perf_counter()
+    sample = sample_walks(walks, steps, seed, perm)
+    rate = walks / (time.perf_counter() - started)
+    return rate, weighted_mean(sample.end_to_end(), sample.weights)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.batch")
+    parser.add_argument("--walks", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    print("%-6s %-12s %12s %10s" % ("steps", "sampler", "walks/s", "<R^2>"))
+    for steps in STEPS:
+        # the python loop gets a tenth of the walks, it would take too long otherwise
+        results = [
+            ("scalar", scalar(args.walks // 10, steps, args.seed)),
+            ("batch", batch(args.walks, steps, args.seed, False)),
+            ("batch+perm", batch(args.walks, steps, args.seed, True)),
+        ]
+        for name, (rate, r2) in results:
+            print("%-6d %-12s %12.0f %10.2f" % (steps, name, rate, r2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# python -m benchmarks.bidirectional [--grid ROWS COLS] [--pairs N] [--seed SEED] [--prune RULE ...]
+#                                    [--seeds N] [--max-backtracks N]
+#
+# Counts the paths between random (start, end) pairs of a grid (pairs that have a path, see
+# feasibility.has_path) twice: with one search from start that goes on after every path it finds
+# (like saw.enumeration), and with Bidirectional.count, which meets in the middle. The counts have
+# to be the same. It prints the nodes and seconds of both and how many keys the index had, then the
+# median nodes for finding one path over --seeds seeds (Walker.run with end against
+# Bidirectional.run), a Walker.run that hasn't found it after --max-backtracks counts as "-".
+
+import argparse
+import random
+import statistics
+import time
+
+from saw.bidirectional import Bidirectional
+from saw.feasibility import has_path
+from saw.solver import make_walker
+from saw.walker import PRUNING_RULES
+
+
+def one_sided(rows, cols, start, end, prune):
+    walker = make_walker(rows, cols, start, 1, "array", end=end, prune=prune)[0]
+    count = 0
+    while walker.run():
+        count += 1
+        if len(walker.state.path) == 1:
+            break
+        walker.state.pop()
+    return count, walker.nodes
+
+
+# the median nodes of finding one path with seeds 0 .. seeds - 1, inf if a search ran out of backtracks
+def find_one(rows, cols, start, end, prune, seeds, max_backtracks):
+    one, both = [], []
+    for seed in range(seeds):
+        walker = make_walker(rows, cols, start, seed, "array", end=end, prune=prune)[0]
+        one.append(walker.nodes if walker.run(max_backtracks) else float("inf"))
+        finder = Bidirectional(rows, cols, start, random.Random(seed), end, prune)
+        finder.run()
+        both.append(finder.nodes)
+    return statistics.median(one), statistics.median(both)
+
+
+def timed(function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bidirectional")
+    parser.add_argument("--grid", type=int, nargs=2, default=(5, 6), metavar=("ROWS", "COLS"))
+    parser.add_argument("--pairs", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--prune", nargs="+", choices=PRUNING_RULES, default=[], metavar="RULE")
+    parser.add_argument("--seeds", type=int, default=5, help="seeds for finding one path")
+    parser.add_argument("--max-backtracks", type=int, default=2000000, help="budget of the one-sided search")
+    args = parser.parse_args(argv)
+    rows, cols = args.grid
+
+    rng = random.Random(args.seed)
+    spots = [(x, y) for y in range(rows) for x in range(cols)]
+    pairs = []
+    while len(pairs) < args.pairs:
+        start, end = rng.sample(spots, 2)
+        if has_path(rows, cols, start, end):
+            pairs.append((start, end))
+
+    print("%dx%d, prune %s" % (rows, cols, " ".join(args.prune) or "-"))
+    print("%-16s %7s %10s %10s %8s %8s %8s %10s %10s" % (
+        "pair", "paths", "one nodes", "bi nodes", "one s", "bi s", "halves", "find one", "find bi"))
+    for start, end in pairs:
+        (count, nodes), seconds = timed(one_sided, rows, cols, start, end, args.prune)
+        both = Bidirectional(rows, cols, start, random.Random(1), end, args.prune)
+        both_count, both_seconds = timed(both.count)
+
+        one, bi = find_one(rows, cols, start, end, args.prune, args.seeds, args.max_backtracks)
+
+        print("%-16s %7d %10d %10d %8.2f %8.2f %8d %10s %10d%s" % (
+            "%s-%s" % ("%d,%d" % start, "%d,%d" % end), count, nodes, both.nodes, seconds, both_seconds,
+            both.halves, "-" if one == float("inf") else "%d" % one, bi,
+            "" if count == both_count else "  counts DIFFER"))
+
+
+if __name__ == "__main__":
+    main()
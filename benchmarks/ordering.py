@@ -0,0 +1,47 @@
+# python -m benchmarks.ordering [--seeds N] [--max-backtracks N]
+#
+# Random directions against warnsdorff (with 0, 1 and 2 moves of lookahead),
+# all of them with every pruning rule on. Every search gets the same seeds
+# (so the same starts) and gives up after --max-backtracks.
+
+import argparse
+import time
+
+from saw import make_walker
+from saw.walker import PRUNING_RULES, RANDOM, WARNSDORFF
+
+GRIDS = [(10, 10), (20, 20), (50, 50), (100, 100)]
+CONFIGS = [(RANDOM, 0), (WARNSDORFF, 0), (WARNSDORFF, 1), (WARNSDORFF, 2)]
+
+
+def measure(rows, cols, order, lookahead, seeds, max_backtracks):
+    solved, backtracks, times = 0, 0, []
+    for seed in range(seeds):
+        started = time.perf_counter()
+        walker = make_walker(rows, cols, seed=seed, prune=PRUNING_RULES, order=order, lookahead=lookahead)[0]
+        found = walker.run(max_backtracks)
+        times.append(time.perf_counter() - started)
+        solved += bool(found)
+        backtracks += walker.backtracks
+    times.sort()
+    return solved, backtracks, times[len(times) // 2], times[-1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.ordering")
+    parser.add_argument("--seeds", type=int, default=10)
+    parser.add_argument("--max-backtracks", type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    print("%-8s %-14s %7s %11s %10s %10s" % ("grid", "order", "solved", "backtracks", "median ms", "max ms"))
+    for rows, cols in GRIDS:
+        for order, lookahead in CONFIGS:
+            solved, backtracks, median, worst = measure(rows, cols, order, lookahead, args.seeds, args.max_backtracks)
+            name = order if order == RANDOM else "%s+%d" % (order, lookahead)
+            print("%-8s %-14s %4d/%-2d %11d %10.1f %10.1f" % (
+                "%dx%d" % (rows, cols), name, solved, args.seeds, backtracks, median * 1000, worst * 1000,
+            ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# python -m benchmarks.portfolio [--grid ROWS COLS] [--trials N] [--timeout SECONDS] [--restart-unit N]
+#
+# How many searches a portfolio finishes before the timeout with 1, 2, 4, ... workers
+# (up to the number of cores), with and without luby restarts. Every trial uses
+# another seed, the searches use random directions without pruning, so their
+# running time has the heavy tail that the portfolio is for.
+
+import argparse
+import os
+
+from saw.portfolio import portfolio
+
+
+def measure(rows, cols, workers, restart_unit, trials, timeout):
+    solved, times = 0, []
+    for seed in range(trials):
+        solution = portfolio(rows, cols, seed=seed, workers=workers, restart_unit=restart_unit, timeout=timeout)
+        if solution.path is not None:
+            solved += 1
+            times.append(solution.seconds)
+    times.sort()
+    return solved, times[len(times) // 2] if times else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.portfolio")
+    parser.add_argument("--grid", type=int, nargs=2, default=(7, 7), metavar=("ROWS", "COLS"))
+    parser.add_argument("--trials", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=2.0)
+    parser.add_argument("--restart-unit", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    cores = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cores:
+        counts.append(counts[-1] * 2)
+
+    rows, cols = args.grid
+    print("%dx%d, %d trials, %.1f s timeout, %d cores" % (rows, cols, args.trials, args.timeout, cores))
+    print("%-8s %-9s %7s %10s" % ("workers", "restarts", "solved", "median ms"))
+    for workers in counts:
+        for restart_unit in (None, args.restart_unit):
+            solved, median = measure(rows, cols, workers, restart_unit, args.trials, args.timeout)
+            print("%-8d %-9s %4d/%-2d %10s" % (
+                workers, "luby" if restart_unit else "-", solved, args.trials,
+                "-" if median is None else "%.1f" % (median * 1000),
+            ))
+
+
+if __name__ == "__main__":
+    main()
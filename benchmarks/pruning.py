@@ -0,0 +1,45 @@
+# python -m benchmarks.pruning [--seeds N] [--max-backtracks N]
+#
+# How much each pruning rule of the array strategy cuts the backtracks and the time
+# it takes to find a path. Every search gets the same seeds (so the same starts) and
+# gives up after --max-backtracks, the solved column is how many of them found a path.
+
+import argparse
+import time
+
+from saw import make_walker
+from saw.walker import PRUNING_RULES
+
+GRIDS = [(8, 8), (10, 10), (12, 12), (16, 16), (20, 20)]
+CONFIGS = [()] + [(rule,) for rule in PRUNING_RULES] + [PRUNING_RULES]
+
+
+def measure(rows, cols, prune, seeds, max_backtracks):
+    solved, backtracks, seconds = 0, 0, 0.0
+    for seed in range(seeds):
+        walker = make_walker(rows, cols, seed=seed, prune=prune)[0]
+        started = time.perf_counter()
+        found = walker.run(max_backtracks)
+        seconds += time.perf_counter() - started
+        solved += bool(found)
+        backtracks += walker.backtracks
+    return solved, backtracks, seconds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.pruning")
+    parser.add_argument("--seeds", type=int, default=10)
+    parser.add_argument("--max-backtracks", type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    print("%-6s %-34s %7s %11s %9s" % ("grid", "prune", "solved", "backtracks", "seconds"))
+    for rows, cols in GRIDS:
+        for prune in CONFIGS:
+            solved, backtracks, seconds = measure(rows, cols, prune, args.seeds, args.max_backtracks)
+            print("%-6s %-34s %4d/%-2d %11d %9.2f" % (
+                "%dx%d" % (rows, cols), ", ".join(prune) or "none", solved, args.seeds, backtracks, seconds,
+            ))
+
+
+if __name__ == "__main__":
+    main()
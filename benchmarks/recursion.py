@@ -0,0 +1,44 @@
+# python -m benchmarks.recursion [--seeds N]
+#
+# Nodes per second of the recursive V3 search against its iterative version.
+# Both get the same seeds, so they do exactly the same search.
+
+import argparse
+import time
+
+from saw import solve
+
+GRIDS = [(4, 4), (5, 5), (6, 6)]
+
+
+def measure(rows, cols, strategy, seeds):
+    nodes, seconds = 0, 0.0
+    for seed in range(seeds):
+        started = time.perf_counter()
+        solution = solve(rows, cols, seed=seed, strategy=strategy)
+        seconds += time.perf_counter() - started
+        nodes += solution.nodes
+    return nodes, seconds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.recursion")
+    parser.add_argument("--seeds", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    print("%-6s %12s %14s %14s %8s" % ("grid", "nodes", "recursive n/s", "iterative n/s", "speedup"))
+    for rows, cols in GRIDS:
+        nodes, recursive_seconds = measure(rows, cols, "recursive", args.seeds)
+        iterative_nodes, iterative_seconds = measure(rows, cols, "iterative", args.seeds)
+        assert nodes == iterative_nodes
+        print("%-6s %12d %14.0f %14.0f %7.2fx" % (
+            "%dx%d" % (rows, cols),
+            nodes,
+            nodes / recursive_seconds,
+            nodes / iterative_seconds,
+            recursive_seconds / iterative_seconds,
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+# python -m benchmarks.strategies [--strategies NAME ...] [--grids SIZE ...] [--seeds N] [--timeout SECONDS]
+#                                 [--output FILE]
+# python -m benchmarks.strategies --compare OLD NEW [--threshold FRACTION]
+#
+# Runs the strategies headless (no pygame, no clock.tick) on every grid with the seeds 0 .. N - 1
+# (the seed chooses the start and the directions, so a run gives the same searches every time)
+# and writes the results as JSON, to stdout or to --output.
+#
+# A search is stopped after --timeout seconds (with SIGALRM, so it only works on unix), it then
+# counts as not solved. For every strategy and grid the JSON has
+#   - solved -> how many of the seeds found a path
+#   - seconds -> median, p95 and max of the time to a path, over all seeds. A search that was
+#                stopped took longer than any search that finished, so a value that falls on one of
+#                them is null (it is only known to be more than the timeout)
+#   - nodes_per_second -> spots added to the path per second, over the searches that finished
+#   - backtracks -> median and max of the searches that finished
+#   - peak_bytes -> the most memory (tracemalloc) a search that finished used, it is measured by
+#                   running it again with the same seed, because tracemalloc slows it down a lot
+#   - trials -> seed, start, solved, seconds, nodes, backtracks and peak_bytes of every search
+# When a strategy solves none of the seeds of a grid, the bigger grids are skipped for it.
+#
+# --compare reads two of those files and prints the median and p95 of every strategy and grid
+# that is in both. It flags a regression when one of them is more than --threshold slower
+# (times below --min-seconds are too noisy and are ignored) or fewer seeds were solved,
+# and returns 1 if there is one.
+
+import argparse
+import json
+import math
+import platform
+import signal
+import sys
+import time
+import tracemalloc
+
+from saw import make_walker
+from saw.solver import STRATEGIES
+
+GRIDS = [(4, 4), (5, 5), (6, 6), (8, 8), (10, 10), (12, 12), (16, 16), (20, 20), (25, 25), (30, 30)]
+DEFAULT_STRATEGIES = ["basic", "spot", "recursive"]
+
+
+class Timeout(Exception):
+    pass
+
+
+def alarm(signum, frame):
+    raise Timeout()
+
+
+def trial(rows, cols, strategy, seed, timeout):
+    walker, start = make_walker(rows, cols, seed=seed, strategy=strategy)
+    result = {"seed": seed, "start": list(start), "solved": False, "seconds": None,
+              "nodes": None, "backtracks": None, "peak_bytes": None}
+
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    started = time.perf_counter()
+    try:
+        found = walker.run()
+        seconds = time.perf_counter() - started
+    except (Timeout, RecursionError):
+        return result
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+    if found:
+        result.update(solved=True, seconds=seconds, nodes=walker.nodes, backtracks=walker.backtracks)
+        result["peak_bytes"] = peak_bytes(rows, cols, strategy, seed)
+    return result
+
+
+# the same search again (the same seed makes the same choices), with tracemalloc
+def peak_bytes(rows, cols, strategy, seed):
+    tracemalloc.start()
+    try:
+        make_walker(rows, cols, seed=seed, strategy=strategy)[0].run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+# the nearest-rank quantile, None if it is a search that didn't finish
+def quantile(values, q):
+    ordered = sorted(values, key=lambda value: float("inf") if value is None else value)
+    return ordered[max(0, math.ceil(len(ordered) * q) - 1)]
+
+
+def summary(trials):
+    done = [t for t in trials if t["solved"]]
+    seconds = [t["seconds"] for t in trials]
+    backtracks = [t["backtracks"] for t in done]
+    done_seconds = sum(t["seconds"] for t in done)
+    return {
+        "solved": len(done),
+        "seconds": {"median": quantile(seconds, 0.5), "p95": quantile(seconds, 0.95), "max": quantile(seconds, 1)},
+        "nodes_per_second": sum(t["nodes"] for t in done) / done_seconds if done_seconds else None,
+        "backtracks": {"median": quantile(backtracks, 0.5), "max": max(backtracks)} if done else None,
+        "peak_bytes": max(t["peak_bytes"] for t in done) if done else None,
+    }
+
+
+def run(strategies, grids, seeds, timeout):
+    signal.signal(signal.SIGALRM, alarm)
+    results = []
+    for strategy in strategies:
+        for rows, cols in grids:
+            trials = [trial(rows, cols, strategy, seed, timeout) for seed in range(seeds)]
+            result = {"strategy": strategy, "rows": rows, "cols": cols}
+            result.update(summary(trials))
+            result["trials"] = trials
+            results.append(result)
+            print("%-10s %-6s %3d/%-3d solved" % (strategy, "%dx%d" % (rows, cols), result["solved"], seeds),
+                  file=sys.stderr)
+            if not result["solved"]:
+                break
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seeds": seeds,
+        "timeout": timeout,
+        "results": results,
+    }
+
+
+def compare(old, new, threshold, min_seconds):
+    before = {(r["strategy"], r["rows"], r["cols"]): r for r in old["results"]}
+    regressions = 0
+    print("%-10s %-6s %-7s %12s %12s %8s  %s" % ("strategy", "grid", "", "old ms", "new ms", "change", ""))
+    for result in new["results"]:
+        key = (result["strategy"], result["rows"], result["cols"])
+        if key not in before:
+            continue
+        previous = before[key]
+        grid = "%dx%d" % (result["rows"], result["cols"])
+
+        if result["solved"] < previous["solved"]:
+            regressions += 1
+            print("%-10s %-6s %-7s %12d %12d %8s  REGRESSION" % (
+                result["strategy"], grid, "solved", previous["solved"], result["solved"], ""))
+        for name in ("median", "p95"):
+            a, b = previous["seconds"][name], result["seconds"][name]
+            flag = ""
+            if a is not None and b is None:
+                flag = "REGRESSION"
+            elif a is not None and b is not None and max(a, b) >= min_seconds and b > a * (1 + threshold):
+                flag = "REGRESSION"
+            regressions += bool(flag)
+            change = "%+.0f%%" % ((b / a - 1) * 100) if a and b is not None else "-"
+            print("%-10s %-6s %-7s %12s %12s %8s  %s" % (
+                result["strategy"], grid, name, milliseconds(a), milliseconds(b), change, flag))
+    print("%d regression%s" % (regressions, "" if regressions == 1 else "s"))
+    return 1 if regressions else 0
+
+
+def milliseconds(seconds):
+    return "timeout" if seconds is None else "%.2f" % (seconds * 1000)
+
+
+def grid_size(text):
+    rows, _, cols = text.partition("x")
+    return int(rows), int(cols or rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.strategies")
+    parser.add_argument("--strategies", nargs="+", choices=sorted(STRATEGIES), default=DEFAULT_STRATEGIES,
+                        metavar="NAME")
+    parser.add_argument("--grids", nargs="+", type=grid_size, default=GRIDS, metavar="SIZE",
+                        help="ROWSxCOLS or N for N x N")
+    parser.add_argument("--seeds", type=int, default=20)
+    parser.add_argument("--timeout", type=float, default=1.0, help="seconds before a search is stopped")
+    parser.add_argument("--output", help="write the JSON to this file instead of stdout")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files")
+    parser.add_argument("--threshold", type=float, default=0.2, help="slowdown that counts as a regression")
+    parser.add_argument("--min-seconds", type=float, default=0.001)
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0]) as file:
+            old = json.load(file)
+        with open(args.compare[1]) as file:
+            new = json.load(file)
+        return compare(old, new, args.threshold, args.min_seconds)
+
+    text = json.dumps(run(args.strategies, args.grids, args.seeds, args.timeout))
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+# python -m benchmarks.symmetry [--grid ROWS COLS] [--prune RULE ...]
+#
+# Counts the paths from every start of a grid twice: by searching every path from every start,
+# and with symmetry.count_every_start, which only searches one start of each group of turned and
+# mirrored starts and only the smallest path of each group of turned and mirrored paths.
+# The counts have to be the same, a square grid has 8 symmetries, so the second one should be
+# close to 8 times faster (4 on other rectangles).
+
+import argparse
+import time
+
+from saw.enumeration import paths
+from saw.feasibility import valid_starts
+from saw.symmetry import count_every_start, symmetries
+from saw.walker import PRUNING_RULES
+
+
+def every_start(rows, cols, options):
+    return {start: sum(1 for _ in paths(rows, cols, start, **options)) for start in valid_starts(rows, cols)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.symmetry")
+    parser.add_argument("--grid", type=int, nargs=2, default=(5, 5), metavar=("ROWS", "COLS"))
+    parser.add_argument("--prune", nargs="+", choices=PRUNING_RULES, default=["dead-end"], metavar="RULE")
+    args = parser.parse_args(argv)
+    rows, cols = args.grid
+    options = {"prune": args.prune}
+
+    started = time.perf_counter()
+    full = every_start(rows, cols, options)
+    full_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    symmetric = count_every_start(rows, cols, **options)
+    symmetric_seconds = time.perf_counter() - started
+
+    print("%dx%d, %d symmetries, %d starts, %d paths" % (
+        rows, cols, len(symmetries(rows, cols)), len(full), sum(full.values())))
+    print("%-10s %10s" % ("sweep", "seconds"))
+    print("%-10s %10.2f" % ("every", full_seconds))
+    print("%-10s %10.2f" % ("symmetric", symmetric_seconds))
+    print("speedup %.1fx, counts %s" % (full_seconds / symmetric_seconds, "match" if full == symmetric else "DIFFER"))
+
+
+if __name__ == "__main__":
+    main()
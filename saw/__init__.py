@@ -0,0 +1,23 @@
+# saw - the self-avoiding walk engine without pygame
+#
+#   from saw import solve
+#   solution = solve(5, 5, seed=1)
+#   solution.path -> [(grid_x, grid_y), ...]
+
+from .construct import hamiltonian_path
+from .feasibility import has_path, valid_starts
+from .grid import DIRECTIONS, find_valid_starting_spot_position, is_impossible
+from .solver import STRATEGIES, Solution, make_walker, solve
+
+__all__ = [
+    "DIRECTIONS",
+    "STRATEGIES",
+    "Solution",
+    "find_valid_starting_spot_position",
+    "hamiltonian_path",
+    "has_path",
+    "is_impossible",
+    "make_walker",
+    "solve",
+    "valid_starts",
+]
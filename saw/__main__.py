@@ -0,0 +1,105 @@
+# python -m saw ROWS COLS [--start X Y] [--end X Y] [--seed SEED] [--strategy NAME] [--output FILE]
+#                [--view] [--fast] [--fps FPS]
+#                [--prune RULE ...] [--order ORDER] [--lookahead DEPTH] [--moves N]
+#                [--lattice KIND] [--obstacle X Y ...]
+#                [--workers N] [--restart-unit BACKTRACKS] [--timeout SECONDS] [--cache DIR]
+#                [--record FILE]
+#
+# Runs a search headless at full speed and writes the path and its timing as JSON,
+# to stdout or to --output. --view opens the pygame viewer instead (needs pygame), with --fast the
+# search runs at full speed and the window is drawn --fps times a second. With --cache the path
+# is taken from (or added to) the path files of a cache.SolutionCache in DIR. With --record every
+# push and pop of the search is written to a trace (see trace.py), python -m saw.trace FILE --view replays it.
+
+import argparse
+import json
+import sys
+
+from .lattice import GRID_LATTICES
+from .solver import STRATEGIES, solve
+from .walker import MOVE_ORDERS, PRUNING_RULES
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m saw", description="Find a self-avoiding path that fills a grid.")
+    parser.add_argument("rows", type=int)
+    parser.add_argument("cols", type=int)
+    parser.add_argument("--start", type=int, nargs=2, metavar=("X", "Y"), help="position of the first spot (random if omitted)")
+    parser.add_argument("--end", type=int, nargs=2, metavar=("X", "Y"), help="position of the last spot (array strategy)")
+    parser.add_argument("--seed", type=int, help="seed for the start and the random directions")
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="array")
+    parser.add_argument("--prune", nargs="+", choices=PRUNING_RULES, default=[], metavar="RULE",
+                        help="pruning rules for the array strategy: %s" % ", ".join(PRUNING_RULES))
+    parser.add_argument("--order", choices=MOVE_ORDERS, help="how the array strategy chooses the next direction")
+    parser.add_argument("--lookahead", type=int, help="how many moves warnsdorff looks ahead to break ties")
+    parser.add_argument("--moves", type=int, help="how many backbite moves the backbite strategy makes")
+    parser.add_argument("--lattice", choices=GRID_LATTICES, help="the lattice of the lattice strategy (square by default)")
+    parser.add_argument("--obstacle", type=int, nargs=2, action="append", default=[], metavar=("X", "Y"),
+                        help="a blocked cell of the lattice strategy, can be given many times")
+    parser.add_argument("--workers", type=int, help="run this many searches with different seeds in parallel")
+    parser.add_argument("--restart-unit", type=int, metavar="BACKTRACKS",
+                        help="restart a search after this many backtracks times the luby sequence")
+    parser.add_argument("--timeout", type=float, metavar="SECONDS", help="stop the parallel searches after this long")
+    parser.add_argument("--cache", metavar="DIR", help="keep the paths in this directory and reuse them")
+    parser.add_argument("--record", metavar="FILE", help="write every step of the search to this trace")
+    parser.add_argument("--output", help="write the JSON result to this file instead of stdout")
+    parser.add_argument("--view", action="store_true", help="show the search in a pygame window")
+    parser.add_argument("--fast", action="store_true", help="don't slow the search down to one step per frame")
+    parser.add_argument("--fps", type=int, help="frames per second of the window (10, or 30 with --fast)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    options = {}
+    if args.prune:
+        options["prune"] = args.prune
+    if args.order:
+        options["order"] = args.order
+    if args.lookahead:
+        options["lookahead"] = args.lookahead
+    if args.end:
+        options["end"] = args.end
+    if args.moves:
+        options["moves"] = args.moves
+    if args.lattice:
+        options["kind"] = args.lattice
+    if args.obstacle:
+        options["obstacles"] = [tuple(obstacle) for obstacle in args.obstacle]
+
+    try:
+        if args.view:
+            from .viewer import view
+            fps = args.fps or (30 if args.fast else 10)
+            view(args.rows, args.cols, args.start, args.seed, args.strategy, fps=fps, fast=args.fast, **options)
+            return 0
+        if args.workers or args.restart_unit or args.timeout:
+            from .portfolio import portfolio
+            solution = portfolio(args.rows, args.cols, args.start, args.seed, args.strategy, args.workers,
+                                 args.restart_unit, args.timeout, **options)
+        elif args.record:
+            from .trace import solve as record_solve
+            solution = record_solve(args.record, args.rows, args.cols, args.start, args.seed, args.strategy, **options)
+        elif args.cache:
+            from .cache import SolutionCache
+            end = options.pop("end", None)
+            solution = SolutionCache(directory=args.cache).solve(args.rows, args.cols, args.start, args.seed,
+                                                                 args.strategy, end, **options)
+        else:
+            solution = solve(args.rows, args.cols, args.start, args.seed, args.strategy, **options)
+    except ValueError as error:
+        print("error: %s" % error, file=sys.stderr)
+        return 2
+
+    text = json.dumps(solution.as_dict())
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+    return 0 if solution.path is not None else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+# sample_walks(count, steps, seed=None, perm=False) - lots of short self-avoiding walks at once (needs numpy)
+#
+# The scripts grow one walk at a time in python. Here thousands of walks of `steps` steps on the
+# whole lattice grow together, each step of every walk is done by the same few numpy operations:
+#   - occupied[walk] is a (2 * steps + 1) x (2 * steps + 1) box around the first spot of the walk
+#     (flattened), a walk can't leave it, so checking a spot is looking up a bool
+#   - free[walk, d] is True if direction d of DIRECTIONS goes to a spot that is not taken,
+#     a walk chooses one of its free directions randomly (the first one whose running count of
+#     free directions is bigger than a random number below the number of free directions)
+#
+# Choosing only from the free directions doesn't give every walk the same chance, the walks that
+# are crowded by themselves are chosen too often, and a walk that gets stuck (no free direction)
+# before `steps` is lost. Rosenbluth weights correct that: every step multiplies the weight of a
+# walk by the fraction of its directions that were free (out of 4 for the first step and 3 after
+# it, the one it came from is never free), and a stuck walk gets weight 0. Averages over the walks
+# have to be weighted (weighted_mean), then they are the averages over all self-avoiding walks.
+#
+# With perm=True (pruned-enriched Rosenbluth) the walks with a weight far above the average
+# weight of that step (more than upper times it) are copied, both copies get half of the weight,
+# and half of the walks with a weight far below it (less than lower times it) are dropped, the
+# other half get twice the weight. The weights stay correct on average, but fewer walks are spent
+# on paths that hardly count. A copy goes into the row of a walk that has been dropped, so there
+# are never more walks at once than twice the walks that were started.
+#
+# memory is how many bytes the boxes can use, if count walks need more they are grown in batches.
+#
+# sample_walks returns a Walks with one row per walk that made all `steps` steps
+#   - directions -> (walks, steps) array of indices into DIRECTIONS (int8)
+#   - weights -> (walks,) array of their weights
+#   - started -> how many walks were started, weights.sum() / started is about the fraction of the
+#                4 * 3 ** (steps - 1) walks that don't go back that are self-avoiding
+#   - walks.end_to_end() -> the squared distance between the first and the last spot of each walk
+#
+# rosenbluth_walk(steps, rng) is the same with one walk in plain python (a set of spots), to
+# compare with (see benchmarks/batch.py).
+
+import numpy as np
+
+from .grid import DIRECTIONS
+
+DX = np.array([dx for dx, dy in DIRECTIONS])
+DY = np.array([dy for dx, dy in DIRECTIONS])
+
+
+class Walks:
+    def __init__(self, directions, weights, started):
+        self.directions = directions
+        self.weights = weights
+        self.started = started
+
+    def end_to_end(self):
+        dx = DX[self.directions].sum(axis=1)
+        dy = DY[self.directions].sum(axis=1)
+        return dx * dx + dy * dy
+
+
+def weighted_mean(values, weights):
+    return float((values * weights).sum() / weights.sum())
+
+
+def sample_walks(count, steps, seed=None, perm=False, upper=3.0, lower=0.3, memory=1 << 26):
+    if count < 1 or steps < 1:
+        raise ValueError("count and steps have to be at least 1")
+    if perm and not 0 < lower < 1 < upper:
+        raise ValueError("lower has to be between 0 and 1 and upper bigger than 1")
+    rng = np.random.default_rng(seed)
+
+    # as many walks at once as fit into memory bytes of boxes
+    box = (2 * steps + 1) ** 2
+    batch = max(1, min(count, memory // (box * (2 if perm else 1))))
+
+    directions, weights, started = [], [], 0
+    while started < count:
+        size = min(batch, count - started)
+        d, w = grow(size, steps, rng, perm, upper, lower)
+        directions.append(d)
+        weights.append(w)
+        started += size
+    return Walks(np.concatenate(directions), np.concatenate(weights), started)
+
+
+# grows size walks together, returns the directions and weights of the ones that made every step
+def grow(size, steps, rng, perm, upper, lower):
+    width = 2 * steps + 1
+    offsets = DY * width + DX
+    rows = 2 * size if perm else size
+
+    box = width * width
+    occupied = np.zeros((rows, box), dtype=bool)
+    flat = occupied.reshape(-1)
+    position = np.full(rows, steps * width + steps)
+    directions = np.zeros((rows, steps), dtype=np.int8)
+    weights = np.zeros(rows)
+    alive = np.zeros(rows, dtype=bool)
+    occupied[:size, steps * width + steps] = True
+    weights[:size] = 1
+    alive[:size] = True
+
+    for step in range(steps):
+        walks = np.flatnonzero(alive)
+        if not len(walks):
+            break
+        neighbours = position[walks, None] + offsets
+        free = ~flat[(walks * box)[:, None] + neighbours]
+        counts = free.sum(axis=1)
+
+        # choose the r-th free direction of each walk
+        r = (rng.random(len(walks)) * counts).astype(np.int64)
+        d = (free.cumsum(axis=1) > r[:, None]).argmax(axis=1)
+        position[walks] = neighbours[np.arange(len(walks)), d]
+        flat[walks * box + position[walks]] = True
+        directions[walks, step] = d
+        weights[walks] *= counts / (4 if step == 0 else 3)
+
+        stuck = walks[counts == 0]
+        alive[stuck] = False
+        weights[stuck] = 0
+
+        if perm:
+            enrich(occupied, position, directions, weights, alive, size, rng, upper, lower)
+
+    return directions[alive], weights[alive]
+
+
+def enrich(occupied, position, directions, weights, alive, size, rng, upper, lower):
+    walks = np.flatnonzero(alive)
+    if not len(walks):
+        return
+    average = weights[walks].sum() / size
+
+    low = walks[weights[walks] < lower * average]
+    dropped = low[rng.random(len(low)) < 0.5]
+    alive[dropped] = False
+    weights[dropped] = 0
+    weights[np.setdiff1d(low, dropped)] *= 2
+
+    high = walks[weights[walks] > upper * average]
+    empty = np.flatnonzero(~alive)
+    high = high[:len(empty)]
+    copies = empty[:len(high)]
+    weights[high] /= 2
+    occupied[copies] = occupied[high]
+    position[copies] = position[high]
+    directions[copies] = directions[high]
+    weights[copies] = weights[high]
+    alive[copies] = True
+
+
+def rosenbluth_walk(steps, rng):
+    x, y = 0, 0
+    taken = {(x, y)}
+    directions, weight = [], 1.0
+    for step in range(steps):
+        free = [d for d, (dx, dy) in enumerate(DIRECTIONS) if (x + dx, y + dy) not in taken]
+        if not free:
+            return directions, 0.0
+        weight *= len(free) / (4 if step == 0 else 3)
+        d = rng.choice(free)
+        x, y = x + DIRECTIONS[d][0], y + DIRECTIONS[d][1]
+        taken.add((x, y))
+        directions.append(d)
+    return directions, weight
@@ -0,0 +1,184 @@
+# SolutionCache(capacity=1024, directory=None, max_bytes=None) - paths that have been found before
+#
+#   cache = SolutionCache(directory="paths")
+#   solution = cache.solve(20, 20, (3, 4))
+#
+# The same grid and start always have a path (any one of them will do), so after the first search
+# the path is kept and the next request for it doesn't search at all. A start turned or mirrored
+# (see symmetry.py) is the same request turned or mirrored, so the cache keeps the path of the
+# canonical start (the smallest of the images of start and end) and turns or mirrors it back.
+#
+#   - in memory -> the last `capacity` canonical requests that were used, with the path as cell ids
+#                  and the images of it that have been asked for (so a hit is a dict lookup)
+#   - on disk -> with a directory, every path is also a path file there (see pathfile.py), a request
+#                that isn't in memory anymore (or was found by an earlier run) is read from it. With
+#                max_bytes, the files that were used least recently are deleted when the directory
+#                gets bigger than that
+#
+# 1. cache.solve(rows, cols, start=None, seed=None, strategy="array", end=None, **options)
+#   - the same as solver.solve, but a Solution from the cache has nodes = backtracks = 0 and seconds
+#     is how long the lookup took. seed, strategy and options are only used when it has to search
+#     (the canonical start is searched, so the path is not the one solve would find with that seed)
+#
+# 2. cache.stats() -> hits (from memory), disk_hits, misses (searches), evictions (from memory)
+#    and disk_evictions (files deleted), and how many paths are in memory
+
+import os
+import random
+import time
+from collections import OrderedDict
+
+from .feasibility import has_path, random_start
+from .pathfile import PathReader, PathWriter
+from .solver import Solution, solve
+from .symmetry import apply, canonical_start, inverse, permutation
+
+
+class SolutionCache:
+    def __init__(self, capacity=1024, directory=None, max_bytes=None):
+        if capacity < 1:
+            raise ValueError("the cache needs room for at least one path")
+        if max_bytes is not None and directory is None:
+            raise ValueError("max_bytes only limits the directory of the cache")
+        self.capacity = capacity
+        self.directory = directory
+        self.max_bytes = max_bytes
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+        # (rows, cols, start cell, end cell or -1) of the canonical request -> Entry
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+
+    def solve(self, rows, cols, start=None, seed=None, strategy="array", end=None, **options):
+        started = time.perf_counter()
+        if strategy == "lattice":
+            raise ValueError("the cache only keeps paths that fill the grid, not paths of the lattice strategy")
+        end = None if end is None else tuple(end)
+        # start and end are checked before they are turned, solve gives the error (with the spots
+        # that were asked for) and nothing is counted
+        if rows < 1 or cols < 1 or (end is not None and not (0 <= end[0] < cols and 0 <= end[1] < rows)):
+            return solve(rows, cols, start, seed, strategy, end=end, **options)
+        if start is None:
+            start = random_start(rows, cols, random.Random(seed), end)
+        start = tuple(start)
+        if not (0 <= start[0] < cols and 0 <= start[1] < rows) or not has_path(rows, cols, start, end):
+            return solve(rows, cols, start, seed, strategy, end=end, **options)
+
+        canonical, to_canonical = canonical_start(rows, cols, start, end)
+        canonical_end = None if end is None else apply(to_canonical, end, rows, cols)
+        key = (rows, cols, canonical[1] * cols + canonical[0],
+               -1 if end is None else canonical_end[1] * cols + canonical_end[0])
+
+        nodes = backtracks = 0
+        pruned = None
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+        else:
+            entry = self.load(key)
+            if entry is not None:
+                self.disk_hits += 1
+            else:
+                if end is not None:
+                    options["end"] = canonical_end
+                # it raises ValueError for an unknown strategy or option before it searches
+                solution = solve(rows, cols, canonical, seed, strategy, **options)
+                self.misses += 1
+                if solution.path is None:
+                    solution.start, solution.end = start, end
+                    return solution
+                entry = Entry(rows, cols, [y * cols + x for x, y in solution.path])
+                nodes, backtracks, pruned = solution.nodes, solution.backtracks, solution.pruned
+                self.store(key, entry)
+            self.add(key, entry)
+
+        path = entry.image(inverse(to_canonical))
+        seconds = time.perf_counter() - started
+        return Solution(rows, cols, start, seed, strategy, path, nodes, backtracks, seconds, pruned, end)
+
+    def add(self, key, entry):
+        self.entries[key] = entry
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def filename(self, key):
+        rows, cols, start, end = key
+        return os.path.join(self.directory, "%dx%d-%d-%s.saw" % (rows, cols, start, "any" if end < 0 else end))
+
+    def load(self, key):
+        if self.directory is None:
+            return None
+        name = self.filename(key)
+        try:
+            with PathReader(name) as reader:
+                path = reader[0] if len(reader) else None
+        except (OSError, ValueError):
+            return None
+        if path is None:
+            return None
+        # it has been used, so it is the last one to be deleted
+        os.utime(name)
+        rows, cols = key[0], key[1]
+        return Entry(rows, cols, [y * cols + x for x, y in path])
+
+    # writes the path to a temporary file first, so a file in the directory is always complete
+    def store(self, key, entry):
+        if self.directory is None:
+            return
+        name = self.filename(key)
+        rows, cols = key[0], key[1]
+        with PathWriter(name + ".tmp", rows, cols) as writer:
+            writer.write(entry.image((False, False, False)))
+        os.replace(name + ".tmp", name)
+        if self.max_bytes is not None:
+            self.evict_files()
+
+    def evict_files(self):
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(".saw"):
+                info = entry.stat()
+                files.append((info.st_mtime, info.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        files.sort()
+        for _, size, path in files:
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            self.disk_evictions += 1
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "disk_evictions": self.disk_evictions,
+            "size": len(self.entries),
+        }
+
+
+# a canonical path (as cell ids) and its images as lists of (grid_x, grid_y), by symmetry
+class Entry:
+    def __init__(self, rows, cols, cells):
+        self.rows = rows
+        self.cols = cols
+        self.cells = cells
+        self.images = {}
+
+    def image(self, symmetry):
+        path = self.images.get(symmetry)
+        if path is None:
+            cols = self.cols
+            images = permutation(symmetry, self.rows, cols)
+            path = tuple((cell % cols, cell // cols) for cell in map(images.__getitem__, self.cells))
+            self.images[symmetry] = path
+        return list(path)
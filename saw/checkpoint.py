@@ -0,0 +1,238 @@
+# Checkpoints - a search of the array strategy saved to a file, so it can go on after the process stops
+#
+# Everything the search still has to do is in the walker: the path, the options (the directions
+# that haven't been tried yet) of every spot on it and the state of its rng, which decides every
+# choice after that. The rest of the state (the free neighbour counts) follows from the path, so a
+# walker made again with the same options, the same spots pushed, the same options of the spots and
+# the same rng state makes exactly the same choices as the one that was saved.
+#
+# File (a few KB, the rng state is most of it)
+#   - MAGIC (4 bytes), VERSION (1 byte), 3 bytes of padding, length of the JSON (uint32, little endian)
+#   - JSON -> rows, cols, the options of the walker, nodes, backtracks, pruned, found (paths found so
+#             far when it enumerates), seconds (searched so far), the length of the path and the
+#             version and gauss_next of the rng state
+#   - the path (int32), the options of its spots (1 byte each), equal of the symmetries (int32) and
+#     the 624 words and the index of the rng state (uint32), all little endian
+# It is written to FILE.tmp and then renamed to FILE, so FILE is always a whole checkpoint, even if
+# the process is killed while writing it.
+#
+# 1. save(walker, name, found=0, seconds=0.0) and load(name) -> (walker, found, seconds)
+#
+# 2. run(walker, name, every_backtracks=None, every_seconds=None, enumerate=False, found=0, seconds=0.0,
+#        every_steps=None)
+#   - runs the search and saves a checkpoint every_steps steps (nodes, spots added to the path),
+#     every_backtracks backtracks and/or every_seconds seconds, returns (result, found, seconds):
+#     result is what walker.run() returns, with enumerate=True it goes on through every path (until
+#     result is False) and found counts them
+#   - the walker runs POLL nodes or POLL backtracks at a time (walker.run(max_backtracks, max_nodes)),
+#     so the clock is read that often even if the search never backtracks
+#
+# python -m saw.checkpoint ROWS COLS FILE [--start X Y] [--end X Y] [--seed SEED] [--prune RULE ...]
+#                          [--order ORDER] [--every-seconds S] [--every-steps N] [--every-backtracks N]
+#                          [--enumerate]
+#   - if FILE exists the search goes on from it, otherwise a new one starts. It prints the Solution
+#     as JSON like python -m saw (or {"paths": count} with --enumerate) and deletes FILE at the end
+
+import argparse
+import json
+import os
+import random
+import struct
+import sys
+import time
+from array import array
+
+from .solver import Solution, make_walker
+from .walker import MOVE_ORDERS, PRUNING_RULES, SYMMETRY, Walker
+
+MAGIC = b"SAWC"
+VERSION = 1
+HEADER = struct.Struct("<4sB3xI")
+POLL = 1000
+
+
+def little_endian(values):
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def from_little_endian(typecode, data):
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def save(walker, name, found=0, seconds=0.0):
+    state = walker.state
+    version, words, gauss_next = walker.rng.getstate()
+    config = {
+        "rows": walker.rows,
+        "cols": walker.cols,
+        "prune": [rule for rule in walker.prune if rule != SYMMETRY],
+        "order": walker.order,
+        "lookahead": walker.lookahead,
+        "end": None if walker.end < 0 else state.position(walker.end),
+        "symmetries": [list(image) for image in walker.symmetries],
+        "nodes": walker.nodes,
+        "backtracks": walker.backtracks,
+        "pruned": walker.pruned,
+        "found": found,
+        "seconds": seconds,
+        "path": len(state.path),
+        "rng_version": version,
+        "gauss_next": gauss_next,
+    }
+    text = json.dumps(config).encode()
+    with open(name + ".tmp", "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(text)))
+        file.write(text)
+        file.write(little_endian(state.path))
+        file.write(bytes(state.options[cell] for cell in state.path))
+        file.write(little_endian(array("i", walker.equal)))
+        file.write(little_endian(array("I", words)))
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(name + ".tmp", name)
+
+
+def load(name):
+    with open(name, "rb") as file:
+        data = file.read()
+    if len(data) < HEADER.size:
+        raise ValueError("%s is too short to be a checkpoint" % name)
+    magic, version, length = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("%s is not a checkpoint" % name)
+    if version != VERSION:
+        raise ValueError("%s has version %d, only version %d can be read" % (name, version, VERSION))
+    offset = HEADER.size
+    config = json.loads(data[offset:offset + length])
+    offset += length
+
+    size = config["path"]
+    path = from_little_endian("i", data[offset:offset + 4 * size])
+    offset += 4 * size
+    options = data[offset:offset + size]
+    offset += size
+    count = len(config["symmetries"])
+    equal = from_little_endian("i", data[offset:offset + 4 * count])
+    offset += 4 * count
+    words = from_little_endian("I", data[offset:])
+    if len(path) != size or len(options) != size or len(equal) != count or len(words) != 625:
+        raise ValueError("%s is not a whole checkpoint" % name)
+
+    rows, cols = config["rows"], config["cols"]
+    rng = random.Random()
+    rng.setstate((config["rng_version"], tuple(words), config["gauss_next"]))
+    walker = Walker(rows, cols, (path[0] % cols, path[0] // cols), rng, config["prune"], config["order"],
+                    config["lookahead"], config["end"], config["symmetries"])
+    state = walker.state
+    for i in range(1, size):
+        head = path[i - 1]
+        directions = [d for d in range(4) if state.neighbours[head * 4 + d] == path[i]]
+        if not directions or state.visited[path[i]]:
+            raise ValueError("%s doesn't have a self-avoiding path" % name)
+        state.push(path[i], directions[0])
+    for cell, mask in zip(path, options):
+        state.options[cell] = mask
+    walker.equal = list(equal)
+    walker.nodes = config["nodes"]
+    walker.backtracks = config["backtracks"]
+    walker.pruned.update(config["pruned"])
+    return walker, config["found"], config["seconds"]
+
+
+def run(walker, name, every_backtracks=None, every_seconds=None, enumerate=False, found=0, seconds=0.0,
+        every_steps=None):
+    if every_backtracks is not None and every_backtracks < 1:
+        raise ValueError("every_backtracks has to be at least 1")
+    if every_steps is not None and every_steps < 1:
+        raise ValueError("every_steps has to be at least 1")
+    started = time.perf_counter()
+    saved = started
+    next_save = None if every_backtracks is None else walker.backtracks + every_backtracks
+    next_step_save = None if every_steps is None else walker.nodes + every_steps
+
+    while True:
+        chunk = POLL if next_save is None else max(1, min(POLL, next_save - walker.backtracks))
+        steps = POLL if next_step_save is None else max(1, min(POLL, next_step_save - walker.nodes))
+        result = walker.run(chunk, steps)
+        if result is True and enumerate:
+            found += 1
+            if len(walker.state.path) == 1:
+                result = False
+            else:
+                walker.state.pop()
+                continue
+        if result is not None:
+            return result, found, seconds + time.perf_counter() - started
+
+        now = time.perf_counter()
+        if (next_save is not None and walker.backtracks >= next_save) or \
+                (next_step_save is not None and walker.nodes >= next_step_save) or \
+                (every_seconds is not None and now - saved >= every_seconds):
+            save(walker, name, found, seconds + now - started)
+            saved = time.perf_counter()
+            if next_save is not None:
+                next_save = walker.backtracks + every_backtracks
+            if next_step_save is not None:
+                next_step_save = walker.nodes + every_steps
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m saw.checkpoint",
+                                     description="Run a search that can be stopped and continued from a file.")
+    parser.add_argument("rows", type=int)
+    parser.add_argument("cols", type=int)
+    parser.add_argument("file", help="the checkpoint, the search goes on from it if it exists")
+    parser.add_argument("--start", type=int, nargs=2, metavar=("X", "Y"), help="position of the first spot (random if omitted)")
+    parser.add_argument("--end", type=int, nargs=2, metavar=("X", "Y"), help="position of the last spot")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--prune", nargs="+", choices=PRUNING_RULES, default=[], metavar="RULE")
+    parser.add_argument("--order", choices=MOVE_ORDERS, default="random")
+    parser.add_argument("--every-seconds", type=float, default=5.0, help="save a checkpoint this often")
+    parser.add_argument("--every-steps", type=int, help="save a checkpoint after this many steps (nodes)")
+    parser.add_argument("--every-backtracks", type=int, help="save a checkpoint after this many backtracks")
+    parser.add_argument("--enumerate", action="store_true", help="count every path instead of finding one")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        if os.path.exists(args.file):
+            walker, found, seconds = load(args.file)
+            if (walker.rows, walker.cols) != (args.rows, args.cols):
+                raise ValueError("%s is a search on a %d x %d grid" % (args.file, walker.rows, walker.cols))
+        else:
+            options = {"prune": args.prune, "order": args.order}
+            if args.end:
+                options["end"] = args.end
+            walker = make_walker(args.rows, args.cols, args.start, args.seed, "array", **options)[0]
+            found, seconds = 0, 0.0
+        result, found, seconds = run(walker, args.file, args.every_backtracks, args.every_seconds, args.enumerate,
+                                     found, seconds, args.every_steps)
+    except ValueError as error:
+        print("error: %s" % error, file=sys.stderr)
+        return 2
+
+    if os.path.exists(args.file):
+        os.remove(args.file)
+    if args.enumerate:
+        print(json.dumps({"paths": found, "seconds": seconds, "nodes": walker.nodes, "backtracks": walker.backtracks}))
+        return 0
+    state = walker.state
+    end = None if walker.end < 0 else state.position(walker.end)
+    path = walker.cells() if result else None
+    solution = Solution(args.rows, args.cols, state.position(state.path[0]), args.seed, "array", path,
+                        walker.nodes, walker.backtracks, seconds, walker.pruned, end)
+    print(json.dumps(solution.as_dict()))
+    return 0 if result else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+# Building a path without searching, for grids that are too big for any backtracking search.
+#
+# 1. hamiltonian_path(rows, cols, start)
+#   - a self-avoiding path from start that fills the grid, as a list of cell ids
+#     (grid_y * cols + grid_x, like GridState), built in O(rows * cols)
+#   - it raises ValueError if there is no such path (see feasibility.py)
+#   - How?
+#       1. 1 spot wide -> a straight line from start (which is one of the ends)
+#       2. an even number of spots -> the grid has a cycle that visits every spot (a comb, see below),
+#          the path goes around it from start
+#       3. odd x odd -> a spiral on a 3 x 3 block around start, with an even number of columns on
+#          its left and right and an even number of rows above and below it. Each of those bands
+#          is added to the path by replacing one step along the side of the block with a detour
+#          around the comb of the band, left and right first and then the rows above and below
+#
+# 2. Backbite(rows, cols, start, rng, moves=0) - a strategy like the ones in strategies.py
+#   - walker.run() builds the path with hamiltonian_path and makes `moves` backbite moves,
+#     so the path is random instead of always the same comb or spiral
+#   - walker.move() -> one backbite move, returns True if the path has changed
+#   - walker.cells(), walker.nodes, walker.backtracks (always 0), walker.moves, walker.accepted
+#   - A backbite move chooses a random neighbour n of the last spot of the path. If n is not
+#     outside of the grid and not the spot before the last one, the last spot steps to n and the
+#     path between them is reversed:
+#       start ... n a b ... end  ->  start ... n end ... b a
+#     The first spot never moves, so the path always starts at start.
+#
+# The comb of a band that is `length` spots long and `width` spots wide (width is even)
+# goes along the whole first line of the band and comes back through the others:
+#
+#   0 -> -> -> ->
+#   ^ <- <- <- <-
+#   v -> -> -> ->
+#   ^ <- <- <- <-
+#
+# so it has every step along the first line, and a detour from any spot of it to the one
+# next to it visits the whole band.
+
+import sys
+from array import array
+
+from .feasibility import has_path
+
+# a spiral through a 3 x 3 block from its corner (0, 0) and from its middle
+CORNER_SPIRAL = ((0, 0), (1, 0), (2, 0), (2, 1), (2, 2), (1, 2), (0, 2), (0, 1), (1, 1))
+MIDDLE_SPIRAL = ((1, 1), (1, 0), (0, 0), (0, 1), (0, 2), (1, 2), (2, 2), (2, 1), (2, 0))
+
+
+# the (position along the band, depth into the band) of each spot of the comb
+def comb(length, width):
+    spots = [(p, 0) for p in range(length)]
+    for d in range(1, width):
+        if d % 2:
+            spots.extend((p, d) for p in range(length - 1, 0, -1))
+        else:
+            spots.extend((p, d) for p in range(1, length))
+    spots.extend((0, d) for d in range(width - 1, 0, -1))
+    return spots
+
+
+def hamiltonian_path(rows, cols, start):
+    if not has_path(rows, cols, start):
+        raise ValueError("it is impossible to create a self-avoiding path from %r" % (tuple(start),))
+    x, y = start
+
+    if rows == 1 or cols == 1:
+        cells = list(range(rows * cols))
+        return cells if x + y == 0 else cells[::-1]
+
+    if (rows * cols) % 2 == 0:
+        if rows % 2 == 0:
+            cycle = [d * cols + p for p, d in comb(cols, rows)]
+        else:
+            cycle = [p * cols + d for p, d in comb(rows, cols)]
+        i = cycle.index(y * cols + x)
+        return cycle[i:] + cycle[:i]
+
+    # the 3 x 3 block starts at an even column and row, so the bands have an even width
+    # and start has the colour of the corners of the block
+    x0 = min(x - x % 2, cols - 3)
+    y0 = min(y - y % 2, rows - 3)
+    sx, sy = x - x0, y - y0
+    spiral = MIDDLE_SPIRAL if sx == 1 else CORNER_SPIRAL
+    path = []
+    for px, py in spiral:
+        if sx == 2:
+            px = 2 - px
+        if sy == 2:
+            py = 2 - py
+        path.append((y0 + py) * cols + x0 + px)
+
+    # left and right of the block, then above and below the rows of the block
+    path = add_band(path, [(y0 + p) * cols + x0 for p in range(3)], x0, lambda p, d: (y0 + p) * cols + x0 - 1 - d)
+    path = add_band(path, [(y0 + p) * cols + x0 + 2 for p in range(3)], cols - 3 - x0,
+                    lambda p, d: (y0 + p) * cols + x0 + 3 + d)
+    path = add_band(path, [y0 * cols + p for p in range(cols)], y0, lambda p, d: (y0 - 1 - d) * cols + p)
+    path = add_band(path, [(y0 + 2) * cols + p for p in range(cols)], rows - 3 - y0,
+                    lambda p, d: (y0 + 3 + d) * cols + p)
+    return path
+
+
+# replaces a step of path between two spots of side (the spots of the path next to the band,
+# in order) with a detour around the comb of the band, cell(p, d) is the cell id of a spot of it
+def add_band(path, side, width, cell):
+    if not width:
+        return path
+
+    position = {c: p for p, c in enumerate(side)}
+    for i in range(len(path) - 1):
+        p, q = position.get(path[i]), position.get(path[i + 1])
+        if p is not None and q is not None and abs(p - q) == 1:
+            break
+    else:
+        raise AssertionError("the path has no step along the side of the band")
+
+    cycle = [cell(along, depth) for along, depth in comb(len(side), width)]
+    # go around the comb from p so that it ends next to q
+    detour = cycle[p:] + cycle[:p] if q < p else cycle[p::-1] + cycle[:p:-1]
+    return path[:i + 1] + detour + path[i + 1:]
+
+
+class Backbite:
+    def __init__(self, rows, cols, start, rng, moves=0):
+        if moves < 0:
+            raise ValueError("moves can't be negative")
+        self.rows = rows
+        self.cols = cols
+        self.start = tuple(start)
+        self.rng = rng
+        self.target = moves
+
+        # the path from the last spot to the first one, so the spots that a move reverses are
+        # always at the front of it. It is kept in a bytearray because bytearray.find looks for
+        # the cell id of n about 10 times faster than array.index, reversed_path is a view of it
+        self.buffer = None
+        self.reversed_path = None
+        self.nodes = 0
+        self.backtracks = 0
+        self.moves = 0
+        self.accepted = 0
+
+    def cells(self):
+        if self.reversed_path is None:
+            return []
+        cols = self.cols
+        return [(cell % cols, cell // cols) for cell in reversed(self.reversed_path)]
+
+    def build(self):
+        path = hamiltonian_path(self.rows, self.cols, self.start)
+        self.buffer = bytearray(array("i", reversed(path)).tobytes())
+        self.reversed_path = memoryview(self.buffer).cast("i")
+        self.nodes = len(path)
+
+    def run(self):
+        if self.reversed_path is None:
+            self.build()
+        while self.moves < self.target:
+            self.move()
+        return True
+
+    def move(self):
+        if self.reversed_path is None:
+            self.build()
+        path = self.reversed_path
+        self.moves += 1
+        if len(path) < 2:
+            return False
+
+        cols = self.cols
+        end = path[0]
+        x, y = end % cols, end // cols
+        d = self.rng.randrange(4)
+        if d == 0:
+            if not y:
+                return False
+            n = end - cols
+        elif d == 1:
+            if x == cols - 1:
+                return False
+            n = end + 1
+        elif d == 2:
+            if y == self.rows - 1:
+                return False
+            n = end + cols
+        else:
+            if not x:
+                return False
+            n = end - 1
+        if n == path[1]:
+            return False
+
+        # the first match that starts at a whole cell id (the 4 bytes can also be found across two of them)
+        buffer = self.buffer
+        key = n.to_bytes(4, sys.byteorder)
+        at = buffer.find(key)
+        while at % 4:
+            at = buffer.find(key, at + 1)
+        i = at // 4
+
+        segment = array("i")
+        segment.frombytes(buffer[:at])
+        segment.reverse()
+        path[:i] = segment
+        self.accepted += 1
+        return True
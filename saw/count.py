@@ -0,0 +1,204 @@
+# count_paths(rows, cols, start=None, end=None) - how many self-avoiding paths fill the grid
+#
+# Searching for every path takes exponential time. This goes through the spots one by one instead
+# (a line of `width` spots at a time, along the shorter side of the grid, then the next line) and
+# only remembers, for each way the path can cross the border between the spots it has done and
+# the ones it hasn't, how many ways of filling the done spots lead to it (a frontier / transfer
+# matrix dynamic program).
+#
+# The border is described by a state:
+#   - labels[i] -> the piece of path that steps from the done spot of column i into the next line,
+#                  or 0 if there isn't one
+#   - left -> the piece of path that steps from the last done spot into the next spot of the line
+#   - free -> how many ends of the path (spots with only one neighbour on the path) are not start or end
+# Two crossings with the same label are the two ends of the same piece of path. A label that is
+# only there once is a piece whose other end is already an end of the path. Labels are numbered
+# in the order they appear, so two states that mean the same thing are the same tuple.
+#
+# Every spot of the path has two neighbours on it except the two ends, start and end have one
+# (if they are given). A spot can only join two pieces if they are not the same piece (that would
+# be a loop), and a piece that has both of its ends finished is the whole path, so that can only
+# happen at the last spot.
+#
+# Counts are python ints, so they never overflow.
+#
+# FrontierCounter(rows, cols, start=None, end=None)
+#   - counter.run() -> the number of paths (from start, to end), without start or end a path and
+#                      its reverse are counted once
+#   - counter.frontiers -> for each line: how many states the table had after it and about how
+#                          many bytes it used
+#
+# python -m saw.count ROWS COLS [--start X Y] [--end X Y]
+#   - prints the count and the frontiers as JSON
+
+import argparse
+import json
+import sys
+import time
+
+from .feasibility import has_path
+
+
+class FrontierCounter:
+    def __init__(self, rows, cols, start=None, end=None):
+        if rows < 1 or cols < 1:
+            raise ValueError("the grid needs at least one row and one column")
+        for spot in (start, end):
+            if spot is not None and not (0 <= spot[0] < cols and 0 <= spot[1] < rows):
+                raise ValueError("%r is outside of the %d x %d grid" % (tuple(spot), rows, cols))
+        self.rows = rows
+        self.cols = cols
+        self.start = None if start is None else tuple(start)
+        self.end = None if end is None else tuple(end)
+        self.frontiers = []
+
+        # the lines go along the shorter side, so there are fewer states
+        self.transposed = cols > rows
+        if self.transposed:
+            self.width, self.height = rows, cols
+        else:
+            self.width, self.height = cols, rows
+
+    # the index of a spot in the order the spots are done
+    def order(self, spot):
+        if spot is None:
+            return -1
+        x, y = spot
+        return x * self.width + y if self.transposed else y * self.width + x
+
+    def run(self):
+        if self.start is not None and not has_path(self.rows, self.cols, self.start, self.end):
+            return 0
+        if self.start is None and self.end is not None and not has_path(self.rows, self.cols, self.end):
+            return 0
+
+        width, height = self.width, self.height
+        size = width * height
+        if size == 1:
+            return 1
+        fixed = {self.order(self.start), self.order(self.end)} - {-1}
+        free_ends = 2 - len(fixed)
+        last = size - 1
+
+        table = {(0,) * (width + 1) + (0,): 1}
+        total = 0
+        for cell in range(size):
+            y, x = divmod(cell, width)
+            right, down = x < width - 1, y < height - 1
+            must_end = cell in fixed
+            new_table = {}
+
+            def add(labels, left, free, count):
+                key = normalize(labels, left, free)
+                new_table[key] = new_table.get(key, 0) + count
+
+            for state, count in table.items():
+                labels = list(state[:width])
+                left, free = state[width], state[width + 1]
+                up = labels[x]
+                labels[x] = 0
+                can_end = must_end or free < free_ends
+                end_free = free if must_end else free + 1
+
+                if not up and not left:
+                    # a new piece, with both of its ends going on, or an end of the path going on
+                    if not must_end and right and down:
+                        labels[x] = -1
+                        add(labels, -1, free, count)
+                        labels[x] = 0
+                    if can_end and right:
+                        add(labels, -1, end_free, count)
+                    if can_end and down:
+                        labels[x] = -1
+                        add(labels, 0, end_free, count)
+                        labels[x] = 0
+
+                elif not up or not left:
+                    piece = up or left
+                    # the piece goes on to the right or down
+                    if not must_end:
+                        if right:
+                            add(labels, piece, free, count)
+                        if down:
+                            labels[x] = piece
+                            add(labels, 0, free, count)
+                            labels[x] = 0
+                    # or the path ends here
+                    if can_end:
+                        if piece in labels:
+                            add(labels, 0, end_free, count)
+                        elif cell == last and not any(labels):
+                            total += count
+
+                elif not must_end and up != left:
+                    # two pieces become one
+                    if up in labels or left in labels:
+                        add([up if label == left else label for label in labels], 0, free, count)
+                    elif cell == last and not any(labels):
+                        total += count
+
+            table = new_table
+            if x == width - 1:
+                self.frontiers.append({"line": y, "states": len(table), "bytes": table_bytes(table)})
+        return total
+
+
+# the state with its labels numbered in the order they appear
+def normalize(labels, left, free):
+    numbers = {0: 0}
+    key = []
+    for label in labels:
+        number = numbers.get(label)
+        if number is None:
+            number = numbers[label] = len(numbers)
+        key.append(number)
+    number = numbers.get(left)
+    if number is None:
+        number = len(numbers)
+    key.append(number)
+    key.append(free)
+    return tuple(key)
+
+
+def table_bytes(table):
+    return sys.getsizeof(table) + sum(sys.getsizeof(state) + sys.getsizeof(count) for state, count in table.items())
+
+
+def count_paths(rows, cols, start=None, end=None):
+    return FrontierCounter(rows, cols, start, end).run()
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m saw.count",
+                                     description="Count the self-avoiding paths that fill a grid.")
+    parser.add_argument("rows", type=int)
+    parser.add_argument("cols", type=int)
+    parser.add_argument("--start", type=int, nargs=2, metavar=("X", "Y"), help="position of the first spot")
+    parser.add_argument("--end", type=int, nargs=2, metavar=("X", "Y"), help="position of the last spot")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        counter = FrontierCounter(args.rows, args.cols, args.start, args.end)
+    except ValueError as error:
+        print("error: %s" % error, file=sys.stderr)
+        return 2
+
+    started = time.perf_counter()
+    count = counter.run()
+    print(json.dumps({
+        "rows": args.rows,
+        "cols": args.cols,
+        "start": args.start,
+        "end": args.end,
+        "count": count,
+        "seconds": time.perf_counter() - started,
+        "frontiers": counter.frontiers,
+    }))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+# Every path that fills the grid from a start, not only the first one.
+#
+# The search of the array strategy already tries every direction of every spot once (the tried ones
+# are removed from the options), so it goes through all of the paths if it steps back from each path
+# it finds and keeps going. A prefix (the first spots of a path, as cell ids) is a part of that
+# search: the walker starts with the prefix on its path and the options of every spot of the prefix
+# but the last one emptied, so it only finds the paths that start with it.
+#
+# 1. paths(rows, cols, start=None, seed=None, **options)
+#   - a generator of every path (a list of (grid_x, grid_y)) from start, one search in this process
+#   - options -> options of the array strategy (pruning rules only skip moves that can't lead to a
+#                path, so they give the same paths faster, end=(x, y) only gives the paths to end)
+#
+# 2. parallel_paths(rows, cols, start=None, seed=None, depth=4, workers=None, budget=10000, limit=None, **options)
+#   - the same paths (in another order) from searches in worker processes
+#   - the search is split into every prefix of depth steps, the prefixes are sent to the workers
+#   - a worker gives up on a prefix after budget backtracks and sends back the paths it has found
+#     and the parts of the search it hasn't done yet, as new prefixes (one for every direction that
+#     is still in the options of a spot on its path). They go to the end of the queue, so a prefix
+#     with a huge search is shared by all of the workers instead of keeping one of them busy
+#   - limit -> stop after that many paths, the workers that are still busy are stopped: they check a
+#     multiprocessing Event every POLL backtracks or POLL nodes (like portfolio.py) and return what
+#     they have found
+#
+# 3. search(rows, cols, prefix, seed, budget, options) - what a worker does with one prefix
+#   - returns (paths, prefixes), both lists of lists of cell ids
+#
+# python -m saw.enumeration ROWS COLS [--start X Y] [--end X Y] [--prune RULE ...] [--workers N] [--depth D]
+#                           [--budget BACKTRACKS] [--limit K] [--count] [--symmetry] [--save FILE]
+#   - prints the paths as JSON, one per line (or only how many there are with --count),
+#     without --workers it searches in this process
+#   - --save -> write the paths to a path file (see pathfile.py) instead, and print how many there are
+#   - --symmetry -> search them with symmetry.paths (turned and mirrored paths are made, not searched)
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import sys
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from .pathfile import PathWriter
+from .solver import make_walker
+from .state import MASK_DIRECTIONS
+from .walker import PRUNING_RULES
+
+POLL = 1000
+
+# the Event of parallel_paths in a worker process, it is set when it has enough paths
+stop = None
+
+
+def share(event):
+    global stop
+    stop = event
+
+
+# the walker that searches the paths that start with prefix, or None if prefix can't be the start of one
+def prefix_walker(rows, cols, prefix, seed, options):
+    walker = make_walker(rows, cols, (prefix[0] % cols, prefix[0] // cols), seed, "array", **options)[0]
+    state = walker.state
+    for cell in prefix[1:]:
+        head = state.path[-1]
+        for d in MASK_DIRECTIONS[state.inside[head]]:
+            if state.neighbours[head * 4 + d] == cell:
+                break
+        else:
+            raise ValueError("the spots of a prefix have to be next to each other")
+        if state.visited[cell] or (cell == walker.end and len(state.path) + 1 < state.size):
+            return None
+        state.options[head] = 0
+        state.push(cell, d)
+        if walker.prune and walker.broken_rule(cell) is not None:
+            return None
+    return walker
+
+
+# a generator of the paths the walker finds (its path starts with a prefix of prefix_length spots),
+# if it runs out of budget the prefixes of the rest of the search are added to rest, if the event
+# stopped is set (it is checked every POLL backtracks or POLL nodes) it just ends
+def explore(walker, prefix_length, budget, rest, stopped=None):
+    state = walker.state
+    path = state.path
+    nodes = None if stopped is None else POLL
+    while True:
+        chunk = None if budget is None else budget - walker.backtracks
+        if stopped is not None:
+            chunk = POLL if chunk is None else min(POLL, chunk)
+        result = walker.run(chunk, nodes)
+        if result:
+            yield list(path)
+            if len(path) == prefix_length:
+                return
+            state.pop()
+        elif result is False:
+            return
+        elif stopped is not None and stopped.is_set():
+            return
+        elif budget is not None and walker.backtracks >= budget:
+            break
+
+    # every direction that hasn't been tried yet, from the last spot of the prefix on
+    index = {cell: i for i, cell in enumerate(path)}
+    for i in range(prefix_length - 1, len(path)):
+        cell = path[i]
+        for d in MASK_DIRECTIONS[state.options[cell]]:
+            neighbour = state.neighbours[cell * 4 + d]
+            if index.get(neighbour, i + 1) > i:
+                rest.append(list(path[:i + 1]) + [neighbour])
+
+
+def search(rows, cols, prefix, seed, budget, options):
+    walker = prefix_walker(rows, cols, prefix, seed, options)
+    if walker is None:
+        return [], []
+    rest = []
+    return list(explore(walker, len(prefix), budget, rest, stop)), rest
+
+
+def cells(path, cols):
+    return [(cell % cols, cell // cols) for cell in path]
+
+
+def paths(rows, cols, start=None, seed=None, **options):
+    walker = make_walker(rows, cols, start, seed, "array", **options)[0]
+    for path in explore(walker, 1, None, []):
+        yield cells(path, cols)
+
+
+# every prefix of depth steps (or shorter, if the path can't go on before that)
+def split(rows, cols, start, depth, options):
+    state = make_walker(rows, cols, start, None, "array", **options)[0].state
+    prefixes = [[start[1] * cols + start[0]]]
+    for _ in range(depth):
+        longer = []
+        for prefix in prefixes:
+            head = prefix[-1]
+            after = [state.neighbours[head * 4 + d] for d in MASK_DIRECTIONS[state.inside[head]]]
+            after = [cell for cell in after if cell not in prefix]
+            if after:
+                longer.extend(prefix + [cell] for cell in after)
+            else:
+                longer.append(prefix)
+        prefixes = longer
+    return prefixes
+
+
+def parallel_paths(rows, cols, start=None, seed=None, depth=4, workers=None, budget=10000, limit=None, **options):
+    if depth < 0 or (budget is not None and budget < 1):
+        raise ValueError("depth can't be negative and budget has to be at least 1")
+    start = make_walker(rows, cols, start, seed, "array", **options)[1]
+    if limit is not None and limit < 1:
+        return
+
+    workers = workers or os.cpu_count() or 1
+    rng = random.Random(seed)
+    queue = deque(split(rows, cols, start, depth, options))
+    context = multiprocessing.get_context()
+    event = context.Event()
+    pool = ProcessPoolExecutor(workers, mp_context=context, initializer=share, initargs=(event,))
+    busy = set()
+    count = 0
+    try:
+        while queue or busy:
+            # a few prefixes more than workers, so none of them waits for the next one
+            while queue and len(busy) < 2 * workers:
+                busy.add(pool.submit(search, rows, cols, queue.popleft(), rng.getrandbits(64), budget, options))
+            done, busy = wait(busy, return_when=FIRST_COMPLETED)
+            for future in done:
+                found, rest = future.result()
+                queue.extend(rest)
+                for path in found:
+                    yield cells(path, cols)
+                    count += 1
+                    if count == limit:
+                        return
+    finally:
+        event.set()
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m saw.enumeration",
+                                     description="Print every self-avoiding path that fills a grid from a start.")
+    parser.add_argument("rows", type=int)
+    parser.add_argument("cols", type=int)
+    parser.add_argument("--start", type=int, nargs=2, metavar=("X", "Y"), help="position of the first spot (random if omitted)")
+    parser.add_argument("--end", type=int, nargs=2, metavar=("X", "Y"), help="position of the last spot")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--prune", nargs="+", choices=PRUNING_RULES, default=[], metavar="RULE")
+    parser.add_argument("--workers", type=int, help="search in this many processes")
+    parser.add_argument("--depth", type=int, default=4, help="steps of the prefixes that are sent to the workers")
+    parser.add_argument("--budget", type=int, default=10000, help="backtracks before a worker splits its prefix")
+    parser.add_argument("--limit", type=int, help="stop after this many paths")
+    parser.add_argument("--count", action="store_true", help="only print how many paths there are")
+    parser.add_argument("--save", metavar="FILE", help="write the paths to this path file")
+    parser.add_argument("--symmetry", action="store_true", help="only search one path of each group of turned and mirrored paths")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    options = {}
+    if args.prune:
+        options["prune"] = args.prune
+    if args.end:
+        options["end"] = args.end
+
+    try:
+        if args.symmetry:
+            from .symmetry import paths as symmetric_paths
+            found = itertools.islice(symmetric_paths(args.rows, args.cols, args.start, args.seed, args.workers,
+                                                     args.depth, args.budget, **options), args.limit)
+        elif args.workers:
+            found = parallel_paths(args.rows, args.cols, args.start, args.seed, args.depth, args.workers,
+                                   args.budget, args.limit, **options)
+        else:
+            found = itertools.islice(paths(args.rows, args.cols, args.start, args.seed, **options), args.limit)
+        if args.save:
+            with PathWriter(args.save, args.rows, args.cols, args.start) as writer:
+                for path in found:
+                    writer.write(path)
+            print(writer.count)
+        elif args.count:
+            print(sum(1 for _ in found))
+        else:
+            for path in found:
+                print(json.dumps([list(cell) for cell in path]))
+    except ValueError as error:
+        print("error: %s" % error, file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
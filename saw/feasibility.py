@@ -0,0 +1,98 @@
+# Is there a self-avoiding path that fills a rows x cols grid from start (to end)?
+#
+# The scripts only know two cases where it is impossible (is_impossible in grid.py), and
+# find_valid_starting_spot_position keeps choosing random spots until one of them passes.
+# These are the complete conditions for rectangular grids, from Itai, Papadimitriou and
+# Szwarcfiter, "Hamilton paths in grid graphs" (1982). Colour a spot with (grid_x + grid_y) % 2,
+# like the check pattern of the README (the corners have colour 0), then a path from s to t exists
+# if and only if
+#   1. the colours work out: every step changes the colour, so if the grid has an even number of
+#      spots s and t have different colours, and if it is odd (odd x odd) they both have colour 0
+#   2. the grid is 1 spot wide and s and t are not both ends of it
+#   3. the grid is 2 spots wide and s, t are the two spots of a column that is not the first or
+#      the last one (the path can't get back to the spots on one side of them)
+#   4. the grid is 3 spots wide and an even number of spots long, and w (the one of s, t with
+#      colour 1) is more than one column before b (the other one), or is in the middle row and
+#      before b
+# where 2, 3 and 4 make it impossible. Without an end, a path from start exists unless the grid is
+# 1 spot wide and start is not one of its ends, or the grid is odd x odd and start has colour 1.
+#
+# 1. has_path(rows, cols, start, end=None)
+#   - True if there is a path from start (to end), in constant time
+#
+# 2. valid_starts(rows, cols, end=None)
+#   - a list of every start that has a path (to end)
+#
+# 3. random_start(rows, cols, rng, end=None)
+#   - a random start that has a path (to end), chosen without trying random spots until one works
+#   - it raises ValueError if there is none
+
+
+def colour(spot):
+    return (spot[0] + spot[1]) % 2
+
+
+def has_path(rows, cols, start, end=None):
+    if end is None:
+        return start_has_path(rows, cols, start)
+
+    start, end = tuple(start), tuple(end)
+    if start == end:
+        return rows * cols == 1
+
+    # make the grid at least as wide (cols) as it is tall (rows)
+    if rows > cols:
+        rows, cols = cols, rows
+        start, end = (start[1], start[0]), (end[1], end[0])
+
+    if (rows * cols) % 2 == 0:
+        if colour(start) == colour(end):
+            return False
+    elif colour(start) or colour(end):
+        return False
+
+    if rows == 1:
+        return {start[0], end[0]} == {0, cols - 1}
+
+    if rows == 2 and start[0] == end[0] and 0 < start[0] < cols - 1:
+        return False
+
+    if rows == 3 and cols % 2 == 0:
+        w, b = (start, end) if colour(start) else (end, start)
+        if w[0] < b[0] - 1 or (w[1] == 1 and w[0] < b[0]):
+            return False
+
+    return True
+
+
+def start_has_path(rows, cols, start):
+    x, y = start
+    if rows == 1 or cols == 1:
+        return rows * cols <= 2 or (x, y) in ((0, 0), (cols - 1, rows - 1))
+    return (rows * cols) % 2 == 0 or colour(start) == 0
+
+
+def valid_starts(rows, cols, end=None):
+    return [(x, y) for y in range(rows) for x in range(cols) if has_path(rows, cols, (x, y), end)]
+
+
+def random_start(rows, cols, rng, end=None):
+    if end is not None:
+        starts = valid_starts(rows, cols, end)
+        if not starts:
+            raise ValueError("there is no self-avoiding path to %r" % (tuple(end),))
+        return rng.choice(starts)
+
+    if rows == 1 or cols == 1:
+        return rng.choice(((0, 0), (cols - 1, rows - 1)))
+
+    if (rows * cols) % 2 == 0:
+        return rng.randrange(cols), rng.randrange(rows)
+
+    # odd x odd - the k-th spot of colour 0, every pair of rows has cols of them,
+    # (cols + 1) // 2 in the even row and (cols - 1) // 2 in the odd row
+    k = rng.randrange((rows * cols + 1) // 2)
+    pair, k = divmod(k, cols)
+    if k < (cols + 1) // 2:
+        return 2 * k, 2 * pair
+    return 2 * (k - (cols + 1) // 2) + 1, 2 * pair + 1
@@ -0,0 +1,42 @@
+# Grid helpers shared by every strategy of the engine.
+#
+# A spot on the grid is identified by its (grid_x, grid_y) position,
+# grid_x ranges from 0 to cols - 1 and grid_y ranges from 0 to rows - 1.
+#
+# 1. DIRECTIONS
+#   - up, right, down, left -> the same direction tuples used by the scripts
+#
+# 2. is_impossible(rows, cols, grid_x, grid_y)
+#   - it checks to see whether it is even possible to create a self-avoiding path or not
+#   - When is it impossible?
+#       1. If the number of rows and columns are both odd numbers and
+#          the starting spot position is a pair of numbers which one of
+#          them is an odd number and the other one is an even number
+#       2. If the grid dimensions are 1 by X and the starting spot position
+#          is not on one end of the grid.
+#   - function returns True if it is impossible and returns False
+#     if it is possible to find a self-avoiding path
+#
+# 3. find_valid_starting_spot_position(rows, cols, rng)
+#   - It chooses the position of the first spot randomly with rng (a random.Random)
+#   - it only chooses from the positions where a self-avoiding path is possible
+#     (see feasibility.py), so it doesn't have to try again until one is valid
+
+from .feasibility import random_start
+
+# up, right, down, left
+DIRECTIONS = ((0, -1), (1, 0), (0, 1), (-1, 0))
+
+
+def is_impossible(rows, cols, grid_x, grid_y):
+    if (rows * cols) % 2 == 1 and grid_x % 2 != grid_y % 2:
+        return True
+    if rows == 1 and cols > 2 and 0 < grid_x < cols - 1:
+        return True
+    if cols == 1 and rows > 2 and 0 < grid_y < rows - 1:
+        return True
+    return False
+
+
+def find_valid_starting_spot_position(rows, cols, rng):
+    return random_start(rows, cols, rng)
@@ -0,0 +1,523 @@
+# Lattices other than the rows x cols grid - a table of neighbours made once, then only cell ids
+#
+# A Lattice is every spot as a cell id (0 .. size - 1) and its neighbours as CSR arrays:
+#   - targets[offsets[cell]:offsets[cell + 1]] -> the cell ids next to cell (array of ints)
+#   - back[offsets[cell] + slot] -> the slot of cell among the neighbours of that target, so the
+#                                   walker can remove the way back without looking for it
+#   - positions[cell] -> the coordinates of the cell, only for printing and the constructors
+#   - blocked[cell] -> 1 if the cell is an obstacle (it has no neighbours and isn't on any path)
+#   - colour[cell] -> 0 or 1 so that neighbours always have different colours, or None if the
+#                     lattice has odd cycles (triangular, a torus with an odd side)
+# The walker never looks at coordinates, a step is targets[offsets[head] + slot] whatever the lattice is.
+#
+# Constructors (obstacles is a list of positions):
+#   - square(rows, cols, obstacles=()) -> the grid of the scripts, neighbours in DIRECTIONS order
+#   - torus(rows, cols, obstacles=()) -> the grid with its opposite sides next to each other
+#   - triangular(rows, cols, obstacles=()) -> every spot also has the neighbours up-right and
+#                                             down-left, so 6 of them (a rhombus of triangles)
+#   - hexagonal(rows, cols, obstacles=()) -> a honeycomb drawn as a brick wall: left, right and up
+#                                            or down (down if grid_x + grid_y is even), 3 neighbours
+#   - cubic(depth, rows, cols, obstacles=()) -> the 3D grid, positions are (x, y, z)
+#
+# The array strategy (walker.py) uses the same kind of table for the square grid (neighbours[cell * 4 + d]),
+# with 4 neighbours it doesn't need offsets.
+#
+# LatticeWalker(lattice, start, rng, prune=(), order=RANDOM)
+#   - the V3 search on any lattice, with the same attributes and methods as the strategies:
+#     walker.run(max_backtracks=None), walker.cells(), walker.nodes, walker.backtracks, walker.pruned
+#   - start is a cell id, the path has to visit every cell that isn't blocked
+#   - prune -> DEAD_END and/or CONNECTIVITY, the rules of walker.py without anything about the grid
+#   - order -> RANDOM or WARNSDORFF (the neighbour with the fewest free neighbours first), like walker.py
+#
+# LatticeStrategy(rows, cols, start, rng, kind="square", obstacles=(), prune=(), order=RANDOM)
+#   - the "lattice" strategy of solver.py (solve(..., strategy="lattice"), python -m saw --strategy
+#     lattice [--lattice KIND] [--obstacle X Y ...]): a LatticeWalker on a rows x cols lattice of one
+#     of GRID_LATTICES, start is (grid_x, grid_y), or random_start(lattice, rng) if it is None (walker.start)
+#
+# check(lattice, start) raises ValueError when a path from start is clearly impossible: the free
+# cells are not connected, more than two cells (or two and not start) have only one neighbour, or
+# the lattice has colours and their numbers don't fit a path from start (every step changes the
+# colour). It doesn't find every impossible start like has_path does for the grid, the search finds
+# the rest.
+#
+# python -m saw.lattice KIND SIZE... [--start COORD...] [--obstacle COORD... ...] [--seed SEED]
+#                       [--prune RULE ...] [--order ORDER] [--max-backtracks N]
+#   - KIND is square, torus, triangular, hexagonal (SIZE = ROWS COLS) or cubic (SIZE = DEPTH ROWS COLS),
+#     prints the path as JSON
+
+import argparse
+import json
+import random
+import sys
+import time
+from array import array
+
+from .grid import DIRECTIONS
+from .walker import CONNECTIVITY, DEAD_END, MOVE_ORDERS, RANDOM, WARNSDORFF
+
+LATTICE_RULES = (DEAD_END, CONNECTIVITY)
+
+# the lattices that are rows x cols, like the grid of the other strategies
+GRID_LATTICES = ("square", "torus", "triangular", "hexagonal")
+
+
+class Lattice:
+    def __init__(self, kind, shape, positions, neighbours, obstacles=()):
+        self.kind = kind
+        self.shape = tuple(shape)
+        self.positions = positions
+        self.size = len(positions)
+        self.index = {position: cell for cell, position in enumerate(positions)}
+
+        self.blocked = bytearray(self.size)
+        for position in obstacles:
+            cell = self.index.get(tuple(position))
+            if cell is None:
+                raise ValueError("obstacle %r is outside of the lattice" % (tuple(position),))
+            self.blocked[cell] = 1
+
+        # CSR arrays, without the obstacles, a cell twice (a torus 2 wide) or the cell itself (1 wide)
+        offsets, targets = [0], []
+        for cell in range(self.size):
+            if not self.blocked[cell]:
+                seen = set()
+                for neighbour in neighbours(cell):
+                    if neighbour != cell and not self.blocked[neighbour] and neighbour not in seen:
+                        seen.add(neighbour)
+                        targets.append(neighbour)
+            offsets.append(len(targets))
+        self.offsets = array("i", offsets)
+        self.targets = array("i", targets)
+        if self.size and max(offsets[cell + 1] - offsets[cell] for cell in range(self.size)) > 8:
+            raise ValueError("a cell can have at most 8 neighbours")
+
+        back = array("i", bytes(4 * len(targets)))
+        for cell in range(self.size):
+            for i in range(offsets[cell], offsets[cell + 1]):
+                neighbour = targets[i]
+                back[i] = list(targets[offsets[neighbour]:offsets[neighbour + 1]]).index(cell)
+        self.back = back
+        self.free = self.size - sum(self.blocked)
+        self.colour = self.two_colours()
+
+    def neighbours(self, cell):
+        return self.targets[self.offsets[cell]:self.offsets[cell + 1]]
+
+    def cell(self, position):
+        cell = self.index.get(tuple(position))
+        if cell is None:
+            raise ValueError("%r is outside of the lattice" % (tuple(position),))
+        return cell
+
+    # a colouring where neighbours have different colours, or None if there isn't one
+    def two_colours(self):
+        colour = bytearray(self.size)
+        done = bytearray(self.size)
+        for first in range(self.size):
+            if done[first] or self.blocked[first]:
+                continue
+            done[first] = 1
+            queue = [first]
+            for cell in queue:
+                for neighbour in self.neighbours(cell):
+                    if not done[neighbour]:
+                        done[neighbour] = 1
+                        colour[neighbour] = colour[cell] ^ 1
+                        queue.append(neighbour)
+                    elif colour[neighbour] == colour[cell]:
+                        return None
+        return colour
+
+
+def grid_positions(rows, cols):
+    return [(x, y) for y in range(rows) for x in range(cols)]
+
+
+def square(rows, cols, obstacles=()):
+    def neighbours(cell):
+        y, x = divmod(cell, cols)
+        return [(y + dy) * cols + x + dx for dx, dy in DIRECTIONS if 0 <= x + dx < cols and 0 <= y + dy < rows]
+    return Lattice("square", (rows, cols), grid_positions(rows, cols), neighbours, obstacles)
+
+
+def torus(rows, cols, obstacles=()):
+    def neighbours(cell):
+        y, x = divmod(cell, cols)
+        return [(y + dy) % rows * cols + (x + dx) % cols for dx, dy in DIRECTIONS]
+    return Lattice("torus", (rows, cols), grid_positions(rows, cols), neighbours, obstacles)
+
+
+def triangular(rows, cols, obstacles=()):
+    steps = DIRECTIONS + ((1, -1), (-1, 1))
+
+    def neighbours(cell):
+        y, x = divmod(cell, cols)
+        return [(y + dy) * cols + x + dx for dx, dy in steps if 0 <= x + dx < cols and 0 <= y + dy < rows]
+    return Lattice("triangular", (rows, cols), grid_positions(rows, cols), neighbours, obstacles)
+
+
+def hexagonal(rows, cols, obstacles=()):
+    def neighbours(cell):
+        y, x = divmod(cell, cols)
+        steps = ((1, 0), (-1, 0), (0, 1) if (x + y) % 2 == 0 else (0, -1))
+        return [(y + dy) * cols + x + dx for dx, dy in steps if 0 <= x + dx < cols and 0 <= y + dy < rows]
+    return Lattice("hexagonal", (rows, cols), grid_positions(rows, cols), neighbours, obstacles)
+
+
+def cubic(depth, rows, cols, obstacles=()):
+    layer = rows * cols
+    steps = ((0, -1, 0), (1, 0, 0), (0, 1, 0), (-1, 0, 0), (0, 0, -1), (0, 0, 1))
+
+    def neighbours(cell):
+        z, rest = divmod(cell, layer)
+        y, x = divmod(rest, cols)
+        return [(z + dz) * layer + (y + dy) * cols + x + dx for dx, dy, dz in steps
+                if 0 <= x + dx < cols and 0 <= y + dy < rows and 0 <= z + dz < depth]
+    positions = [(x, y, z) for z in range(depth) for y in range(rows) for x in range(cols)]
+    return Lattice("cubic", (depth, rows, cols), positions, neighbours, obstacles)
+
+
+LATTICES = {
+    "square": square,
+    "torus": torus,
+    "triangular": triangular,
+    "hexagonal": hexagonal,
+    "cubic": cubic,
+}
+
+
+def check(lattice, start):
+    if not 0 <= start < lattice.size or lattice.blocked[start]:
+        raise ValueError("the start has to be a cell of the lattice that isn't blocked")
+    # every free cell has to be reached from start
+    seen = bytearray(lattice.size)
+    seen[start] = 1
+    queue = [start]
+    for cell in queue:
+        for neighbour in lattice.neighbours(cell):
+            if not seen[neighbour]:
+                seen[neighbour] = 1
+                queue.append(neighbour)
+    if len(queue) != lattice.free:
+        raise ValueError("the free cells of the lattice are not connected")
+
+    # a cell with one neighbour can only be an end of the path
+    ends = [cell for cell in queue if lattice.offsets[cell + 1] - lattice.offsets[cell] == 1]
+    if len(ends) > 2 or (len(ends) == 2 and start not in ends):
+        raise ValueError("it is impossible to create a self-avoiding path from %r" % (lattice.positions[start],))
+
+    colour = lattice.colour
+    if colour is not None:
+        ones = sum(1 for cell in range(lattice.size) if colour[cell] and not lattice.blocked[cell])
+        counts = (lattice.free - ones, ones)
+        mine, other = counts[colour[start]], counts[colour[start] ^ 1]
+        if not 0 <= mine - other <= 1:
+            raise ValueError("it is impossible to create a self-avoiding path from %r"
+                             % (lattice.positions[start],))
+
+
+class LatticeWalker:
+    def __init__(self, lattice, start, rng, prune=(), order=RANDOM):
+        for rule in prune:
+            if rule not in LATTICE_RULES:
+                raise ValueError("unknown pruning rule %r, choose from %s" % (rule, ", ".join(LATTICE_RULES)))
+        if order not in MOVE_ORDERS:
+            raise ValueError("unknown move order %r, choose from %s" % (order, ", ".join(MOVE_ORDERS)))
+        self.order = order
+        check(lattice, start)
+        self.lattice = lattice
+        self.rng = rng
+        self.prune = tuple(rule for rule in LATTICE_RULES if rule in prune)
+        self.pruned = {rule: 0 for rule in self.prune}
+
+        size = lattice.size
+        offsets = lattice.offsets
+        self.total = lattice.free
+        # blocked cells count as visited, so nothing steps onto them
+        self.visited = bytearray(lattice.blocked)
+        # options[cell] -> a bit for every slot of cell that hasn't been tried yet
+        self.options = bytearray(size)
+        self.all_slots = bytearray((1 << (offsets[cell + 1] - offsets[cell])) - 1 for cell in range(size))
+        self.path = array("i")
+
+        # free[cell] -> neighbours that are not visited, zeros / ones -> free cells with 0 / 1 of them
+        self.free = bytearray(offsets[cell + 1] - offsets[cell] for cell in range(size))
+        self.zeros = sum(1 for cell in range(size) if not lattice.blocked[cell] and not self.free[cell])
+        self.ones = sum(1 for cell in range(size) if not lattice.blocked[cell] and self.free[cell] == 1)
+        self.seen = array("I", bytes(4 * size))
+        self.generation = 0
+
+        self.push(start, -1)
+        self.options[start] = self.all_slots[start]
+        self.nodes = 1
+        self.backtracks = 0
+
+    def cells(self):
+        positions = self.lattice.positions
+        return [positions[cell] for cell in self.path]
+
+    # adds cell to the path, back is the slot of cell that goes to the spot before it (or -1)
+    def push(self, cell, back):
+        self.visited[cell] = 1
+        self.options[cell] = self.all_slots[cell] & ~(1 << back) if back >= 0 else self.all_slots[cell]
+        self.path.append(cell)
+
+        free, visited = self.free, self.visited
+        if free[cell] == 0:
+            self.zeros -= 1
+        elif free[cell] == 1:
+            self.ones -= 1
+        targets, offsets = self.lattice.targets, self.lattice.offsets
+        for i in range(offsets[cell], offsets[cell + 1]):
+            neighbour = targets[i]
+            count = free[neighbour] - 1
+            free[neighbour] = count
+            if not visited[neighbour]:
+                if count == 1:
+                    self.ones += 1
+                elif count == 0:
+                    self.ones -= 1
+                    self.zeros += 1
+
+    def pop(self):
+        cell = self.path.pop()
+        self.visited[cell] = 0
+
+        free, visited = self.free, self.visited
+        targets, offsets = self.lattice.targets, self.lattice.offsets
+        for i in range(offsets[cell], offsets[cell + 1]):
+            neighbour = targets[i]
+            count = free[neighbour] + 1
+            free[neighbour] = count
+            if not visited[neighbour]:
+                if count == 2:
+                    self.ones -= 1
+                elif count == 1:
+                    self.ones += 1
+                    self.zeros -= 1
+        if free[cell] == 0:
+            self.zeros += 1
+        elif free[cell] == 1:
+            self.ones += 1
+
+    def run(self, max_backtracks=None):
+        lattice = self.lattice
+        targets, offsets, back = lattice.targets, lattice.offsets, lattice.back
+        path, options, visited = self.path, self.options, self.visited
+        slots = SLOTS
+        total = self.total
+        choice = self.rng.choice
+        warnsdorff = self.warnsdorff if self.order == WARNSDORFF else None
+        broken_rule, pruned = (self.broken_rule if self.prune else None), self.pruned
+
+        depth = len(path)
+        nodes, backtracks = self.nodes, self.backtracks
+        limit = -1 if max_backtracks is None else backtracks + max_backtracks
+
+        while depth < total:
+            head = path[-1]
+            mask = options[head]
+
+            # stuck, go back and try another direction
+            if not mask:
+                if depth == 1:
+                    break
+                if backtracks == limit:
+                    self.nodes, self.backtracks = nodes, backtracks
+                    return None
+                self.pop()
+                depth -= 1
+                backtracks += 1
+                continue
+
+            slot = warnsdorff(head, mask) if warnsdorff else choice(slots[mask])
+            options[head] = mask & ~(1 << slot)
+            i = offsets[head] + slot
+            next_cell = targets[i]
+            if visited[next_cell]:
+                continue
+
+            self.push(next_cell, back[i])
+            if broken_rule:
+                rule = broken_rule(next_cell)
+                if rule is not None:
+                    self.pop()
+                    pruned[rule] += 1
+                    continue
+            depth += 1
+            nodes += 1
+
+        self.nodes, self.backtracks = nodes, backtracks
+        return depth == total
+
+    # the slot of mask whose neighbour has the fewest free neighbours (a random one of them if they tie)
+    def warnsdorff(self, head, mask):
+        targets, offset = self.lattice.targets, self.lattice.offsets[head]
+        free, visited = self.free, self.visited
+
+        best, best_key, rejected = [], None, -1
+        for slot in SLOTS[mask]:
+            neighbour = targets[offset + slot]
+            if visited[neighbour]:
+                rejected = slot
+                continue
+            key = free[neighbour]
+            if best_key is None or key < best_key:
+                best, best_key = [slot], key
+            elif key == best_key:
+                best.append(slot)
+
+        if not best:
+            return rejected
+        return best[0] if len(best) == 1 else self.rng.choice(best)
+
+    # the same rules as Walker.broken_rule, without an end
+    def broken_rule(self, head):
+        remaining = self.total - len(self.path)
+        if not remaining:
+            return None
+        lattice = self.lattice
+        targets, offsets = lattice.targets, lattice.offsets
+        free, visited = self.free, self.visited
+
+        next_to_head = [targets[i] for i in range(offsets[head], offsets[head + 1]) if not visited[targets[i]]]
+        if DEAD_END in self.prune:
+            if self.zeros and remaining > 1:
+                return DEAD_END
+            if self.ones - sum(1 for cell in next_to_head if free[cell] == 1) > 1:
+                return DEAD_END
+        if CONNECTIVITY in self.prune and len(next_to_head) > 1 and not self.connected(next_to_head):
+            return CONNECTIVITY
+        return None
+
+    # the flood fills of Walker.connected, taking turns with a limit that grows
+    def connected(self, cells):
+        limit = 16
+        while True:
+            for start in cells:
+                found = self.flood_fill(start, cells, limit)
+                if found is not None:
+                    return found
+            limit *= 4
+
+    def flood_fill(self, start, cells, limit):
+        lattice = self.lattice
+        targets, offsets = lattice.targets, lattice.offsets
+        visited, seen = self.visited, self.seen
+        self.generation += 1
+        generation = self.generation
+
+        seen[start] = generation
+        missing = len(cells) - 1
+        queue = [start]
+        i = 0
+        while i < len(queue):
+            if i == limit:
+                return None
+            cell = queue[i]
+            i += 1
+            for j in range(offsets[cell], offsets[cell + 1]):
+                neighbour = targets[j]
+                if not visited[neighbour] and seen[neighbour] != generation:
+                    seen[neighbour] = generation
+                    if neighbour in cells:
+                        missing -= 1
+                        if not missing:
+                            return True
+                    queue.append(neighbour)
+        return False
+
+
+# a random free cell that can be the first spot as far as check() can tell: one of the cells with only
+# one neighbour if there are any, or a cell of the colour that has more free cells
+def random_start(lattice, rng):
+    free = [cell for cell in range(lattice.size) if not lattice.blocked[cell]]
+    if not free:
+        raise ValueError("every cell of the lattice is blocked")
+    ends = [cell for cell in free if lattice.offsets[cell + 1] - lattice.offsets[cell] == 1]
+    if ends:
+        return rng.choice(ends)
+    colour = lattice.colour
+    if colour is not None:
+        ones = sum(colour[cell] for cell in free)
+        if 2 * ones != len(free):
+            more = int(2 * ones > len(free))
+            free = [cell for cell in free if colour[cell] == more]
+    return rng.choice(free)
+
+
+class LatticeStrategy(LatticeWalker):
+    def __init__(self, rows, cols, start, rng, kind="square", obstacles=(), prune=(), order=RANDOM):
+        if kind not in GRID_LATTICES:
+            raise ValueError("unknown lattice %r, choose from %s" % (kind, ", ".join(GRID_LATTICES)))
+        lattice = LATTICES[kind](rows, cols, [tuple(position) for position in obstacles])
+        if start is None:
+            start = lattice.positions[random_start(lattice, rng)]
+        elif not (0 <= start[0] < cols and 0 <= start[1] < rows):
+            raise ValueError("start %r is outside of the %d x %d grid" % (tuple(start), rows, cols))
+        self.start = tuple(start)
+        LatticeWalker.__init__(self, lattice, lattice.cell(start), rng, prune, order)
+
+
+# SLOTS[mask] -> the slots in an 8-bit mask, like MASK_DIRECTIONS
+SLOTS = tuple(tuple(slot for slot in range(8) if mask >> slot & 1) for mask in range(256))
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m saw.lattice",
+                                     description="Find a self-avoiding path that fills a lattice.")
+    parser.add_argument("kind", choices=sorted(LATTICES))
+    parser.add_argument("size", type=int, nargs="+", help="ROWS COLS, or DEPTH ROWS COLS for cubic")
+    parser.add_argument("--start", type=int, nargs="+", metavar="COORD", help="position of the first spot")
+    parser.add_argument("--obstacle", type=int, nargs="+", action="append", default=[], metavar="COORD",
+                        help="position of a blocked cell, can be given many times")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--prune", nargs="+", choices=LATTICE_RULES, default=[], metavar="RULE")
+    parser.add_argument("--order", choices=MOVE_ORDERS, default=RANDOM)
+    parser.add_argument("--max-backtracks", type=int, help="give up after this many backtracks")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    dimensions = 3 if args.kind == "cubic" else 2
+    try:
+        if len(args.size) != dimensions:
+            raise ValueError("a %s lattice needs %d sizes" % (args.kind, dimensions))
+        if min(args.size) < 1:
+            raise ValueError("every size has to be at least 1")
+        for position in args.obstacle + ([args.start] if args.start else []):
+            if len(position) != dimensions:
+                raise ValueError("a position on a %s lattice has %d coordinates" % (args.kind, dimensions))
+        lattice = LATTICES[args.kind](*args.size, obstacles=[tuple(o) for o in args.obstacle])
+
+        rng = random.Random(args.seed)
+        if args.start:
+            start = lattice.cell(args.start)
+        else:
+            start = rng.choice([cell for cell in range(lattice.size) if not lattice.blocked[cell]])
+        walker = LatticeWalker(lattice, start, rng, args.prune, args.order)
+    except ValueError as error:
+        print("error: %s" % error, file=sys.stderr)
+        return 2
+
+    started = time.perf_counter()
+    found = walker.run(args.max_backtracks)
+    print(json.dumps({
+        "lattice": args.kind,
+        "size": args.size,
+        "obstacles": args.obstacle,
+        "start": list(lattice.positions[start]),
+        "seed": args.seed,
+        "order": args.order,
+        "seconds": time.perf_counter() - started,
+        "nodes": walker.nodes,
+        "backtracks": walker.backtracks,
+        "pruned": walker.pruned,
+        "path": [list(position) for position in walker.cells()] if found else None,
+    }))
+    return 0 if found else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
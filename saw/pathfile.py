@@ -0,0 +1,267 @@
+# A compact file of paths - a header and then every path as its directions, 2 bits per step
+#
+# Every step of a path is one of the 4 DIRECTIONS, so it fits into 2 bits and a path of a
+# 100 x 100 grid takes 2500 bytes instead of the ~100 KB of its JSON. All of the paths of a file
+# have the same number of steps, so every path takes the same number of bytes and the k-th one
+# starts at HEADER.size + k * record_size, it can be read without reading the ones before it.
+#
+# Header (little endian, HEADER.size = 24 bytes)
+#   - MAGIC (4 bytes), VERSION (1 byte), 3 bytes of padding
+#   - rows, cols -> the grid (uint32), both 0 for walks on the whole lattice (like batch.py's),
+#                   whose spots are relative to their first spot at (0, 0)
+#   - start -> the cell id (grid_y * cols + grid_x) of the first spot of every path (int32),
+#              or -1 if every path has its own first spot
+#   - steps -> the number of steps of every path (uint32)
+#
+# Then one record per path
+#   - the cell id of its first spot (uint32), only if start is -1
+#   - its directions, 4 in a byte (the first one in the lowest 2 bits), the last byte is padded with 0.
+#     A path without steps (of a 1 x 1 grid) with the start in the header is a single 0 byte, so
+#     every record has at least one byte
+#
+# There is no count in the header, the file has as many paths as fit after it, so a writer can
+# add paths to the end of a file that already has some.
+#
+# 1. PathWriter(name, rows, cols, start=None, steps=None, append=False)
+#   - steps -> rows * cols - 1 (paths that fill the grid) if it is None
+#   - writer.write(path) -> adds a path (a list of (grid_x, grid_y)), it raises ValueError if it
+#     doesn't have `steps` steps, doesn't start at start or its spots are not next to each other
+#   - writer.write_directions(directions, start=None) -> adds a path given as indices into
+#     DIRECTIONS (a list, bytes or a row of batch.Walks.directions)
+#   - writer.count -> how many paths the file has now
+#   - with append=True the paths are added to the end of the file (its header has to match)
+#
+# 2. PathReader(name)
+#   - maps the file into memory (mmap), so it only reads the pages of the paths that are used
+#   - len(reader), reader[k] -> the k-th path as a list of (grid_x, grid_y), for k in reader
+#   - reader.directions(k), reader.start(k) -> the k-th path as its directions and first spot
+#
+# Both are context managers that close the file.
+#
+# python -m saw.pathfile FILE [--index K ...]
+#   - prints the header and the number of paths as JSON, and the paths at --index, one per line
+
+import argparse
+import itertools
+import json
+import mmap
+import os
+import struct
+import sys
+
+from .grid import DIRECTIONS
+
+MAGIC = b"SAWP"
+VERSION = 1
+HEADER = struct.Struct("<4sB3xIIiI")
+START = struct.Struct("<I")
+
+DIRECTION_INDEX = {direction: d for d, direction in enumerate(DIRECTIONS)}
+
+# the 4 directions in each byte
+UNPACK = tuple(tuple(byte >> shift & 3 for shift in (0, 2, 4, 6)) for byte in range(256))
+
+
+def pack(directions):
+    directions = bytes(directions)
+    padded = directions + bytes(-len(directions) % 4)
+    return bytes(a | b << 2 | c << 4 | d << 6
+                 for a, b, c, d in zip(padded[0::4], padded[1::4], padded[2::4], padded[3::4]))
+
+
+def unpack(data, steps):
+    directions = list(itertools.chain.from_iterable(map(UNPACK.__getitem__, data)))
+    del directions[steps:]
+    return directions
+
+
+def spots(start, directions):
+    x, y = start
+    path = [(x, y)]
+    for d in directions:
+        dx, dy = DIRECTIONS[d]
+        x += dx
+        y += dy
+        path.append((x, y))
+    return path
+
+
+def directions_of(path):
+    try:
+        return [DIRECTION_INDEX[(b[0] - a[0], b[1] - a[1])] for a, b in zip(path, path[1:])]
+    except KeyError:
+        raise ValueError("the spots of a path have to be next to each other") from None
+
+
+def read_header(file):
+    data = file.read(HEADER.size)
+    if len(data) != HEADER.size:
+        raise ValueError("%s is too short to be a path file" % file.name)
+    magic, version, rows, cols, start, steps = HEADER.unpack(data)
+    if magic != MAGIC:
+        raise ValueError("%s is not a path file" % file.name)
+    if version != VERSION:
+        raise ValueError("%s has version %d, only version %d can be read" % (file.name, version, VERSION))
+    return rows, cols, start, steps
+
+
+def record_size(start, steps):
+    return max(1, (START.size if start < 0 else 0) + (steps + 3) // 4)
+
+
+class PathWriter:
+    def __init__(self, name, rows, cols, start=None, steps=None, append=False):
+        if rows < 0 or cols < 0 or (rows == 0) != (cols == 0):
+            raise ValueError("rows and cols have to be positive, or both 0 for walks on the whole lattice")
+        if steps is None:
+            if not rows:
+                raise ValueError("walks on the whole lattice need a number of steps")
+            steps = rows * cols - 1
+        if steps < 0:
+            raise ValueError("steps can't be negative")
+        if start is not None and not rows:
+            raise ValueError("walks on the whole lattice always start at (0, 0)")
+        if start is not None and not (0 <= start[0] < cols and 0 <= start[1] < rows):
+            raise ValueError("start %r is outside of the %d x %d grid" % (tuple(start), rows, cols))
+        self.rows = rows
+        self.cols = cols
+        self.start = None if start is None else tuple(start)
+        self.steps = steps
+        header_start = -1 if start is None else start[1] * cols + start[0]
+        # walks on the whole lattice all start at (0, 0), so they don't need a start
+        if not rows:
+            header_start = 0
+        self.size = record_size(header_start, steps)
+
+        if append and os.path.exists(name) and os.path.getsize(name):
+            with open(name, "rb") as file:
+                header = read_header(file)
+            if header != (rows, cols, header_start, steps):
+                raise ValueError("%s has the paths of another grid, start or number of steps" % name)
+            self.count = (os.path.getsize(name) - HEADER.size) // self.size
+            self.file = open(name, "r+b")
+            # a path that was only written partly is overwritten
+            self.file.truncate(HEADER.size + self.count * self.size)
+            self.file.seek(0, os.SEEK_END)
+        else:
+            self.count = 0
+            self.file = open(name, "wb")
+            self.file.write(HEADER.pack(MAGIC, VERSION, rows, cols, header_start, steps))
+        self.own_start = header_start < 0
+
+    def write(self, path):
+        if not path:
+            raise ValueError("a path needs at least one spot")
+        start = tuple(path[0])
+        if self.start is not None and start != self.start:
+            raise ValueError("every path of this file starts at %r, not %r" % (self.start, start))
+        if self.rows and any(not (0 <= x < self.cols and 0 <= y < self.rows) for x, y in path):
+            raise ValueError("a spot of the path is outside of the %d x %d grid" % (self.rows, self.cols))
+        self.write_directions(directions_of(path), start)
+
+    def write_directions(self, directions, start=None):
+        directions = bytes(directions)
+        if len(directions) != self.steps:
+            raise ValueError("every path of this file has %d steps, not %d" % (self.steps, len(directions)))
+        if max(directions, default=0) > 3:
+            raise ValueError("a direction has to be 0, 1, 2 or 3 (an index into DIRECTIONS)")
+        if self.own_start:
+            if start is None:
+                raise ValueError("every path of this file needs its own start")
+            if not (0 <= start[0] < self.cols and 0 <= start[1] < self.rows):
+                raise ValueError("start %r is outside of the %d x %d grid" % (tuple(start), self.rows, self.cols))
+            self.file.write(START.pack(start[1] * self.cols + start[0]))
+        data = pack(directions)
+        if not data and not self.own_start:
+            # a record has at least one byte
+            data = bytes(1)
+        self.file.write(data)
+        self.count += 1
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PathReader:
+    def __init__(self, name):
+        with open(name, "rb") as file:
+            self.rows, self.cols, header_start, self.steps = read_header(file)
+            self.size = record_size(header_start, self.steps)
+            length = os.path.getsize(name)
+            self.count = (length - HEADER.size) // self.size
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if self.count else None
+        self.own_start = header_start < 0
+        self.header_start = header_start
+
+    def __len__(self):
+        return self.count
+
+    def offset(self, k):
+        if k < 0:
+            k += self.count
+        if not 0 <= k < self.count:
+            raise IndexError("path index out of range")
+        return HEADER.size + k * self.size
+
+    def start(self, k):
+        cell = START.unpack_from(self.map, self.offset(k))[0] if self.own_start else self.header_start
+        return (cell % self.cols, cell // self.cols) if self.cols else (0, 0)
+
+    def directions(self, k):
+        offset = self.offset(k) + (START.size if self.own_start else 0)
+        return unpack(self.map[offset:offset + (self.steps + 3) // 4], self.steps)
+
+    def __getitem__(self, k):
+        return spots(self.start(k), self.directions(k))
+
+    def __iter__(self):
+        for k in range(self.count):
+            yield self[k]
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m saw.pathfile", description="Show the paths of a path file.")
+    parser.add_argument("file")
+    parser.add_argument("--index", type=int, nargs="+", default=[], metavar="K", help="print the K-th path")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        with PathReader(args.file) as reader:
+            print(json.dumps({
+                "rows": reader.rows,
+                "cols": reader.cols,
+                "start": None if reader.own_start else list(reader.start(0)),
+                "steps": reader.steps,
+                "paths": len(reader),
+                "bytes_per_path": reader.size,
+            }))
+            for k in args.index:
+                print(json.dumps([list(spot) for spot in reader[k]]))
+    except (OSError, ValueError, IndexError) as error:
+        print("error: %s" % error, file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+# PivotWalk(steps, rng) - long random self-avoiding walks on the whole (unbounded) square lattice
+#
+# The other strategies fill a rows x cols grid. This one is the pivot algorithm of Madras and Sokal:
+# a walk of `steps` steps starts as a straight line (made of DIRECTIONS steps) and every attempt
+#   1. chooses a random spot of the walk (the pivot) and a random symmetry of the lattice
+#      (a rotation by 90, 180 or 270 degrees or one of the 4 reflections)
+#   2. applies the symmetry around the pivot to the part of the walk on one side of it
+#   3. keeps the new walk if it is still self-avoiding, otherwise keeps the old one
+# Both sides give the same walk up to where it is, so it always moves the shorter one.
+#
+# occupied is a dict from a spot (as one int, see key) to its index in the walk, so checking a new
+# spot is one lookup. The new spots are checked starting next to the pivot, where the walk usually
+# hits itself, so most rejected attempts only look at a few spots instead of the whole walk.
+#
+# 1. walk.attempt() -> one attempt, returns True if the walk has changed
+# 2. walk.run(attempts) -> that many attempts, returns how many changed the walk
+# 3. walk.end_to_end() -> the squared distance between the first and the last spot of the walk
+# 4. walk.cells() -> the (x, y) position of each spot of the walk
+# 5. walk.attempts, walk.accepted, walk.acceptance -> how many attempts changed the walk
+#
+# sample(walk, samples, every=1)
+#   - makes samples * every attempts and returns end_to_end() after every `every` of them
+#
+# autocorrelation_time(series, c=6)
+#   - the integrated autocorrelation time of the series (in samples) with Sokal's window:
+#     the sum of the autocorrelations up to the first window M >= c * tau
+#   - it returns (tau, M), M is None if the series is too short for the window (then tau is
+#     too small, make the run longer). Samples that are about 2 * tau apart are independent,
+#     so a burn-in of about 20 * tau attempts is enough
+#
+# python -m saw.pivot STEPS [--attempts N] [--burn-in N] [--every N] [--seed SEED]
+#   - prints the acceptance rate, the mean squared end-to-end distance and its autocorrelation as JSON
+
+import argparse
+import json
+import math
+import random
+import sys
+import time
+from array import array
+from collections import deque
+from operator import add
+
+from .grid import DIRECTIONS
+
+# (a, b, c, d) -> (x, y) becomes (a * x + b * y, c * x + d * y)
+SYMMETRIES = (
+    (0, -1, 1, 0),  # rotate by 90 degrees
+    (-1, 0, 0, -1),  # 180
+    (0, 1, -1, 0),  # 270
+    (-1, 0, 0, 1),  # reflect x
+    (1, 0, 0, -1),  # reflect y
+    (0, 1, 1, 0),  # reflect on the diagonal
+    (0, -1, -1, 0),  # and on the other diagonal
+)
+
+
+SHIFT = 1 << 32
+
+
+# one int for a spot, y is always between -2 ** 31 and 2 ** 31 so two spots never have the same key
+def key(x, y):
+    return x * SHIFT + y
+
+
+class PivotWalk:
+    def __init__(self, steps, rng):
+        if steps < 1:
+            raise ValueError("the walk needs at least one step")
+        self.steps = steps
+        self.rng = rng
+
+        dx, dy = DIRECTIONS[1]
+        self.xs = array("q", (i * dx for i in range(steps + 1)))
+        self.ys = array("q", (i * dy for i in range(steps + 1)))
+        self.keys = array("q", (key(x, y) for x, y in zip(self.xs, self.ys)))
+        self.occupied = {k: i for i, k in enumerate(self.keys)}
+
+        self.attempts = 0
+        self.accepted = 0
+
+    @property
+    def acceptance(self):
+        return self.accepted / self.attempts if self.attempts else 0.0
+
+    def cells(self):
+        return list(zip(self.xs, self.ys))
+
+    def end_to_end(self):
+        dx = self.xs[-1] - self.xs[0]
+        dy = self.ys[-1] - self.ys[0]
+        return dx * dx + dy * dy
+
+    def attempt(self):
+        self.attempts += 1
+        steps = self.steps
+        if steps < 2:
+            return False
+
+        rng = self.rng
+        pivot = rng.randrange(1, steps)
+        a, b, c, d = SYMMETRIES[rng.randrange(7)]
+        xs, ys, keys, occupied = self.xs, self.ys, self.keys, self.occupied
+        px, py = xs[pivot], ys[pivot]
+
+        # every symmetry takes x or y (times 1 or -1) to each coordinate, so a spot moves with
+        # bound methods of ints, which map calls without running any python code per spot
+        ox, oy = px - a * px - b * py, py - c * px - d * py
+        move_x = ox.__add__ if a + b > 0 else ox.__sub__
+        move_y = oy.__add__ if c + d > 0 else oy.__sub__
+
+        # the spots after the pivot move and the ones up to it stay, or the other way around.
+        # The moving spots are checked in chunks going away from the pivot (each twice as big as
+        # the one before), so a walk that hits itself near the pivot is rejected early
+        after = pivot >= steps // 2
+        chunks = []
+        size, i = 16, pivot
+        while (i < steps) if after else (i > 0):
+            start, end = (i + 1, min(i + 1 + size, steps + 1)) if after else (max(i - size, 0), i)
+            nx = list(map(move_x, xs[start:end] if b == 0 else ys[start:end]))
+            ny = list(map(move_y, xs[start:end] if d == 0 else ys[start:end]))
+            nk = list(map(add, map(SHIFT.__mul__, nx), ny))
+            # a spot that is already taken is only a problem if it doesn't move
+            for k in filter(occupied.__contains__, nk):
+                j = occupied[k]
+                if (j <= pivot) if after else (j >= pivot):
+                    return False
+            chunks.append((start, end, nx, ny, nk))
+            i = end - 1 if after else start
+            size *= 2
+
+        # the old spots have to be removed first, a new spot can be an old spot of another index
+        start, end = (pivot + 1, steps + 1) if after else (0, pivot)
+        deque(map(occupied.pop, keys[start:end]), 0)
+        for start, end, nx, ny, nk in chunks:
+            xs[start:end] = array("q", nx)
+            ys[start:end] = array("q", ny)
+            keys[start:end] = array("q", nk)
+            occupied.update(zip(nk, range(start, end)))
+        self.accepted += 1
+        return True
+
+    def run(self, attempts):
+        accepted = self.accepted
+        attempt = self.attempt
+        for _ in range(attempts):
+            attempt()
+        return self.accepted - accepted
+
+
+def sample(walk, samples, every=1):
+    series = []
+    for _ in range(samples):
+        walk.run(every)
+        series.append(walk.end_to_end())
+    return series
+
+
+def autocorrelation_time(series, c=6):
+    n = len(series)
+    mean = sum(series) / n
+    centred = [value - mean for value in series]
+    variance = sum(value * value for value in centred) / n
+    if not variance:
+        return 0.5, 0
+
+    tau = 0.5
+    for t in range(1, n // 2):
+        covariance = sum(x * y for x, y in zip(centred, centred[t:])) / (n - t)
+        tau += covariance / variance
+        if t >= c * tau:
+            return tau, t
+    return tau, None
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m saw.pivot",
+                                     description="Sample long self-avoiding walks with the pivot algorithm.")
+    parser.add_argument("steps", type=int)
+    parser.add_argument("--attempts", type=int, default=100000, help="pivot attempts after the burn-in")
+    parser.add_argument("--burn-in", type=int, default=0, help="pivot attempts before sampling starts")
+    parser.add_argument("--every", type=int, default=10, help="attempts between two samples")
+    parser.add_argument("--seed", type=int)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.steps < 1 or args.attempts < args.every or args.every < 1 or args.burn_in < 0:
+        print("error: steps and every must be at least 1 and attempts at least every", file=sys.stderr)
+        return 2
+
+    walk = PivotWalk(args.steps, random.Random(args.seed))
+    started = time.perf_counter()
+    walk.run(args.burn_in)
+    burn_in = walk.acceptance
+
+    walk.attempts = walk.accepted = 0
+    series = sample(walk, args.attempts // args.every, args.every)
+    seconds = time.perf_counter() - started
+
+    tau, window = autocorrelation_time(series)
+    mean = sum(series) / len(series)
+    variance = sum((value - mean) ** 2 for value in series) / len(series)
+    print(json.dumps({
+        "steps": args.steps,
+        "seed": args.seed,
+        "burn_in": args.burn_in,
+        "attempts": walk.attempts,
+        "seconds": seconds,
+        "burn_in_acceptance": burn_in,
+        "acceptance": walk.acceptance,
+        "mean_end_to_end": mean,
+        # the error of the mean is larger than with independent samples by a factor of sqrt(2 * tau)
+        "mean_end_to_end_error": math.sqrt(2 * tau * variance / len(series)),
+        "autocorrelation_time": tau * args.every,
+        "autocorrelation_window": None if window is None else window * args.every,
+    }))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
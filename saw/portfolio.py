@@ -0,0 +1,114 @@
+# portfolio(rows, cols, start=None, seed=None, strategy="array", workers=None, restart_unit=None,
+#           timeout=None, **options)
+#   - runs `workers` searches with different seeds (but the same start) in their own processes,
+#     returns the Solution of the first one that finds a path and stops all of the others
+#   - workers -> how many processes, the number of cores if it is None
+#   - restart_unit -> with restarts, a search gives up after restart_unit * luby(i) backtracks
+#                     (its i-th try) and starts again with a new seed, without restarts it goes on
+#                     until it finds a path
+#   - timeout -> seconds until every search is stopped, then the Solution has no path
+#   - options -> options of the array strategy (the only one whose search can be stopped and resumed)
+#
+# How long a search takes depends a lot on the first random choices, the ones that go wrong early
+# can take minutes while another seed takes milliseconds. Running many seeds at once (and
+# restarting the ones that take long) makes the bad luck of one seed matter much less.
+#
+# The workers check a multiprocessing Event every POLL backtracks or POLL nodes, whichever comes
+# first (walker.run(max_backtracks, max_nodes) can be continued, and a search on a big grid may hardly
+# ever backtrack), when the first path has been found or the timeout is over it is set and they all
+# return.
+#
+# luby(i) -> 1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8, ... the restart schedule of Luby et al.,
+#            it is never much worse than the best fixed budget
+
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from .solver import Solution, make_walker
+
+POLL = 1000
+
+# the Event of the portfolio in a worker process
+stop = None
+
+
+def share(event):
+    global stop
+    stop = event
+
+
+def luby(i):
+    while True:
+        k = i.bit_length()
+        if i == (1 << k) - 1:
+            return 1 << (k - 1)
+        i -= (1 << (k - 1)) - 1
+
+
+# one worker, returns (found, path, nodes, backtracks, restarts, pruned),
+# found is True if it found a path, False if there is none and None if it was stopped
+def search(rows, cols, start, seed, restart_unit, options):
+    rng = random.Random(seed)
+    nodes = backtracks = restarts = 0
+    pruned = {}
+    while True:
+        walker = make_walker(rows, cols, start, rng.getrandbits(64), "array", **options)[0]
+        budget = None if restart_unit is None else restart_unit * luby(restarts + 1)
+
+        found = None
+        while not stop.is_set():
+            chunk = POLL if budget is None else min(POLL, budget - walker.backtracks)
+            found = walker.run(chunk, POLL)
+            if found is not None or (budget is not None and walker.backtracks >= budget):
+                break
+
+        nodes += walker.nodes
+        backtracks += walker.backtracks
+        for rule, count in walker.pruned.items():
+            pruned[rule] = pruned.get(rule, 0) + count
+        if found is not None or stop.is_set():
+            path = walker.cells() if found else None
+            return found, path, nodes, backtracks, restarts, pruned
+        restarts += 1
+
+
+def portfolio(rows, cols, start=None, seed=None, strategy="array", workers=None, restart_unit=None,
+              timeout=None, **options):
+    if strategy != "array":
+        raise ValueError("only the array strategy can run in a portfolio")
+    if workers is not None and workers < 1:
+        raise ValueError("a portfolio needs at least one worker")
+    if restart_unit is not None and restart_unit < 1:
+        raise ValueError("restart_unit has to be at least 1")
+    workers = workers or os.cpu_count() or 1
+
+    # the same checks as solve, and every worker gets the same start
+    start = make_walker(rows, cols, start, seed, strategy, **options)[1]
+    rng = random.Random(seed)
+    seeds = [rng.getrandbits(64) for _ in range(workers)]
+
+    context = multiprocessing.get_context()
+    event = context.Event()
+    started = time.perf_counter()
+    result = None
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=share, initargs=(event,)) as pool:
+        pending = {pool.submit(search, rows, cols, start, s, restart_unit, options) for s in seeds}
+        while pending and result is None:
+            left = None if timeout is None else max(0, started + timeout - time.perf_counter())
+            done, pending = wait(pending, timeout=left, return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.result()[0] is not None:
+                    result = future.result()
+                    break
+        event.set()
+    seconds = time.perf_counter() - started
+
+    found, path, nodes, backtracks, restarts, pruned = result or (None, None, 0, 0, 0, {})
+    end = options.get("end")
+    end = None if end is None else tuple(end)
+    return Solution(rows, cols, start, seed, strategy, path, nodes, backtracks, seconds, pruned, end, restarts)
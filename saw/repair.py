@@ -0,0 +1,627 @@
+# repair(lattice, path, changed, rng=None, radius=1, max_radius=4, budget=5000) - a path that
+# filled the lattice before it changed, changed as little as possible so it fills the lattice again
+#
+# The scripts start again from a new random spot when anything changes. But when a cell gets
+# blocked or rows and columns are added, most of the old path is still fine: only the spots near
+# the change have to go somewhere else. lattice is the lattice after the change (see lattice.py, a
+# blocked cell is an obstacle, a grid with more rows or columns is a bigger square lattice), path is
+# the old path as positions and changed has the positions of every cell that was blocked or added.
+#
+# The damage is the spots of the path next to the ones that are blocked now, and the new cells. The
+# path is only looked at where it goes through a region around the damage: the parts of it outside
+# of the region are kept as they are and are only found by where their ends are in the path, so the
+# tiers cost as much as their region is big (and the path is converted to cell ids and back once).
+#
+# 1. window -> the region is every cell at most r steps away from the damage, r grows by one from
+#              radius up to max_radius. For every r
+#                - backbite: the pieces of the path in the region are joined by moving their ends
+#                            (see Pieces.join), the parts outside of the region don't change
+#                - search: the parts of the path in the region are searched again, between two kept
+#                          parts there has to be a new part that starts next to the end of the first
+#                          one and ends next to the start of the other one, a part before the first
+#                          kept part or after the last one can end anywhere, and together they have to
+#                          visit every cell of the region (see search)
+#              a window gets at most (its number of cells)^2 moves or nodes, so a small window that
+#              can't be repaired gives up early
+# 2. corridor -> on a lattice with colours (see Lattice.colour) every step changes the colour and the
+#                colour of an end never changes, so after a single cell is blocked the end of the
+#                path with the wrong colour has to move, no window around the damage can repair it.
+#                The region then also has the cells next to a shortest way from the damage to the
+#                closer end of the path (or the other one, or both), the way is as long as the end
+#                is far away, not as long as the lattice is
+# 3. solve -> a LatticeWalker of the whole lattice that gives up after budget backtracks
+#
+# The backbites of the windows together make at most budget moves and the searches add at most budget
+# spots, the corridor has budget moves of its own. It returns a Repair:
+#   - path -> the new path as positions or None (the search of the solve tier gave up)
+#   - tier -> "none" (nothing changed), "backbite", "search", "corridor" or "solve"
+#   - radius, region -> the radius and the number of cells of the region that worked
+#   - nodes -> the backbite moves and the spots added by the searches, seconds -> how long it took
+#
+# python -m saw.repair ROWS COLS [--seed SEED] [--block X Y ...] [--add-rows N] [--add-cols N]
+#                      [--radius R] [--max-radius R] [--budget NODES]
+#   - finds a path of the grid, then blocks the cells and/or adds rows and columns (at the bottom and
+#     the right) and repairs the path, prints the Repair as JSON and how long a new search took
+
+import argparse
+import json
+import random
+import sys
+import time
+
+from .lattice import LatticeWalker, square
+from .solver import solve
+from .walker import CONNECTIVITY, DEAD_END, WARNSDORFF
+
+
+class Repair:
+    def __init__(self, path, tier, radius=0, region=0, nodes=0, seconds=0.0):
+        self.path = path
+        self.tier = tier
+        self.radius = radius
+        self.region = region
+        self.nodes = nodes
+        self.seconds = seconds
+
+    def as_dict(self):
+        return {
+            "tier": self.tier,
+            "radius": self.radius,
+            "region": self.region,
+            "nodes": self.nodes,
+            "seconds": self.seconds,
+            "path": None if self.path is None else [list(spot) for spot in self.path],
+        }
+
+
+def repair(lattice, path, changed, rng=None, radius=1, max_radius=4, budget=5000):
+    if radius < 0 or max_radius < radius or budget < 1:
+        raise ValueError("radius can't be negative or bigger than max_radius and budget has to be at least 1")
+    started = time.perf_counter()
+    rng = rng or random.Random()
+    blocked = lattice.blocked
+    positions = lattice.positions
+
+    if not path:
+        raise ValueError("there is no path to repair")
+    index = lattice.index
+    try:
+        cells = [index[tuple(spot)] for spot in path]
+    except KeyError:
+        raise ValueError("the path has a spot outside of the lattice")
+    # where every cell is in the path
+    where = dict(zip(cells, range(len(cells))))
+    if len(where) != len(cells):
+        raise ValueError("the path visits a spot twice")
+
+    # the spots of the path that are blocked now, and the cells that are new
+    removed = set()
+    damage = set()
+    for spot in changed:
+        cell = lattice.cell(spot)
+        i = where.get(cell)
+        if blocked[cell]:
+            if i is not None:
+                removed.add(i)
+        elif i is None:
+            damage.add(cell)
+    if len(cells) - len(removed) + len(damage) != lattice.free:
+        raise ValueError("changed has to have every cell that was blocked or added since the path was found")
+    if not removed and not damage:
+        return Repair(list(path), "none", seconds=time.perf_counter() - started)
+    for i in removed:
+        damage.update(cells[j] for j in (i - 1, i + 1) if 0 <= j < len(cells) and j not in removed)
+    ends = [cell for i, cell in ((0, cells[0]), (len(cells) - 1, cells[-1])) if i not in removed]
+    if not damage:
+        return full_solve(lattice, ends, rng, budget, started)
+
+    # backbite moves and nodes of the searches
+    moves = nodes = 0
+    for r in range(radius, max_radius + 1):
+        region = ball(lattice, damage, r)
+        parts = kept_parts(cells, where, removed, region)
+        pieces = Pieces(lattice, cells, where, parts, region)
+        # a small window that can't be repaired gives up early
+        limit = len(region) ** 2
+        if moves < budget and pieces.joinable():
+            found, count = pieces.join(rng, min(limit, budget - moves))
+            moves += count
+            if found is not None:
+                return Repair([positions[cell] for cell in found], "backbite", r, len(region), moves + nodes,
+                              time.perf_counter() - started)
+        if nodes < budget:
+            found, count = reroute(lattice, cells, parts, region, rng, min(limit, budget - nodes))
+            nodes += count
+            if found is not None:
+                return Repair([positions[cell] for cell in found], "search", r, len(region), moves + nodes,
+                              time.perf_counter() - started)
+
+    # the ends of the pieces in the window can't be joined when an end of the path has to move, then
+    # the window gets a corridor to the closest end of the path (or to both)
+    corridors = sorted((way for way in (corridor(lattice, damage, end) for end in ends) if way), key=len)
+    for extra in [[way] for way in corridors] + ([corridors] if len(corridors) == 2 else []):
+        region = ball(lattice, damage, max_radius)
+        for way in extra:
+            region |= ball(lattice, way, 2)
+        pieces = Pieces(lattice, cells, where, kept_parts(cells, where, removed, region), region)
+        if not pieces.joinable():
+            continue
+        found, count = pieces.join(rng, budget)
+        moves += count
+        if found is not None:
+            return Repair([positions[cell] for cell in found], "corridor", max_radius, len(region), moves + nodes,
+                          time.perf_counter() - started)
+        break
+
+    result = full_solve(lattice, ends, rng, budget, started)
+    result.nodes += moves + nodes
+    return result
+
+
+# a LatticeWalker of the whole lattice that gives up after budget backtracks. It starts from the
+# first of starts a path is possible from, or from a cell with one neighbour (it has to be an end),
+# or from any cell of the colour there are more of (see lattice.check)
+def full_solve(lattice, starts, rng, budget, started):
+    free = [cell for cell in range(lattice.size) if not lattice.blocked[cell]]
+    if not free:
+        raise ValueError("every cell of the lattice is blocked")
+    if len(ball(lattice, free[:1], lattice.size)) != lattice.free:
+        raise ValueError("the free cells of the lattice are not connected")
+    offsets = lattice.offsets
+    ones = [cell for cell in free if offsets[cell + 1] - offsets[cell] == 1]
+    colour = lattice.colour
+    if colour is not None:
+        counts = [0, 0]
+        for cell in free:
+            counts[colour[cell]] += 1
+        if counts[0] != counts[1]:
+            free = [cell for cell in free if counts[colour[cell]] > counts[colour[cell] ^ 1]]
+
+    error = None
+    for cell in ones or list(starts) + free:
+        try:
+            walker = LatticeWalker(lattice, cell, rng, (DEAD_END, CONNECTIVITY), WARNSDORFF)
+        except ValueError as reason:
+            error = error or reason
+            continue
+        found = walker.run(budget)
+        path = walker.cells() if found else None
+        return Repair(path, "solve", 0, lattice.free, walker.nodes, time.perf_counter() - started)
+    raise error
+
+
+# every cell that is at most radius steps away from one of cells
+def ball(lattice, cells, radius):
+    region = set(cells)
+    layer = list(cells)
+    for _ in range(radius):
+        after = []
+        for cell in layer:
+            for neighbour in lattice.neighbours(cell):
+                if neighbour not in region:
+                    region.add(neighbour)
+                    after.append(neighbour)
+        layer = after
+        if not layer:
+            break
+    return region
+
+
+# the cells of a shortest way from the damage to end (an end of the path), or None if end is damaged
+def corridor(lattice, damage, end):
+    if end in damage:
+        return None
+    before = dict.fromkeys(damage)
+    queue = list(damage)
+    for cell in queue:
+        for neighbour in lattice.neighbours(cell):
+            if neighbour not in before:
+                before[neighbour] = cell
+                if neighbour == end:
+                    way = []
+                    while neighbour is not None:
+                        way.append(neighbour)
+                        neighbour = before[neighbour]
+                    return way
+                queue.append(neighbour)
+    return None
+
+
+# the parts of the path that are kept when region is searched again, as (first, stop) ranges of
+# indices of cells. Only the cells of region (and the removed spots) are looked at, the parts in
+# between are whatever the path has there
+def kept_parts(cells, where, removed, region):
+    gone = sorted([where[cell] for cell in region if cell in where] + list(removed))
+    parts = []
+    first = 0
+    for i in gone:
+        if i > first:
+            parts.append((first, i))
+        first = i + 1
+    if first < len(cells):
+        parts.append((first, len(cells)))
+    return parts
+
+
+# the pieces of the path in a region: the cells of the region with the edges of the path between
+# them, the kept parts outside of the region stay as they are (they are links between the cells of
+# the region at their ends, or lead to an end of the path)
+class Pieces:
+    def __init__(self, lattice, cells, where, parts, region):
+        self.lattice = lattice
+        self.cells = cells
+        self.parts = parts
+        self.region = region
+        # the cells of the region at both ends of every kept part, None at an end of the path
+        self.sides = [(cells[first - 1] if first else None, cells[stop] if stop < len(cells) else None)
+                      for first, stop in parts]
+
+        # the links of every cell of the region: a cell next to it on the path or -1 - k (the kept part k)
+        links = self.links = {cell: [] for cell in region}
+        for k, (left, right) in enumerate(self.sides):
+            for cell in (left, right):
+                if cell is not None:
+                    links[cell].append(-1 - k)
+        for cell in region:
+            i = where.get(cell)
+            if i is not None and i + 1 < len(cells) and cells[i + 1] in region:
+                links[cell].append(cells[i + 1])
+                links[cells[i + 1]].append(cell)
+
+        # the neighbours of every cell in the region, and the ends in the region (the ones outside of
+        # it can't move)
+        self.near = {cell: [other for other in lattice.neighbours(cell) if other in region] for cell in region}
+        self.ends = set(cell for cell in region if len(links[cell]) < 2)
+        fixed = sum(1 for left, right in self.sides for side in (left, right) if side is None)
+        self.pieces = (fixed + sum(2 - len(links[cell]) for cell in self.ends)) // 2
+
+    # the cells of the piece from end in order, each with the link it was reached by, and the other
+    # end of the piece (None if it is outside of the region)
+    def walk(self, end):
+        links, sides = self.links, self.sides
+        order = {end: None}
+        before, here = None, end
+        while True:
+            link = None
+            for other in links[here]:
+                if other != before:
+                    link = other
+                    break
+            if link is None:
+                return order, here
+            if link < 0:
+                left, right = sides[-1 - link]
+                here, before = (right if left == here else left), link
+                if here is None:
+                    return order, None
+            else:
+                here, before = link, here
+            order[here] = before
+
+    # joining two pieces takes an end of each, and on a lattice with colours ends of different colours
+    # (the colour of an end never changes, see join). Only the ends in the region can move
+    def joinable(self):
+        joins = self.pieces - 1
+        colour = self.lattice.colour
+        counts = [0, 0]
+        for cell in self.ends:
+            counts[colour[cell] if colour is not None else 0] += 2 - len(self.links[cell])
+        if colour is None:
+            return counts[0] >= 2 * joins
+        return min(counts) >= joins
+
+    # backbite moves, at most budget of them, until there is one piece: an end of a piece goes to one
+    # of its neighbours in the region,
+    #   - an end of another piece -> the two pieces become one (this is always taken when it can be)
+    #   - a spot of its own piece -> the edge of that spot towards the end is removed, the spot that
+    #                                was after it is the end now
+    #   - a spot of another piece -> one of the edges of that spot is removed, the spot at its other
+    #                                side is an end now
+    # The move that puts the new end closest to an end it could be joined with is taken (a random one
+    # every fourth move or so, so it doesn't go back and forth), so an end crosses the region in about
+    # as many moves as the region is long. An edge of a kept part is never removed, so the moves only
+    # change the region, and a move costs as much as the region is big. Returns (the path or None, moves)
+    def join(self, rng, budget):
+        links, near, ends = self.links, self.near, self.ends
+        colour = self.lattice.colour
+        # the distances to the last few sets of targets, they only change when one of the ends moves
+        fields = {}
+        moves = 0
+        while self.pieces > 1:
+            if moves == budget:
+                return None, moves
+            moves += 1
+            end = rng.choice(sorted(ends))
+            options = [cell for cell in near[end] if cell not in links[end]]
+            if not options:
+                continue
+            order, other = self.walk(end)
+            joins = [cell for cell in options if len(links[cell]) < 2 and cell not in order]
+            if joins:
+                cell = rng.choice(joins)
+                links[end].append(cell)
+                links[cell].append(end)
+                self.pieces -= 1
+                self.update(end, cell)
+                continue
+
+            # (the cell the end goes to, the edge of it that is removed)
+            choices = []
+            for cell in options:
+                if len(links[cell]) < 2:
+                    # the other end of its own piece
+                    continue
+                cuts = [order[cell]] if cell in order else links[cell]
+                choices.extend((cell, cut) for cut in cuts if cut >= 0)
+            if not choices:
+                continue
+            if rng.random() < 0.75:
+                targets = frozenset(cell for cell in ends if cell != end and cell != other
+                                    and (colour is None or colour[cell] != colour[end]))
+                distance = fields.get(targets)
+                if distance is None:
+                    if len(fields) > 16:
+                        fields.clear()
+                    distance = fields[targets] = self.distances(targets)
+                rng.shuffle(choices)
+                cell, cut = min(choices, key=lambda choice: distance.get(choice[1], len(near)))
+            else:
+                cell, cut = rng.choice(choices)
+            links[cell].remove(cut)
+            links[cut].remove(cell)
+            links[end].append(cell)
+            links[cell].append(end)
+            self.update(end, cell, cut)
+        return self.path(), moves
+
+    def update(self, *cells):
+        for cell in cells:
+            if len(self.links[cell]) < 2:
+                self.ends.add(cell)
+            else:
+                self.ends.discard(cell)
+
+    # how many steps in the region every cell is away from the closest of cells
+    def distances(self, cells):
+        near = self.near
+        distance = dict.fromkeys(cells, 0)
+        queue = list(cells)
+        for cell in queue:
+            steps = distance[cell] + 1
+            for neighbour in near[cell]:
+                if neighbour not in distance:
+                    distance[neighbour] = steps
+                    queue.append(neighbour)
+        return distance
+
+    # the whole path, from an end of it
+    def path(self):
+        links, sides, parts, cells = self.links, self.sides, self.parts, self.cells
+        new = []
+        if parts and parts[0][0] == 0:
+            new.extend(cells[:parts[0][1]])
+            before, here = -1, sides[0][1]
+        else:
+            before, here = None, min(self.ends)
+        while here is not None:
+            new.append(here)
+            after = [link for link in links[here] if link != before]
+            if not after:
+                break
+            link = after[0]
+            if link < 0:
+                first, stop = parts[-1 - link]
+                left, right = sides[-1 - link]
+                if left == here:
+                    new.extend(cells[first:stop])
+                    here = right
+                else:
+                    new.extend(reversed(cells[first:stop]))
+                    here = left
+                before = link
+            else:
+                here, before = link, here
+        return new
+
+
+# the path with the parts inside region searched again (or None) and how many nodes it took
+def reroute(lattice, cells, parts, region, rng, budget):
+    if not parts:
+        return None, 0
+    # (the cell the new part starts next to, the cell it ends next to or None), a part before the
+    # first kept part is searched backwards from it
+    free_start = parts[0][0] > 0
+    free_end = parts[-1][1] < len(cells)
+    segments = []
+    if free_start:
+        segments.append((cells[parts[0][0]], None))
+    segments.extend((cells[a[1] - 1], cells[b[0]]) for a, b in zip(parts, parts[1:]))
+    if free_end:
+        segments.append((cells[parts[-1][1] - 1], None))
+    if not segments or not possible(lattice, segments, region):
+        return None, 0
+
+    filled, nodes = search(lattice, segments, region, rng, budget)
+    if filled is None:
+        return None, nodes
+    new = list(reversed(filled[0])) if free_start else []
+    if free_start:
+        filled = filled[1:]
+    for k, (first, stop) in enumerate(parts):
+        new.extend(cells[first:stop])
+        if k < len(filled):
+            new.extend(filled[k])
+    return new, nodes
+
+
+# on a lattice with colours, a new part from next to a alternates colours, starting with the other
+# colour than a. If it ends next to b it has as many cells of each colour, or one more of the other
+# colour than a if a and b have the same colour. A part that can end anywhere can have either, so
+# together the parts can have a range of colours and the region has to be in it
+def possible(lattice, segments, region):
+    colour = lattice.colour
+    if colour is None:
+        return True
+    # cells of colour 0 minus cells of colour 1
+    have = sum(-1 if colour[cell] else 1 for cell in region)
+    need = more = fewer = 0
+    for a, b in segments:
+        extra = 1 if colour[a] else -1
+        if b is None:
+            if extra > 0:
+                more += 1
+            else:
+                fewer += 1
+        elif colour[a] == colour[b]:
+            need += extra
+    return need - fewer <= have <= need + more
+
+
+# a depth first search of the new parts, one after the other: a part grows from the cell next to
+# its start into the free cells of region (the one with the fewest free neighbours first, like
+# warnsdorff) and is closed when it is next to its end (or anywhere, if it doesn't have one).
+# A move is dropped when it leaves free cells that no part can visit anymore (see cut_off). Returns (the cells of every new part or None, nodes)
+def search(lattice, segments, region, rng, budget):
+    neighbours = lattice.neighbours
+    total = len(region)
+    last = len(segments) - 1
+    used = set()
+    filled = [[] for _ in segments]
+
+    def free(cell):
+        return [n for n in neighbours(cell) if n in region and n not in used]
+
+    def moves(seg, head):
+        after = free(head)
+        rng.shuffle(after)
+        after.sort(key=lambda cell: len(free(cell)))
+        options = [(cell, seg) for cell in after]
+        end = segments[seg][1]
+        if seg < last and (end is None or end in neighbours(head)):
+            options.append((None, seg))
+        elif seg == last and end is not None and end in neighbours(head) and len(used) == total:
+            options.append((None, seg))
+        return options
+
+    # a cell next to head without free neighbours is fine if it can be the next spot and the part
+    # can end after it (only one of them can), or if a later part can be just that cell. Then every
+    # group of free cells has to be next to head or to the start of a later part
+    def cut_off(seg, head):
+        next_spot = False
+        for cell in free(head):
+            if free(cell):
+                continue
+            end = segments[seg][1]
+            if not next_spot and (end is None or end in neighbours(cell)):
+                next_spot = True
+                continue
+            if not any(a in neighbours(cell) and (b is None or b in neighbours(cell)) for a, b in segments[seg + 1:]):
+                return True
+
+        starts = set(a for a, _ in segments[seg + 1:])
+        starts.add(head)
+        seen = set(used)
+        for cell in region:
+            if cell in seen:
+                continue
+            seen.add(cell)
+            group = [cell]
+            reached = False
+            for member in group:
+                for neighbour in neighbours(member):
+                    if neighbour in starts:
+                        reached = True
+                    elif neighbour in region and neighbour not in seen:
+                        seen.add(neighbour)
+                        group.append(neighbour)
+            if not reached:
+                return True
+        return False
+
+    if last == 0 and segments[0][1] is None and not total:
+        return filled, 0
+    # a frame is [options, how many of them have been tried, the move that made it]
+    stack = [[moves(0, segments[0][0]), 0, None]]
+    nodes = 0
+    while stack:
+        frame = stack[-1]
+        options, i, _ = frame
+        if i == len(options):
+            stack.pop()
+            cell, seg = frame[2] or (None, 0)
+            if cell is not None:
+                used.discard(cell)
+                filled[seg].pop()
+            continue
+        frame[1] += 1
+        cell, seg = options[i]
+
+        if cell is None:
+            # close the part
+            if seg == last:
+                return filled, nodes
+            stack.append([moves(seg + 1, segments[seg + 1][0]), 0, (None, seg)])
+            continue
+
+        if nodes == budget:
+            return None, nodes
+        nodes += 1
+        used.add(cell)
+        filled[seg].append(cell)
+        if len(used) == total and seg == last and segments[seg][1] is None:
+            return filled, nodes
+        if cut_off(seg, cell):
+            used.discard(cell)
+            filled[seg].pop()
+            continue
+        stack.append([moves(seg, cell), 0, (cell, seg)])
+    return None, nodes
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m saw.repair",
+                                     description="Change a grid after a path was found and repair the path.")
+    parser.add_argument("rows", type=int)
+    parser.add_argument("cols", type=int)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--block", type=int, nargs=2, action="append", default=[], metavar=("X", "Y"),
+                        help="block this cell after the path was found, can be given many times")
+    parser.add_argument("--add-rows", type=int, default=0, help="add this many rows at the bottom")
+    parser.add_argument("--add-cols", type=int, default=0, help="add this many columns at the right")
+    parser.add_argument("--radius", type=int, default=1)
+    parser.add_argument("--max-radius", type=int, default=4)
+    parser.add_argument("--budget", type=int, default=5000, metavar="NODES")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        if args.add_rows < 0 or args.add_cols < 0:
+            raise ValueError("rows and columns can only be added")
+        old = solve(args.rows, args.cols, None, args.seed, prune=(DEAD_END, CONNECTIVITY), order=WARNSDORFF)
+        if old.path is None:
+            raise ValueError("there is no path to repair")
+        rows, cols = args.rows + args.add_rows, args.cols + args.add_cols
+        lattice = square(rows, cols, [tuple(cell) for cell in args.block])
+        changed = [tuple(cell) for cell in args.block]
+        changed.extend((x, y) for y in range(rows) for x in range(cols) if y >= args.rows or x >= args.cols)
+        rng = random.Random(args.seed)
+        result = repair(lattice, old.path, changed, rng, args.radius, args.max_radius, args.budget)
+
+        # a new search of the changed grid, to compare
+        started = time.perf_counter()
+        search = full_solve(lattice, [lattice.cell(old.start)], rng, args.budget, started)
+        search_seconds = search.seconds
+    except ValueError as error:
+        print("error: %s" % error, file=sys.stderr)
+        return 2
+
+    output = result.as_dict()
+    output["search_seconds"] = search_seconds
+    print(json.dumps(output))
+    return 0 if result.path is not None else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
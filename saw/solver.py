@@ -0,0 +1,130 @@
+# solve(rows, cols, start=None, seed=None, strategy="array", **options)
+#   - finds a self-avoiding path that fills a rows x cols grid without pygame
+#   - start -> (grid_x, grid_y) of the first spot, it is chosen randomly if it is None
+#   - seed -> seed of the random.Random that chooses the start and the directions
+#   - strategy -> the name of one of the STRATEGIES
+#   - options -> options of the array strategy, like prune=(...), order="warnsdorff" or end=(x, y)
+#                (see walker.py), with end=(x, y) the start is chosen from the spots that have a path to it,
+#                or moves=N of the backbite strategy (see construct.py), or kind="torus" (or another
+#                of lattice.GRID_LATTICES), obstacles=[(x, y), ...], prune and order of the lattice strategy
+#   - it raises ValueError if it is impossible to create a path from start (to end), this is checked
+#     with feasibility.has_path before the search, so a search that can't succeed is never started.
+#     has_path only knows the grid, so the lattice strategy checks its start with lattice.check
+#   - it returns a Solution
+#
+# Solution
+#   - path -> the (grid_x, grid_y) position of each spot on the path,
+#             or None if the search ended without finding a path
+#   - nodes, backtracks -> how many spots were added to / removed from the path
+#   - seconds -> how long the search took
+#   - pruned -> how many moves each pruning rule has rejected
+#   - end -> the spot where the path had to end, or None
+#   - restarts -> how many times the search started again (see portfolio.py)
+
+import random
+import time
+
+from .construct import Backbite
+from .feasibility import has_path, random_start
+from .lattice import LatticeStrategy
+from .strategies import BasicWalker, IterativeFinder, RecursiveFinder, SpotWalker
+from .walker import Walker
+
+STRATEGIES = {
+    "basic": BasicWalker,
+    "spot": SpotWalker,
+    "recursive": RecursiveFinder,
+    "iterative": IterativeFinder,
+    "array": Walker,
+    "backbite": Backbite,
+    "lattice": LatticeStrategy,
+}
+
+# the options that each strategy takes, the others don't take any
+OPTIONS = {
+    "array": ("prune", "order", "lookahead", "end", "symmetries", "stats"),
+    "backbite": ("moves",),
+    "lattice": ("kind", "obstacles", "prune", "order"),
+}
+
+
+class Solution:
+    def __init__(self, rows, cols, start, seed, strategy, path, nodes, backtracks, seconds, pruned=None, end=None,
+                 restarts=0):
+        self.rows = rows
+        self.cols = cols
+        self.start = start
+        self.seed = seed
+        self.strategy = strategy
+        self.path = path
+        self.nodes = nodes
+        self.backtracks = backtracks
+        self.seconds = seconds
+        self.pruned = pruned or {}
+        self.end = end
+        self.restarts = restarts
+
+    def as_dict(self):
+        return {
+            "rows": self.rows,
+            "cols": self.cols,
+            "start": list(self.start),
+            "end": None if self.end is None else list(self.end),
+            "seed": self.seed,
+            "strategy": self.strategy,
+            "seconds": self.seconds,
+            "nodes": self.nodes,
+            "backtracks": self.backtracks,
+            "restarts": self.restarts,
+            "pruned": self.pruned,
+            "path": None if self.path is None else [list(cell) for cell in self.path],
+        }
+
+
+def make_walker(rows, cols, start=None, seed=None, strategy="array", **options):
+    if rows < 1 or cols < 1:
+        raise ValueError("the grid needs at least one row and one column")
+    if strategy not in STRATEGIES:
+        raise ValueError("unknown strategy %r, choose one of %s" % (strategy, ", ".join(STRATEGIES)))
+    unknown = sorted(set(options) - set(OPTIONS.get(strategy, ())))
+    if unknown:
+        raise ValueError("%s can't be used with the %s strategy" % (", ".join(unknown), strategy))
+
+    if strategy == "lattice":
+        # it can wrap around or have obstacles, so it chooses and checks its own start
+        walker = LatticeStrategy(rows, cols, start, random.Random(seed), **options)
+        return walker, walker.start
+
+    end = options.get("end")
+    if end is not None:
+        end = options["end"] = tuple(end)
+        if not (0 <= end[0] < cols and 0 <= end[1] < rows):
+            raise ValueError("end %r is outside of the %d x %d grid" % (end, rows, cols))
+
+    rng = random.Random(seed)
+    if start is None:
+        start = random_start(rows, cols, rng, end)
+    else:
+        start = tuple(start)
+        if not (0 <= start[0] < cols and 0 <= start[1] < rows):
+            raise ValueError("start %r is outside of the %d x %d grid" % (start, rows, cols))
+        if not has_path(rows, cols, start, end):
+            if end is None:
+                raise ValueError("it is impossible to create a self-avoiding path from %r" % (start,))
+            raise ValueError("it is impossible to create a self-avoiding path from %r to %r" % (start, end))
+
+    return STRATEGIES[strategy](rows, cols, start, rng, **options), start
+
+
+def solve(rows, cols, start=None, seed=None, strategy="array", **options):
+    walker, start = make_walker(rows, cols, start, seed, strategy, **options)
+
+    started = time.perf_counter()
+    found = walker.run()
+    seconds = time.perf_counter() - started
+
+    path = walker.cells() if found else None
+    pruned = dict(getattr(walker, "pruned", {}))
+    end = options.get("end")
+    end = None if end is None else tuple(end)
+    return Solution(rows, cols, start, seed, strategy, path, walker.nodes, walker.backtracks, seconds, pruned, end)
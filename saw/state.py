@@ -0,0 +1,166 @@
+# GridState(rows, cols) - the state of a search in flat buffers instead of Spot objects
+#
+# Every spot is a cell id (grid_y * cols + grid_x) and every direction is an index into
+# DIRECTIONS (0 up, 1 right, 2 down, 3 left), so the reverse of direction d is d ^ 2.
+#
+#   - visited[cell] -> 1 when the spot is in the path (bytearray)
+#   - options[cell] -> 4-bit mask of the directions the spot has not tried yet (bytearray)
+#   - direction[cell] -> the direction the spot took to get to the next spot (bytearray)
+#   - path -> the cell ids of the spots on the path (array of ints)
+#   - neighbours[cell * 4 + d] -> the cell id next to cell in direction d,
+#                                 or -1 if it is outside of the grid (array of ints)
+#   - inside[cell] -> 4-bit mask of the directions that stay inside the grid (bytearray)
+#
+# 1. GridState.push(cell, came_from)
+#   - adds cell to the path, came_from is the direction that was taken to get to it
+#     (or None for the first spot) and it is removed from the options of cell
+#
+# 2. GridState.pop()
+#   - removes the last spot of the path and returns its cell id
+#
+# 3. GridState.cells()
+#   - the (grid_x, grid_y) position of each spot on the path
+#
+# 4. GridState.track_degrees()
+#   - from now on push and pop also keep these up to date (they cost a little, so they are off by default)
+#   - free[cell] -> the number of neighbours of cell that are not in the path
+#   - colour[cell] -> the checkerboard colour of cell, (grid_x + grid_y) % 2
+#   - left[colour] -> the number of spots of each colour that are not in the path
+#   - zeros -> the number of spots not in the path with no free neighbour
+#   - ones[colour] -> the number of spots not in the path with exactly one free neighbour
+#
+# MASK_DIRECTIONS[mask] is a tuple of the directions in a 4-bit mask,
+# so random.choice can pick one without building a list every step.
+
+from array import array
+
+from .grid import DIRECTIONS
+
+MASK_DIRECTIONS = tuple(tuple(d for d in range(4) if mask >> d & 1) for mask in range(16))
+
+
+class GridState:
+    def __init__(self, rows, cols):
+        self.rows = rows
+        self.cols = cols
+        self.size = rows * cols
+
+        self.visited = bytearray(self.size)
+        self.options = bytearray(self.size)
+        self.direction = bytearray(self.size)
+        self.path = array("i")
+
+        neighbours = []
+        inside = bytearray(self.size)
+        for y in range(rows):
+            for x in range(cols):
+                mask = 0
+                for d, (dx, dy) in enumerate(DIRECTIONS):
+                    if 0 <= x + dx < cols and 0 <= y + dy < rows:
+                        neighbours.append((y + dy) * cols + x + dx)
+                        mask |= 1 << d
+                    else:
+                        neighbours.append(-1)
+                inside[y * cols + x] = mask
+        self.neighbours = array("i", neighbours)
+        self.inside = inside
+
+        self.free = None
+        self.colour = None
+        self.left = None
+        self.zeros = 0
+        self.ones = None
+
+    def cell(self, grid_x, grid_y):
+        return grid_y * self.cols + grid_x
+
+    def position(self, cell):
+        return (cell % self.cols, cell // self.cols)
+
+    def cells(self):
+        cols = self.cols
+        return [(cell % cols, cell // cols) for cell in self.path]
+
+    def push(self, cell, came_from=None):
+        self.visited[cell] = 1
+        if came_from is None:
+            self.options[cell] = self.inside[cell]
+        else:
+            self.direction[self.path[-1]] = came_from
+            self.options[cell] = self.inside[cell] & ~(1 << (came_from ^ 2))
+        self.path.append(cell)
+        if self.free is not None:
+            self._visit_degrees(cell)
+
+    def pop(self):
+        cell = self.path.pop()
+        self.visited[cell] = 0
+        if self.free is not None:
+            self._unvisit_degrees(cell)
+        return cell
+
+    def track_degrees(self):
+        if self.free is not None:
+            return
+        visited, neighbours = self.visited, self.neighbours
+        self.free = bytearray(self.size)
+        self.colour = bytearray((cell % self.cols + cell // self.cols) & 1 for cell in range(self.size))
+        self.left = [0, 0]
+        self.zeros = 0
+        self.ones = [0, 0]
+        for cell in range(self.size):
+            free = 0
+            for d in MASK_DIRECTIONS[self.inside[cell]]:
+                if not visited[neighbours[cell * 4 + d]]:
+                    free += 1
+            self.free[cell] = free
+            if not visited[cell]:
+                self.left[self.colour[cell]] += 1
+                if free == 0:
+                    self.zeros += 1
+                elif free == 1:
+                    self.ones[self.colour[cell]] += 1
+
+    def _visit_degrees(self, cell):
+        free, visited, colour, ones = self.free, self.visited, self.colour, self.ones
+
+        # cell is not a free spot anymore
+        self.left[colour[cell]] -= 1
+        if free[cell] == 0:
+            self.zeros -= 1
+        elif free[cell] == 1:
+            ones[colour[cell]] -= 1
+
+        # and its neighbours have one less free neighbour
+        base = cell * 4
+        for d in MASK_DIRECTIONS[self.inside[cell]]:
+            neighbour = self.neighbours[base + d]
+            count = free[neighbour] - 1
+            free[neighbour] = count
+            if not visited[neighbour]:
+                if count == 1:
+                    ones[colour[neighbour]] += 1
+                elif count == 0:
+                    ones[colour[neighbour]] -= 1
+                    self.zeros += 1
+
+    def _unvisit_degrees(self, cell):
+        free, visited, colour, ones = self.free, self.visited, self.colour, self.ones
+
+        base = cell * 4
+        for d in MASK_DIRECTIONS[self.inside[cell]]:
+            neighbour = self.neighbours[base + d]
+            count = free[neighbour] + 1
+            free[neighbour] = count
+            if not visited[neighbour]:
+                if count == 2:
+                    ones[colour[neighbour]] -= 1
+                elif count == 1:
+                    ones[colour[neighbour]] += 1
+                    self.zeros -= 1
+
+        self.left[colour[cell]] += 1
+        if free[cell] == 0:
+            self.zeros += 1
+        elif free[cell] == 1:
+            ones[colour[cell]] += 1
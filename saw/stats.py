@@ -0,0 +1,173 @@
+# SearchStats(every=0, hook=None) - what happens inside a search of the array strategy
+#
+#   stats = SearchStats(every=10000)
+#   walker = make_walker(8, 8, seed=1, stats=stats)[0]
+#   walker.run()
+#   stats.as_dict()
+#
+# Without stats the walker runs its usual loops and nothing is counted. With stats, run() uses a
+# loop that counts everything (a little slower) and step() counts the step it does:
+#   - steps -> every time a direction was chosen or the path stepped back
+#   - pushes -> moves that added a spot to the path
+#   - rejects -> moves to a spot that is in the path (or to end before it is the last spot), the
+#                `else` branch of the scripts that draws DIRECTION_COLOR, and the pruned moves
+#   - pruned -> moves rejected by each pruning rule (walker.pruned)
+#   - dead_ends -> times the last spot had no options left and the path stepped back
+#   - max_depth -> the longest the path has been
+#   - backtrack_depths[d] -> how many dead ends there were with d spots on the path, a search that
+#                            takes long usually keeps stepping back far from the end of the path
+#   - snapshots -> every `every` steps: steps, nodes, backtracks, depth, max_depth and seconds
+#                  since the walker was made (none if every is 0)
+#   - seconds -> since the walker was made until run() returned
+#
+# hook(event, cell, depth) is called after every step, event is PUSH, REJECT or POP (from
+# strategies.py), cell is the cell id of the spot that was added, rejected or removed and depth
+# is the length of the path after it.
+#
+# stats.as_dict() -> all of it for JSON, stats.row() -> the counters as one flat dict
+#
+# python -m saw.stats ROWS COLS [--seeds N] [--start X Y] [--prune RULE ...] [--max-backtracks N]
+#                     [--every STEPS] [--format json|csv] [--output FILE]
+#   - runs a search for every seed (with a random start unless --start is given) and writes one
+#     record per search, as JSON lines (with the depth histogram and snapshots) or as a CSV table
+#     of the counters, to find the grid shapes and starts that take very long
+
+import argparse
+import csv
+import json
+import sys
+import time
+
+from .solver import make_walker
+from .strategies import POP, PUSH
+from .walker import PRUNING_RULES
+
+
+class SearchStats:
+    def __init__(self, every=0, hook=None):
+        if every < 0:
+            raise ValueError("every can't be negative")
+        self.every = every
+        self.hook = hook
+        self.steps = 0
+        self.pushes = 0
+        self.rejects = 0
+        self.dead_ends = 0
+        self.max_depth = 0
+        self.backtrack_depths = []
+        self.snapshots = []
+        self.pruned = {}
+        self.walker = None
+        self.started = None
+        self.seconds = 0.0
+
+    # called by the walker when it is made
+    def attach(self, walker):
+        self.walker = walker
+        self.pruned = walker.pruned
+        self.backtrack_depths = [0] * (walker.state.size + 1)
+        self.max_depth = len(walker.state.path)
+        self.started = time.perf_counter()
+
+    # called by the walker after every step, depth is the length of the path after it
+    def record(self, event, cell, depth):
+        self.steps += 1
+        if event == PUSH:
+            self.pushes += 1
+            if depth > self.max_depth:
+                self.max_depth = depth
+        elif event == POP:
+            self.dead_ends += 1
+            self.backtrack_depths[depth + 1] += 1
+        else:
+            self.rejects += 1
+        if self.every and not self.steps % self.every:
+            self.snapshot(depth)
+        if self.hook is not None:
+            self.hook(event, cell, depth)
+
+    # called by the walker when run() returns
+    def stop(self):
+        self.seconds = time.perf_counter() - self.started
+
+    def snapshot(self, depth):
+        self.seconds = time.perf_counter() - self.started
+        self.snapshots.append({
+            "steps": self.steps,
+            "nodes": self.walker.nodes,
+            "backtracks": self.walker.backtracks,
+            "depth": depth,
+            "max_depth": self.max_depth,
+            "seconds": self.seconds,
+        })
+
+    def row(self):
+        return {
+            "steps": self.steps,
+            "pushes": self.pushes,
+            "rejects": self.rejects,
+            "pruned": sum(self.pruned.values()),
+            "dead_ends": self.dead_ends,
+            "max_depth": self.max_depth,
+            "seconds": self.seconds,
+        }
+
+    def as_dict(self):
+        result = self.row()
+        result["pruned"] = dict(self.pruned)
+        # the histogram without the depths that never had a dead end at the end
+        depths = self.backtrack_depths
+        last = max((d for d, count in enumerate(depths) if count), default=0)
+        result["backtrack_depths"] = depths[:last + 1]
+        result["snapshots"] = self.snapshots
+        return result
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m saw.stats",
+                                     description="Count what happens inside searches of the array strategy.")
+    parser.add_argument("rows", type=int)
+    parser.add_argument("cols", type=int)
+    parser.add_argument("--seeds", type=int, default=10, help="run a search for the seeds 0 .. N - 1")
+    parser.add_argument("--start", type=int, nargs=2, metavar=("X", "Y"), help="position of the first spot (random if omitted)")
+    parser.add_argument("--prune", nargs="+", choices=PRUNING_RULES, default=[], metavar="RULE")
+    parser.add_argument("--max-backtracks", type=int, help="stop a search after this many backtracks")
+    parser.add_argument("--every", type=int, default=0, help="take a snapshot every this many steps")
+    parser.add_argument("--format", choices=("json", "csv"), default="json")
+    parser.add_argument("--output", help="write to this file instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    records = []
+    try:
+        for seed in range(args.seeds):
+            stats = SearchStats(args.every)
+            walker, start = make_walker(args.rows, args.cols, args.start, seed, prune=args.prune, stats=stats)
+            found = walker.run(args.max_backtracks)
+            record = {"rows": args.rows, "cols": args.cols, "start_x": start[0], "start_y": start[1], "seed": seed,
+                      "found": found, "nodes": walker.nodes, "backtracks": walker.backtracks}
+            record.update(stats.as_dict() if args.format == "json" else stats.row())
+            records.append(record)
+    except ValueError as error:
+        print("error: %s" % error, file=sys.stderr)
+        return 2
+
+    file = open(args.output, "w", newline="") if args.output else sys.stdout
+    try:
+        if args.format == "json":
+            for record in records:
+                file.write(json.dumps(record) + "\n")
+        else:
+            writer = csv.DictWriter(file, fieldnames=list(records[0]) if records else [])
+            writer.writeheader()
+            writer.writerows(records)
+    finally:
+        if args.output:
+            file.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,316 @@
+# The three path finding strategies of the scripts without pygame.
+#
+# Every strategy is a class that takes (rows, cols, start, rng)
+#   - start -> (grid_x, grid_y) of the first spot, it should be a valid position
+#   - rng -> a random.Random that is used instead of the global random functions
+#            so a seed gives the same path every time
+#
+# and has the same attributes and methods:
+#   - walker.run() -> searches until a path is found and returns True,
+#                     or returns False if there is no path from start
+#   - walker.cells() -> the (grid_x, grid_y) position of each spot on the path
+#   - walker.nodes -> the number of spots that have been added to the path
+#   - walker.backtracks -> the number of spots that have been removed from the path
+#
+# BasicWalker and SpotWalker also have walker.step() which does exactly what one
+# frame of the V1/V2 main loop does and returns what happened:
+#   - PUSH -> a spot was added to the path
+#   - REJECT -> the chosen direction was not valid, walker.rejected is the spot it wanted to go
+#   - POP -> it was stuck and stepped back
+#   - FINISHED -> a path has been found
+#   - EXHAUSTED -> every direction of the first spot has been tried, there is no path
+#
+# IterativeFinder does the same search as RecursiveFinder without recursion,
+# so it works on grids of any size.
+
+from .grid import DIRECTIONS
+
+PUSH, REJECT, POP, FINISHED, EXHAUSTED = range(5)
+
+
+def reverse(direction):
+    return (-direction[0], -direction[1])
+
+
+# V1 - three lists (path, directions, options)
+class BasicWalker:
+    def __init__(self, rows, cols, start, rng):
+        self.rows = rows
+        self.cols = cols
+        self.rng = rng
+
+        # path -> a list that stores the position of each of the spots on the path
+        self.path = [tuple(start)]
+        # directions -> a list that stores the direction that each spot on the path has taken
+        self.directions = []
+        # options -> a list that stores the available directions for each spot on the path
+        self.options = [list(DIRECTIONS)]
+
+        self.rejected = None
+        self.nodes = 1
+        self.backtracks = 0
+
+    def cells(self):
+        return list(self.path)
+
+    def step(self):
+        path, directions, options = self.path, self.directions, self.options
+
+        # Finished?
+        if len(path) == self.rows * self.cols:
+            return FINISHED
+
+        # Stuck? - step back, or give up if the first spot is stuck
+        if options[-1] == []:
+            if len(path) == 1:
+                return EXHAUSTED
+            options.pop()
+            path.pop()
+            options[-1].remove(directions[-1])
+            directions.pop()
+            self.backtracks += 1
+            return POP
+
+        # Continue. - choose a direction randomly
+        direction = self.rng.choice(options[-1])
+        next_spot = (path[-1][0] + direction[0], path[-1][1] + direction[1])
+
+        if not next_spot in path and 0 <= next_spot[0] < self.cols and 0 <= next_spot[1] < self.rows:
+            path.append(next_spot)
+            directions.append(direction)
+            options.append(list(DIRECTIONS))
+            options[-1].remove(reverse(direction))
+            self.nodes += 1
+            return PUSH
+
+        self.rejected = next_spot
+        options[-1].remove(direction)
+        return REJECT
+
+    def run(self):
+        while True:
+            event = self.step()
+            if event == FINISHED:
+                return True
+            if event == EXHAUSTED:
+                return False
+
+
+# Spot(grid_x, grid_y) is the Spot class of V2 and V3 without the pixel position
+#   - self.options -> the available options for the spot
+#   - self.direction -> stores the chosen direction for this spot
+#   - self.is_in_path -> is set to True when the spot is used in the path
+class Spot:
+    def __init__(self, grid_x, grid_y):
+        self.grid_x = grid_x
+        self.grid_y = grid_y
+
+        self.options = list(DIRECTIONS)
+        self.direction = 0
+        self.is_in_path = False
+
+    def reset(self):
+        self.options = list(DIRECTIONS)
+        self.direction = 0
+        self.is_in_path = False
+
+    def is_stuck(self):
+        return self.options == []
+
+
+def make_grid(rows, cols):
+    return [[Spot(c, r) for c in range(cols)] for r in range(rows)]
+
+
+# V2 - a grid of Spots and a path of Spots
+class SpotWalker:
+    def __init__(self, rows, cols, start, rng):
+        self.rows = rows
+        self.cols = cols
+        self.rng = rng
+
+        self.grid = make_grid(rows, cols)
+        self.path = [self.grid[start[1]][start[0]]]
+        self.path[-1].is_in_path = True
+
+        self.rejected = None
+        self.nodes = 1
+        self.backtracks = 0
+
+    def cells(self):
+        return [(spot.grid_x, spot.grid_y) for spot in self.path]
+
+    def step(self):
+        path = self.path
+
+        # Finished?
+        if len(path) == self.rows * self.cols:
+            return FINISHED
+
+        # Stuck? - step back, or give up if the first spot is stuck
+        if path[-1].is_stuck():
+            if len(path) == 1:
+                return EXHAUSTED
+            path[-1].reset()
+            path.pop()
+            path[-1].options.remove(path[-1].direction)
+            self.backtracks += 1
+            return POP
+
+        # Continue. - choose a direction randomly
+        direction = self.rng.choice(path[-1].options)
+        next_x, next_y = path[-1].grid_x + direction[0], path[-1].grid_y + direction[1]
+
+        if 0 <= next_y < self.rows and 0 <= next_x < self.cols and not self.grid[next_y][next_x].is_in_path:
+            path[-1].direction = direction
+            path.append(self.grid[next_y][next_x])
+            path[-1].is_in_path = True
+            path[-1].options.remove(reverse(direction))
+            self.nodes += 1
+            return PUSH
+
+        self.rejected = (next_x, next_y)
+        path[-1].options.remove(direction)
+        return REJECT
+
+    def run(self):
+        while True:
+            event = self.step()
+            if event == FINISHED:
+                return True
+            if event == EXHAUSTED:
+                return False
+
+
+# V3 - Spot.path_finder, the recursive function
+#   - it has no step(), the whole search happens inside run()
+#   - it needs one python frame for every spot on the path,
+#     so grids bigger than the recursion limit raise RecursionError
+class RecursiveFinder:
+    def __init__(self, rows, cols, start, rng):
+        self.rows = rows
+        self.cols = cols
+        self.rng = rng
+        self.start = tuple(start)
+
+        self.grid = make_grid(rows, cols)
+        self.path = []
+
+        self.nodes = 0
+        self.backtracks = 0
+
+    def cells(self):
+        return [(spot.grid_x, spot.grid_y) for spot in self.path]
+
+    def path_finder(self, grid_x, grid_y):
+        if not (0 <= grid_y < self.rows and 0 <= grid_x < self.cols) or self.grid[grid_y][grid_x].is_in_path:
+            return False
+
+        current_spot = self.grid[grid_y][grid_x]
+        current_spot.is_in_path = True
+        self.path.append(current_spot)
+        self.nodes += 1
+
+        # the first spot can go any direction
+        if len(self.path) > 1:
+            current_spot.options.remove(reverse(self.path[-2].direction))
+
+        if len(self.path) == self.rows * self.cols:
+            return True
+
+        # try all of the possible directions for current spot until it is stuck
+        while not current_spot.is_stuck():
+            direction = self.rng.choice(current_spot.options)
+            current_spot.direction = direction
+            if self.path_finder(grid_x + direction[0], grid_y + direction[1]):
+                return True
+            current_spot.options.remove(direction)
+
+        # stuck, go back and try another direction
+        current_spot.reset()
+        self.path.pop()
+        self.backtracks += 1
+        return False
+
+    def run(self):
+        return self.path_finder(*self.start)
+
+
+# V3 without recursion
+#   - instead of one python frame for every spot, it keeps its own stack:
+#     path[i] is the cell id (grid_y * cols + grid_x) of a spot and
+#     options[i] is the list of direction indexes (into DIRECTIONS) that spot has not tried yet
+#   - directions[i] is the direction index path[i] took to get to path[i + 1]
+#   - visited[cell id] is 1 when the spot is in the path
+#   - neighbours[cell id * 4 + direction index] is the cell id of the next spot,
+#     or -1 if it is outside of the grid, so there is no coordinate arithmetic per step
+#   - it chooses the directions in the same order as RecursiveFinder,
+#     so the same rng gives the same path
+class IterativeFinder:
+    def __init__(self, rows, cols, start, rng):
+        self.rows = rows
+        self.cols = cols
+        self.rng = rng
+        self.start = tuple(start)
+
+        self.path = []
+        self.nodes = 0
+        self.backtracks = 0
+
+    def cells(self):
+        cols = self.cols
+        return [(cell % cols, cell // cols) for cell in self.path]
+
+    def run(self):
+        rows, cols = self.rows, self.cols
+        total = rows * cols
+        choice = self.rng.choice
+
+        neighbours = []
+        for y in range(rows):
+            for x in range(cols):
+                for dx, dy in DIRECTIONS:
+                    inside = 0 <= x + dx < cols and 0 <= y + dy < rows
+                    neighbours.append((y + dy) * cols + x + dx if inside else -1)
+
+        # the options of a spot that came from direction d are all directions but d ^ 2 (its reverse)
+        options_after = [[d for d in range(4) if d != direction ^ 2] for direction in range(4)]
+
+        visited = bytearray(total)
+        path = [self.start[1] * cols + self.start[0]]
+        options = [[0, 1, 2, 3]]
+        directions = []
+        visited[path[0]] = 1
+        depth, nodes, backtracks = 1, 1, 0
+
+        while depth < total:
+            current_options = options[-1]
+
+            # stuck, go back and try another direction
+            if not current_options:
+                visited[path.pop()] = 0
+                options.pop()
+                depth -= 1
+                backtracks += 1
+                if not depth:
+                    break
+                options[-1].remove(directions.pop())
+                continue
+
+            direction = choice(current_options)
+            next_cell = neighbours[path[-1] * 4 + direction]
+
+            if next_cell >= 0 and not visited[next_cell]:
+                visited[next_cell] = 1
+                path.append(next_cell)
+                directions.append(direction)
+                options.append(options_after[direction][:])
+                depth += 1
+                nodes += 1
+            else:
+                current_options.remove(direction)
+
+        self.path = path
+        self.nodes = nodes
+        self.backtracks = backtracks
+        return depth == total
@@ -0,0 +1,291 @@
+# The steps of a search as a stream, for viewers and recorders in other processes
+#
+# 1. events(walker, batch=256) - an async generator of the steps of a walker with step() (the
+#    array, basic and spot strategies), every step is a dict:
+#      {"event": "push", "spot": [x, y], "depth": n} -> spot was added, the path has n spots now
+#      {"event": "reject", "spot": [x, y], "depth": n} -> the walker wanted to go to spot and couldn't
+#      {"event": "pop", "spot": [x, y], "depth": n} -> spot was removed (stepped back)
+#      {"event": "finished" or "exhausted", "depth": n} -> the last one, found a path or there is none
+#    It gives the event loop a turn after every batch steps, so the search can run in the same
+#    loop as the sockets it feeds.
+#
+# 2. serve(walker, host="127.0.0.1", port=8765, clients=0, max_pending=10000, batch=256, ready=None)
+#   - a TCP server that sends the events of one search to every client that connects, as JSON lines.
+#     A client first gets {"event": "hello", "rows", "cols"} and {"event": "path", "path": [...]}
+#     (the path at that moment), then every event after it
+#   - clients -> don't start the search before that many clients are connected
+#   - the search never waits for a client: every client has its own list of lines that weren't sent
+#     yet, they are sent together (one write) as soon as the client has read the ones before them.
+#     A client that falls more than max_pending lines behind gets its list replaced by one "path"
+#     event with the path at the time it is sent, the steps in between are coalesced into it
+#   - ready(host, port) is called when the server is listening (port=0 chooses a free port)
+#   - it returns {"result": ..., "events": ..., "resyncs": ..., "seconds": ...} when the search is
+#     finished and every client has got the last event
+#
+# 3. listen(host="127.0.0.1", port=8765) - an async generator of the events of a server, as dicts
+#    apply(path, event) -> changes path (a list of [x, y]) the way event changed the path of the search
+#
+# python -m saw.stream serve ROWS COLS [--start X Y] [--end X Y] [--seed SEED] [--strategy NAME]
+#                            [--prune RULE ...] [--order ORDER] [--host HOST] [--port PORT]
+#                            [--clients N] [--max-pending LINES]
+#   - prints {"host", "port"} when it is listening and the result of serve when the search is finished
+# python -m saw.stream listen [--host HOST] [--port PORT]
+#   - prints every event it gets, one JSON line each (a recorder is `... listen > events.jsonl`)
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from .solver import make_walker
+from .strategies import EXHAUSTED, FINISHED, POP, PUSH
+from .walker import MOVE_ORDERS, PRUNING_RULES
+
+EVENT_NAMES = ("push", "reject", "pop", "finished", "exhausted")
+
+# the strategies that have step()
+STREAM_STRATEGIES = ("array", "basic", "spot")
+
+# how long serve waits for the clients to read the last events
+CLOSE_TIMEOUT = 10.0
+
+
+# a function that returns the (grid_x, grid_y) of the last spot of the path
+def head_of(walker):
+    if hasattr(walker, "state"):
+        state = walker.state
+        return lambda: state.position(state.path[-1])
+    path = walker.path
+    if isinstance(path[0], tuple):
+        return lambda: path[-1]
+    return lambda: (path[-1].grid_x, path[-1].grid_y)
+
+
+def depth_of(walker):
+    return len(walker.state.path) if hasattr(walker, "state") else len(walker.path)
+
+
+async def events(walker, batch=256):
+    if not hasattr(walker, "step"):
+        raise ValueError("only a walker with step() can be streamed (%s)" % ", ".join(STREAM_STRATEGIES))
+    step = walker.step
+    head = head_of(walker)
+    count = 0
+    while True:
+        before = head()
+        event = step()
+        if event in (FINISHED, EXHAUSTED):
+            yield {"event": EVENT_NAMES[event], "depth": depth_of(walker)}
+            return
+        if event == PUSH:
+            spot = head()
+        elif event == POP:
+            spot = before
+        else:
+            spot = walker.rejected
+        yield {"event": EVENT_NAMES[event], "spot": list(spot), "depth": depth_of(walker)}
+
+        count += 1
+        if count == batch:
+            count = 0
+            await asyncio.sleep(0)
+
+
+def apply(path, event):
+    kind = event["event"]
+    if kind == "push":
+        path.append(event["spot"])
+    elif kind == "pop":
+        path.pop()
+    elif kind == "path":
+        path[:] = event["path"]
+    return path
+
+
+def line(message):
+    return json.dumps(message) + "\n"
+
+
+# one connected client, the lines that weren't sent to it yet and the task that sends them
+class Client:
+    def __init__(self, writer, max_pending, snapshot):
+        self.writer = writer
+        self.max_pending = max_pending
+        self.snapshot = snapshot
+        self.pending = []
+        self.resync = False
+        self.closing = False
+        self.resyncs = 0
+        self.wake = asyncio.Event()
+
+    def add(self, text):
+        if self.resync:
+            return
+        if len(self.pending) >= self.max_pending:
+            # too far behind, the path at the time of the next write replaces all of it
+            self.pending.clear()
+            self.resync = True
+            self.resyncs += 1
+        else:
+            self.pending.append(text)
+        self.wake.set()
+
+    def close(self):
+        self.closing = True
+        self.wake.set()
+
+    async def send(self):
+        try:
+            while True:
+                await self.wake.wait()
+                self.wake.clear()
+                if self.resync:
+                    self.resync = False
+                    lines = [self.snapshot()]
+                else:
+                    lines, self.pending = self.pending, []
+                if lines:
+                    self.writer.write("".join(lines).encode())
+                    await self.writer.drain()
+                if self.closing and not self.pending and not self.resync:
+                    break
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.writer.close()
+
+
+async def serve(walker, host="127.0.0.1", port=8765, clients=0, max_pending=10000, batch=256, ready=None):
+    if max_pending < 1:
+        raise ValueError("max_pending has to be at least 1")
+    rows, cols = walker.rows, walker.cols
+    # the clients that are connected now, and every client that has connected
+    connected = []
+    seen = []
+    tasks = []
+    enough = asyncio.Event()
+    if not clients:
+        enough.set()
+
+    def snapshot():
+        return line({"event": "path", "path": [list(spot) for spot in walker.cells()]})
+
+    async def connect(reader, writer):
+        writer.write((line({"event": "hello", "rows": rows, "cols": cols}) + snapshot()).encode())
+        client = Client(writer, max_pending, snapshot)
+        connected.append(client)
+        seen.append(client)
+        tasks.append(asyncio.current_task())
+        if len(seen) >= clients:
+            enough.set()
+        try:
+            await client.send()
+        finally:
+            connected.remove(client)
+
+    server = await asyncio.start_server(connect, host, port)
+    async with server:
+        if ready is not None:
+            ready(*server.sockets[0].getsockname()[:2])
+        await enough.wait()
+
+        started = time.perf_counter()
+        count = 0
+        async for event in events(walker, batch):
+            text = line(event)
+            for client in connected:
+                client.add(text)
+            count += 1
+        seconds = time.perf_counter() - started
+
+        # no new clients, the connected ones get everything up to the last event (a client that
+        # doesn't read for CLOSE_TIMEOUT seconds is disconnected)
+        server.close()
+        for client in connected:
+            client.close()
+        if tasks:
+            _, stuck = await asyncio.wait(tasks, timeout=CLOSE_TIMEOUT)
+            for task in stuck:
+                task.cancel()
+
+    return {
+        "result": event["event"],
+        "events": count,
+        "clients": len(seen),
+        "resyncs": sum(client.resyncs for client in seen),
+        "seconds": seconds,
+    }
+
+
+async def listen(host="127.0.0.1", port=8765):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while True:
+            text = await reader.readline()
+            if not text:
+                return
+            yield json.loads(text)
+    finally:
+        writer.close()
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m saw.stream", description="Stream the steps of a search over TCP.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="run a search and send its steps to every client")
+    serve_parser.add_argument("rows", type=int)
+    serve_parser.add_argument("cols", type=int)
+    serve_parser.add_argument("--start", type=int, nargs=2, metavar=("X", "Y"), help="position of the first spot (random if omitted)")
+    serve_parser.add_argument("--end", type=int, nargs=2, metavar=("X", "Y"), help="position of the last spot (array strategy)")
+    serve_parser.add_argument("--seed", type=int)
+    serve_parser.add_argument("--strategy", choices=STREAM_STRATEGIES, default="array")
+    serve_parser.add_argument("--prune", nargs="+", choices=PRUNING_RULES, default=[], metavar="RULE")
+    serve_parser.add_argument("--order", choices=MOVE_ORDERS)
+    serve_parser.add_argument("--clients", type=int, default=0, help="wait for this many clients before searching")
+    serve_parser.add_argument("--max-pending", type=int, default=10000, metavar="LINES",
+                              help="a client further behind than this gets the path instead of the steps")
+
+    listen_parser = commands.add_parser("listen", help="print the steps a server sends")
+
+    for command in (serve_parser, listen_parser):
+        command.add_argument("--host", default="127.0.0.1")
+        command.add_argument("--port", type=int, default=8765)
+    return parser.parse_args(argv)
+
+
+async def print_events(host, port):
+    async for event in listen(host, port):
+        print(json.dumps(event), flush=True)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        if args.command == "listen":
+            asyncio.run(print_events(args.host, args.port))
+            return 0
+
+        options = {}
+        if args.prune:
+            options["prune"] = args.prune
+        if args.order:
+            options["order"] = args.order
+        if args.end:
+            options["end"] = args.end
+        walker = make_walker(args.rows, args.cols, args.start, args.seed, args.strategy, **options)[0]
+
+        def ready(host, port):
+            print(json.dumps({"host": host, "port": port}), flush=True)
+
+        result = asyncio.run(serve(walker, args.host, args.port, args.clients, args.max_pending, ready=ready))
+    except (ValueError, OSError) as error:
+        print("error: %s" % error, file=sys.stderr)
+        return 2
+    print(json.dumps(result))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+# Turning and mirroring the grid
+#
+# A rectangle looks the same after mirroring it left to right, top to bottom, or both (turning it
+# by 180 degrees), a square also after mirroring it on its diagonals and turning it by 90 degrees.
+# A path from start turned or mirrored is a path from the turned or mirrored start, so a sweep over
+# every start only has to search one start of each group of starts that are images of each other
+# (the canonical one, the one with the smallest cell id), the paths of the others are images of its
+# paths. And the symmetries that keep a start where it is (the middle of a square is kept by all 8)
+# make its paths come in groups too, the walker only searches the smallest path of each group
+# (see symmetries in walker.py) and the others are made from it.
+#
+# A symmetry is (swap, flip_x, flip_y): first swap grid_x and grid_y (only on squares), then
+# mirror grid_x and/or grid_y.
+#
+# 1. symmetries(rows, cols) -> every symmetry of the grid, the first one does nothing
+# 2. apply(symmetry, spot, rows, cols) -> the image of a (grid_x, grid_y) spot
+# 3. inverse(symmetry) -> the symmetry that takes the images back
+# 4. permutation(symmetry, rows, cols) -> the image of every cell id, as a list
+# 5. canonical_start(rows, cols, start, end=None) -> (canonical start, a symmetry that takes start to it),
+#    with end the smallest (start, end) pair of cell ids is canonical
+# 6. canonical_path(rows, cols, path) -> (the smallest image of the path, a symmetry that takes the path to it)
+# 7. stabilizer(rows, cols, *spots) -> the symmetries that keep every one of spots where it is
+#
+# 8. paths(rows, cols, start=None, seed=None, workers=None, depth=4, budget=10000, **options)
+#   - the same paths as enumeration.paths (or enumeration.parallel_paths with workers, depth and
+#     budget), but it only searches the canonical start and only the smallest path of each group
+#
+# 9. count_every_start(rows, cols, **options)
+#   - {start: how many paths there are from it} for every start that has a path,
+#     searching one start of each group and only the smallest path of each group of its paths
+
+from .enumeration import parallel_paths
+from .enumeration import paths as all_paths
+from .feasibility import valid_starts
+
+
+def symmetries(rows, cols):
+    swaps = (False, True) if rows == cols else (False,)
+    return [(swap, flip_x, flip_y) for swap in swaps for flip_x in (False, True) for flip_y in (False, True)]
+
+
+def apply(symmetry, spot, rows, cols):
+    swap, flip_x, flip_y = symmetry
+    x, y = spot
+    if swap:
+        x, y = y, x
+    if flip_x:
+        x = cols - 1 - x
+    if flip_y:
+        y = rows - 1 - y
+    return x, y
+
+
+def inverse(symmetry):
+    swap, flip_x, flip_y = symmetry
+    return (True, flip_y, flip_x) if swap else symmetry
+
+
+def permutation(symmetry, rows, cols):
+    images = []
+    for cell in range(rows * cols):
+        x, y = apply(symmetry, (cell % cols, cell // cols), rows, cols)
+        images.append(y * cols + x)
+    return images
+
+
+def cell(spot, cols):
+    return spot[1] * cols + spot[0]
+
+
+def canonical_start(rows, cols, start, end=None):
+    if end is None:
+        return min(((apply(s, start, rows, cols), s) for s in symmetries(rows, cols)),
+                   key=lambda image: cell(image[0], cols))
+    return min(((apply(s, start, rows, cols), s) for s in symmetries(rows, cols)),
+               key=lambda image: (cell(image[0], cols), cell(apply(image[1], end, rows, cols), cols)))
+
+
+def canonical_path(rows, cols, path):
+    return min(([apply(s, spot, rows, cols) for spot in path], s) for s in symmetries(rows, cols))
+
+
+def stabilizer(rows, cols, *spots):
+    return [s for s in symmetries(rows, cols) if all(apply(s, spot, rows, cols) == tuple(spot) for spot in spots)]
+
+
+def paths(rows, cols, start=None, seed=None, workers=None, depth=4, budget=10000, **options):
+    # the same checks (start and end on the grid, a path between them) and the same random start as
+    # enumeration.paths, before anything is turned or mirrored
+    from .solver import make_walker
+    start = make_walker(rows, cols, start, seed, "array", **options)[1]
+    canonical, to_canonical = canonical_start(rows, cols, start)
+    back = inverse(to_canonical)
+
+    end = options.get("end")
+    if end is not None:
+        end = options["end"] = apply(to_canonical, end, rows, cols)
+        kept = stabilizer(rows, cols, canonical, end)
+    else:
+        kept = stabilizer(rows, cols, canonical)
+    options["symmetries"] = [permutation(s, rows, cols) for s in kept[1:]]
+
+    if workers:
+        found = parallel_paths(rows, cols, canonical, seed, depth, workers, budget, **options)
+    else:
+        found = all_paths(rows, cols, canonical, seed, **options)
+    for path in found:
+        # the images of a path that is kept by one of the symmetries are the same more than once
+        images = {tuple(apply(s, spot, rows, cols) for spot in path) for s in kept}
+        for image in sorted(images):
+            yield [apply(back, spot, rows, cols) for spot in image]
+
+
+def count_every_start(rows, cols, **options):
+    counts = {}
+    for start in valid_starts(rows, cols):
+        canonical = canonical_start(rows, cols, start)[0]
+        if canonical not in counts:
+            counts[canonical] = count_canonical(rows, cols, canonical, options)
+        counts[start] = counts[canonical]
+    return counts
+
+
+# the number of paths from a canonical start, from the smallest path of each group
+def count_canonical(rows, cols, start, options):
+    kept = stabilizer(rows, cols, start)
+    options = dict(options, symmetries=[permutation(s, rows, cols) for s in kept[1:]])
+    count = 0
+    for path in all_paths(rows, cols, start, **options):
+        count += len({tuple(apply(s, spot, rows, cols) for spot in path) for s in kept})
+    return count
@@ -0,0 +1,303 @@
+# A trace of a search - every push and pop it made, to replay it without searching again
+#
+# The directions of a search come from its rng, so the only way to see a run again was to search
+# again with the same seed (the scripts don't even have one). A trace has every step of the path
+# instead: a push is the direction it went (2 bits) and a pop doesn't need anything else, so every
+# event takes half a byte and a search of 5 million steps is a 2.5 MB file.
+#
+# To start a replay in the middle, the events are split into blocks of `interval` events and every
+# block starts with a keyframe, the path at that moment (its directions, packed like pathfile.py).
+# The path after n events is the keyframe of block n // interval and at most interval events after it.
+#
+# File (little endian)
+#   - header -> MAGIC (4 bytes), VERSION (1 byte), 3 bytes of padding, rows, cols (uint32),
+#               start (the cell id of the first spot, int32), interval (uint32, even)
+#   - blocks -> the number of spots of the path (uint32), its directions (4 in a byte), then the
+#               events of the block, 2 in a byte (the first one in the low 4 bits): 0-3 is a push
+#               in that direction, POP is a pop and PAD fills the last byte if there is one event
+#               less. Only the last block has less than interval events, so there is no index, the
+#               reader finds the blocks from the keyframe lengths and the size of the file
+#
+# 1. TraceWriter(name, rows, cols, start, interval=INTERVAL)
+#   - writer.push(d), writer.pop(), writer.events -> how many events it has written
+#
+# 2. TraceReader(name) - maps the file into memory like PathReader
+#   - len(reader) -> the number of events
+#   - reader.directions(n) -> the directions of the path after n events (0 <= n <= len(reader))
+#   - reader.spots(n) -> the same path as a list of (grid_x, grid_y)
+#   - reader.events(n) -> a generator of the events from the n-th one on, each one is a direction
+#                         (a push) or POP
+#
+# 3. record(walker, name, interval=INTERVAL) - runs a walker with step() (the array, basic and spot
+#    strategies) until it finishes, writing every push and pop, and returns what walker.run() would
+#
+# 4. solve(name, rows, cols, start=None, seed=None, strategy="array", interval=INTERVAL, **options)
+#    - solver.solve that records the search to name
+#
+# Both are context managers that close the file. viewer.replay(name) shows a trace in the pygame
+# window, python -m saw ROWS COLS --record FILE records a search.
+#
+# python -m saw.trace FILE [--step N] [--view] [--speed N]
+#   - prints the header and the number of events as JSON, and the path after N events
+#   - --view -> replay it in the window, speed events every frame
+
+import argparse
+import itertools
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+
+from .pathfile import DIRECTION_INDEX, pack, spots, unpack
+from .solver import Solution, make_walker
+from .strategies import EXHAUSTED, FINISHED, POP, PUSH
+from .stream import head_of
+
+MAGIC = b"SAWT"
+VERSION = 1
+HEADER = struct.Struct("<4sB3xIIiI")
+LENGTH = struct.Struct("<I")
+INTERVAL = 1 << 16
+
+# the events besides the directions 0-3
+POP_EVENT = 4
+PAD = 15
+
+
+class TraceWriter:
+    def __init__(self, name, rows, cols, start, interval=INTERVAL):
+        if interval < 2 or interval % 2:
+            raise ValueError("the interval has to be an even number of at least 2")
+        if not (0 <= start[0] < cols and 0 <= start[1] < rows):
+            raise ValueError("start %r is outside of the %d x %d grid" % (tuple(start), rows, cols))
+        self.interval = interval
+        self.file = open(name, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, rows, cols, start[1] * cols + start[0], interval))
+        # the directions of the path now, for the keyframes
+        self.path = bytearray()
+        self.block = bytearray()
+        self.low = None
+        self.events = 0
+
+    def add(self, event):
+        if self.events % self.interval == 0:
+            self.flush()
+            self.file.write(LENGTH.pack(len(self.path) + 1))
+            self.file.write(pack(self.path))
+        if self.low is None:
+            self.low = event
+        else:
+            self.block.append(self.low | event << 4)
+            self.low = None
+        self.events += 1
+
+    def push(self, d):
+        self.add(d)
+        self.path.append(d)
+
+    def pop(self):
+        if not self.path:
+            raise ValueError("the first spot of the path can't be popped")
+        self.add(POP_EVENT)
+        self.path.pop()
+
+    def flush(self):
+        if self.low is not None:
+            self.block.append(self.low | PAD << 4)
+            self.low = None
+        self.file.write(self.block)
+        self.block = bytearray()
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TraceReader:
+    def __init__(self, name):
+        with open(name, "rb") as file:
+            data = file.read(HEADER.size)
+            if len(data) != HEADER.size:
+                raise ValueError("%s is too short to be a trace" % name)
+            magic, version, self.rows, self.cols, start, self.interval = HEADER.unpack(data)
+            if magic != MAGIC:
+                raise ValueError("%s is not a trace" % name)
+            if version != VERSION:
+                raise ValueError("%s has version %d, only version %d can be read" % (name, version, VERSION))
+            length = os.path.getsize(name)
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if length > HEADER.size else None
+        self.start = (start % self.cols, start // self.cols)
+
+        # (offset of the keyframe, number of spots of its path, offset of the events) of every block
+        self.blocks = []
+        self.count = 0
+        offset = HEADER.size
+        while offset + LENGTH.size <= length:
+            spots_in_path = LENGTH.unpack_from(self.map, offset)[0]
+            events_offset = offset + LENGTH.size + (spots_in_path + 2) // 4
+            size = min(self.interval // 2, length - events_offset)
+            if size < 0:
+                break
+            self.blocks.append((offset, spots_in_path, events_offset))
+            events = 2 * size
+            # only the last block can have a padded half byte
+            if size and self.map[events_offset + size - 1] >> 4 == PAD:
+                events -= 1
+            self.count += events
+            if events < self.interval:
+                # the last block (or cut off by a crash)
+                break
+            offset = events_offset + size
+
+    def __len__(self):
+        return self.count
+
+    def keyframe(self, block):
+        offset, spots_in_path, _ = self.blocks[block]
+        start = offset + LENGTH.size
+        return unpack(self.map[start:start + (spots_in_path + 2) // 4], spots_in_path - 1)
+
+    def events(self, n=0):
+        if not 0 <= n <= self.count:
+            raise IndexError("event index out of range")
+        interval = self.interval
+        block, skip = divmod(n, interval)
+        remaining = self.count - n
+        while remaining > 0:
+            events_offset = self.blocks[block][2]
+            data = self.map[events_offset + skip // 2:events_offset + interval // 2]
+            first = skip % 2
+            for byte in data:
+                for event in (byte & 15, byte >> 4)[first:]:
+                    if not remaining:
+                        return
+                    yield event
+                    remaining -= 1
+                first = 0
+            block += 1
+            skip = 0
+
+    def directions(self, n):
+        if not 0 <= n <= self.count:
+            raise IndexError("event index out of range")
+        if not self.blocks:
+            return []
+        # after the last event of a full block the next block hasn't been started
+        block = min(n // self.interval, len(self.blocks) - 1)
+        path = self.keyframe(block)
+        for event in itertools.islice(self.events(block * self.interval), n - block * self.interval):
+            if event == POP_EVENT:
+                path.pop()
+            else:
+                path.append(event)
+        return path
+
+    def spots(self, n):
+        return spots(self.start, self.directions(n))
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def record(walker, name, interval=INTERVAL):
+    if not hasattr(walker, "step"):
+        raise ValueError("only a walker with step() can be recorded (the array, basic and spot strategies)")
+    cells = walker.cells()
+    with TraceWriter(name, walker.rows, walker.cols, cells[0], interval) as writer:
+        for a, b in zip(cells, cells[1:]):
+            writer.push(DIRECTION_INDEX[(b[0] - a[0], b[1] - a[1])])
+
+        step, push, pop = walker.step, writer.push, writer.pop
+        if hasattr(walker, "state"):
+            # the direction of a push is the one its spot before took
+            state = walker.state
+            path, direction = state.path, state.direction
+            while True:
+                event = step()
+                if event == PUSH:
+                    push(direction[path[-2]])
+                elif event == POP:
+                    pop()
+                elif event == FINISHED or event == EXHAUSTED:
+                    return event == FINISHED
+        else:
+            head = head_of(walker)
+            last = head()
+            while True:
+                event = step()
+                if event == PUSH:
+                    spot = head()
+                    push(DIRECTION_INDEX[(spot[0] - last[0], spot[1] - last[1])])
+                    last = spot
+                elif event == POP:
+                    pop()
+                    last = head()
+                elif event == FINISHED or event == EXHAUSTED:
+                    return event == FINISHED
+
+
+def solve(name, rows, cols, start=None, seed=None, strategy="array", interval=INTERVAL, **options):
+    walker, start = make_walker(rows, cols, start, seed, strategy, **options)
+
+    started = time.perf_counter()
+    found = record(walker, name, interval)
+    seconds = time.perf_counter() - started
+
+    path = walker.cells() if found else None
+    end = options.get("end")
+    end = None if end is None else tuple(end)
+    return Solution(rows, cols, start, seed, strategy, path, walker.nodes, walker.backtracks, seconds,
+                    dict(getattr(walker, "pruned", {})), end)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m saw.trace", description="Show a trace of a search.")
+    parser.add_argument("file")
+    parser.add_argument("--step", type=int, help="print the path after this many events")
+    parser.add_argument("--view", action="store_true", help="replay the trace in a pygame window")
+    parser.add_argument("--speed", type=int, default=1, help="events per frame of the replay")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        with TraceReader(args.file) as reader:
+            print(json.dumps({
+                "rows": reader.rows,
+                "cols": reader.cols,
+                "start": list(reader.start),
+                "interval": reader.interval,
+                "events": len(reader),
+                "keyframes": len(reader.blocks),
+            }))
+            if args.step is not None:
+                print(json.dumps([list(spot) for spot in reader.spots(args.step)]))
+    except (OSError, ValueError, IndexError) as error:
+        print("error: %s" % error, file=sys.stderr)
+        return 2
+    if args.view:
+        from .viewer import replay
+        replay(args.file, speed=max(1, args.speed))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
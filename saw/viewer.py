@@ -0,0 +1,447 @@
+# The pygame window of the scripts on top of the engine.
+# pygame is only imported here, the rest of the engine works without it.
+#
+# view(rows, cols, start=None, seed=None, strategy="array", grid_size=40, fps=10, fast=False, **options)
+#   - options -> the options of the strategy, like prune=(...) or end=(x, y) (see solver.py), it
+#     raises ValueError like solve() does before the window is opened
+#   - takes one step of the walker every frame, like V1 and V2 did
+#   - the recursive strategy has no steps, so its whole search runs before drawing (like V3)
+#   - press SPACE to pause, or to start another path when it is finished
+#   - + and - zoom, the arrow keys move around a grid that is bigger than the window
+#
+# With fast=True the search doesn't wait for the frames, the window is still drawn fps times a
+# second but the search runs as fast as it can in between:
+#   - the array strategy runs in slices, walker.run(chunk, chunk) stops after chunk backtracks or
+#     chunk nodes and is continued in the next slice, chunk grows or shrinks so a slice takes about
+#     BUSY of a frame (a search that never backtracks is stopped by the nodes)
+#   - a frame only draws the spots of the array walker's path after walker.low (see walker.py),
+#     the spots that changed since the last frame, so it doesn't cost as much as the whole path
+#   - the basic and spot strategies take as many steps as fit into BUSY of a frame
+#   - the recursive and iterative strategies can't be stopped in the middle, so they run in a
+#     thread and the frames draw whatever their path is at the time (the iterative one only has
+#     its path when it is finished), SPACE can't stop them either
+# The caption shows how many spots per second have been added to the path.
+#
+# replay(name, grid_size=40, fps=30, speed=1) shows a trace (see trace.py) instead of searching
+#   - speed events every frame, ] and [ double and halve it
+#   - SPACE pauses, . and , go one event forward and back
+#   - Home and End go to the first and the last event, 0-9 go to 0% - 90% of the trace and
+#     PageUp / PageDown go 10% back / forward. A jump starts from the keyframe before it, so it
+#     never replays more than the interval of the trace
+
+import itertools
+import threading
+import time
+
+import pygame
+
+from .grid import DIRECTIONS
+from .solver import make_walker
+from .strategies import EXHAUSTED, FINISHED, REJECT
+from .trace import POP_EVENT, TraceReader
+
+# the part of a frame that a fast search can use, the rest is for drawing and events
+BUSY = 0.8
+
+# the window is never bigger than this, the grid can be zoomed and moved around in it
+MAX_WIDTH = 1200
+MAX_HEIGHT = 800
+
+# Used colors
+PATH_COLOR = (50, 100, 250)
+BG_COLOR = (255, 255, 255)
+GRID_COLOR = (200, 200, 200)
+DIRECTION_COLOR = (200, 100, 100)
+
+
+# Renderer(screen, rows, cols, grid_size) - draws the grid and the path into screen
+#   - renderer.update(cells, rejected=None) -> draws the path (and the rejected direction of the
+#     spot at its end), only the cells that changed since the last update are drawn again
+#   - renderer.change(same, tail, rejected=None) -> the same for the path that is the first `same`
+#     spots of the one that was drawn and then tail, without looking at the rest of the path
+#   - renderer.zoom(factor), renderer.pan(dx, dy) -> change the part of the grid that is shown
+#
+# The grid lines are drawn once on a background surface. A spot of the path only draws inside its
+# own cell: its circle and half of the segments to the spots before and after it (the segment
+# between two spots is inside their two cells). So the path that was drawn and the new one are
+# compared, the cells after the part they have in common (and the last cell of that part, whose
+# segment has changed) are copied from the background and drawn again, and only those rects are
+# sent to pygame.display.update. Cells outside of the window are not drawn at all.
+class Renderer:
+    def __init__(self, screen, rows, cols, grid_size):
+        self.screen = screen
+        self.rows = rows
+        self.cols = cols
+        self.grid_size = grid_size
+        self.width, self.height = screen.get_size()
+        # how many pixels of the grid are left of / above the window
+        self.offset_x = self.offset_y = 0
+
+        self.drawn = []
+        self.index = {}
+        self.marked = []
+        self.background = None
+
+    def zoom(self, factor):
+        grid_size = max(2, min(200, int(self.grid_size * factor)))
+        if grid_size == self.grid_size:
+            return
+        # keep the middle of the window where it is
+        middle_x = (self.offset_x + self.width / 2) / self.grid_size
+        middle_y = (self.offset_y + self.height / 2) / self.grid_size
+        self.grid_size = grid_size
+        self.offset_x = int(middle_x * grid_size - self.width / 2)
+        self.offset_y = int(middle_y * grid_size - self.height / 2)
+        self.clamp()
+
+    def pan(self, dx, dy):
+        self.offset_x += dx
+        self.offset_y += dy
+        self.clamp()
+
+    def clamp(self):
+        self.offset_x = max(0, min(self.offset_x, self.cols * self.grid_size - self.width))
+        self.offset_y = max(0, min(self.offset_y, self.rows * self.grid_size - self.height))
+        self.background = None
+
+    def center(self, cell):
+        return ((cell[0] + 0.5) * self.grid_size - self.offset_x, (cell[1] + 0.5) * self.grid_size - self.offset_y)
+
+    def rect(self, cell):
+        grid_size = self.grid_size
+        return pygame.Rect(cell[0] * grid_size - self.offset_x, cell[1] * grid_size - self.offset_y,
+                           grid_size, grid_size)
+
+    def visible(self, cell):
+        grid_size = self.grid_size
+        x, y = cell[0] * grid_size - self.offset_x, cell[1] * grid_size - self.offset_y
+        return -grid_size < x < self.width and -grid_size < y < self.height
+
+    def make_background(self):
+        background = pygame.Surface((self.width, self.height))
+        background.fill(BG_COLOR)
+        grid_size = self.grid_size
+        # Draw grid lines
+        for r in range(self.offset_y // grid_size + 1, min(self.rows, (self.offset_y + self.height) // grid_size + 1)):
+            y = r * grid_size - self.offset_y
+            pygame.draw.line(background, GRID_COLOR, [0, y], [self.width, y])
+        for c in range(self.offset_x // grid_size + 1, min(self.cols, (self.offset_x + self.width) // grid_size + 1)):
+            x = c * grid_size - self.offset_x
+            pygame.draw.line(background, GRID_COLOR, [x, 0], [x, self.height])
+        return background
+
+    # the circle of the i-th spot of cells and its segments
+    def draw_spot(self, cells, i):
+        point = self.center(cells[i])
+        pygame.draw.circle(self.screen, PATH_COLOR, point, self.grid_size // 3)
+        if i:
+            pygame.draw.line(self.screen, PATH_COLOR, self.center(cells[i - 1]), point, 2)
+        if i + 1 < len(cells):
+            pygame.draw.line(self.screen, PATH_COLOR, point, self.center(cells[i + 1]), 2)
+
+    def update(self, cells, rejected=None):
+        same = common_prefix(self.drawn, cells)
+        self.change(same, cells[same:], rejected)
+
+    def change(self, same, tail, rejected=None):
+        drawn, index = self.drawn, self.index
+        changed = set(drawn[max(0, same - 1):])
+        for cell in drawn[same:]:
+            del index[cell]
+        del drawn[same:]
+        drawn.extend(tail)
+        for i in range(same, len(drawn)):
+            index[drawn[i]] = i
+
+        if self.background is None:
+            self.background = self.make_background()
+            self.screen.blit(self.background, (0, 0))
+            for i, cell in enumerate(drawn):
+                if self.visible(cell):
+                    self.draw_spot(drawn, i)
+            dirty = [self.screen.get_rect()]
+        else:
+            changed.update(drawn[max(0, same - 1):])
+            changed.update(self.marked)
+            dirty = [self.rect(cell) for cell in changed if self.visible(cell)]
+            for rect in dirty:
+                self.screen.blit(self.background, rect, rect)
+            for cell in changed:
+                i = index.get(cell)
+                if i is not None and self.visible(cell):
+                    self.draw_spot(drawn, i)
+
+        self.marked = []
+        if rejected is not None and drawn:
+            # Display the wrong direction that it wanted to go
+            head = drawn[-1]
+            pygame.draw.line(self.screen, DIRECTION_COLOR, self.center(head), self.center(rejected), 1)
+            pygame.draw.circle(self.screen, DIRECTION_COLOR, self.center(rejected), max(1, min(5, self.grid_size // 4)))
+            self.marked = [head, rejected]
+            dirty.extend(self.rect(cell) for cell in self.marked)
+        pygame.display.update(dirty)
+
+
+# how many spots at the start of a and b are the same, the path only changes at its end,
+# so this usually only looks at the last few spots
+def common_prefix(a, b):
+    same = min(len(a), len(b))
+    while same and a[same - 1] != b[same - 1]:
+        same -= 1
+    if a[:same] == b[:same]:
+        return same
+    return next((i for i, (p, q) in enumerate(zip(a, b)) if p != q), same)
+
+
+def open_window(rows, cols, grid_size):
+    pygame.init()
+    pygame.mixer.quit()
+    screen = pygame.display.set_mode((min(cols * grid_size, MAX_WIDTH), min(rows * grid_size, MAX_HEIGHT)))
+    pygame.display.set_caption("Self-Avoiding Walk")
+    return screen, Renderer(screen, rows, cols, grid_size)
+
+
+# + and - zoom, the arrows move the part of the grid that is shown
+def move_view(renderer, key):
+    step = max(renderer.width, renderer.height) // 4
+    if key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+        renderer.zoom(2)
+    elif key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+        renderer.zoom(0.5)
+    elif key == pygame.K_LEFT:
+        renderer.pan(-step, 0)
+    elif key == pygame.K_RIGHT:
+        renderer.pan(step, 0)
+    elif key == pygame.K_UP:
+        renderer.pan(0, -step)
+    elif key == pygame.K_DOWN:
+        renderer.pan(0, step)
+
+
+# a search that runs between the frames, finished is True when it has found a path or there is none
+class Search:
+    def __init__(self, walker, strategy):
+        self.walker = walker
+        self.strategy = strategy
+        self.finished = False
+        self.chunk = 16
+        self.thread = None
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+        # how many spots of the walker's path the renderer has
+        self.shown = 0
+
+        if not hasattr(walker, "step"):
+            self.thread = threading.Thread(target=self.run_thread, daemon=True)
+            self.thread.start()
+
+    def run_thread(self):
+        self.walker.run()
+        self.seconds = time.perf_counter() - self.started
+        self.finished = True
+
+    # searches for about seconds, unless it is in a thread
+    def run_slice(self, seconds):
+        if self.thread is not None or self.finished:
+            return
+        walker = self.walker
+        started = time.perf_counter()
+        deadline = started + seconds
+
+        if self.strategy == "array":
+            while True:
+                before = time.perf_counter()
+                if walker.run(self.chunk, self.chunk) is not None:
+                    self.finished = True
+                    break
+                now = time.perf_counter()
+                # about 100 chunks per slice, so the last one doesn't go far past the deadline
+                if now - before < seconds / 200:
+                    self.chunk *= 2
+                elif now - before > seconds / 50 and self.chunk > 1:
+                    self.chunk //= 2
+                if now >= deadline:
+                    break
+        else:
+            step = walker.step
+            while not self.finished and time.perf_counter() < deadline:
+                for _ in range(256):
+                    if step() in (FINISHED, EXHAUSTED):
+                        self.finished = True
+                        break
+        self.seconds += time.perf_counter() - started
+
+    # draws the path, for the array walker only the spots after the part that is still the same
+    def draw(self, renderer):
+        walker = self.walker
+        if not hasattr(walker, "low"):
+            renderer.update(walker.cells())
+            return
+        path = walker.state.path
+        same = min(walker.low, self.shown, len(renderer.drawn))
+        cols = walker.cols
+        renderer.change(same, [(cell % cols, cell // cols) for cell in path[same:]])
+        walker.low = self.shown = len(path)
+
+    def nodes_per_second(self):
+        seconds = time.perf_counter() - self.started if self.thread is not None and not self.finished else self.seconds
+        return self.walker.nodes / seconds if seconds else 0.0
+
+
+def view(rows, cols, start=None, seed=None, strategy="array", grid_size=40, fps=10, fast=False, **options):
+    if fast:
+        view_fast(rows, cols, start, seed, strategy, grid_size, fps, options)
+        return
+
+    walker = make_walker(rows, cols, start, seed, strategy, **options)[0]
+    screen, renderer = open_window(rows, cols, grid_size)
+    clock = pygame.time.Clock()
+
+    done = False
+    finished = False
+
+    while not done:
+        clock.tick(fps)
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                done = True
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
+                    finished = not finished
+                    # a new random start (and new random luck) for the next path
+                    walker = make_walker(rows, cols, start, None, strategy, **options)[0]
+                else:
+                    move_view(renderer, event.key)
+
+        if finished:
+            if renderer.background is None:
+                renderer.change(len(renderer.drawn), [])
+            continue
+
+        rejected = None
+        if not hasattr(walker, "step"):
+            walker.run()
+            finished = True
+        else:
+            event = walker.step()
+            if event == REJECT:
+                rejected = walker.rejected
+            elif event in (FINISHED, EXHAUSTED):
+                finished = True
+        renderer.update(walker.cells(), rejected)
+
+    pygame.quit()
+
+
+def view_fast(rows, cols, start, seed, strategy, grid_size, fps, options):
+    search = Search(make_walker(rows, cols, start, seed, strategy, **options)[0], strategy)
+    screen, renderer = open_window(rows, cols, grid_size)
+    clock = pygame.time.Clock()
+
+    paused = False
+    done = False
+
+    while not done:
+        clock.tick(fps)
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                done = True
+            if event.type == pygame.KEYDOWN:
+                if event.key != pygame.K_SPACE:
+                    move_view(renderer, event.key)
+                elif search.finished:
+                    # a new random start (and new random luck) for the next path
+                    search = Search(make_walker(rows, cols, start, None, strategy, **options)[0], strategy)
+                    paused = False
+                elif search.thread is None:
+                    paused = not paused
+
+        if not paused:
+            search.run_slice(BUSY / fps)
+
+        search.draw(renderer)
+        pygame.display.set_caption("Self-Avoiding Walk - %d nodes, %.0f nodes/s%s" % (
+            search.walker.nodes, search.nodes_per_second(), " - paused" if paused else ""))
+
+    pygame.quit()
+
+
+# the event that a key goes to in a replay, or None
+def replay_target(key, step, count):
+    if key == pygame.K_PERIOD:
+        return step + 1
+    if key == pygame.K_COMMA:
+        return step - 1
+    if key == pygame.K_HOME:
+        return 0
+    if key == pygame.K_END:
+        return count
+    if key == pygame.K_PAGEUP:
+        return step - count // 10
+    if key == pygame.K_PAGEDOWN:
+        return step + count // 10
+    if pygame.K_0 <= key <= pygame.K_9:
+        return count * (key - pygame.K_0) // 10
+    return None
+
+
+def replay(name, grid_size=40, fps=30, speed=1):
+    with TraceReader(name) as reader:
+        screen, renderer = open_window(reader.rows, reader.cols, grid_size)
+        clock = pygame.time.Clock()
+        count = len(reader)
+
+        step = 0
+        cells = [reader.start]
+        events = reader.events(0)
+        paused = False
+        done = False
+
+        while not done:
+            clock.tick(fps)
+
+            target = step
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    done = True
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_SPACE:
+                        paused = not paused
+                    elif event.key == pygame.K_RIGHTBRACKET:
+                        speed *= 2
+                    elif event.key == pygame.K_LEFTBRACKET:
+                        speed = max(1, speed // 2)
+                    else:
+                        jump = replay_target(event.key, step, count)
+                        if jump is None:
+                            move_view(renderer, event.key)
+                        else:
+                            target = jump
+                            paused = paused or event.key in (pygame.K_PERIOD, pygame.K_COMMA)
+            if not paused and target == step:
+                target = step + speed
+            target = max(0, min(target, count))
+
+            if step < target <= step + reader.interval:
+                # play the events in between
+                for code in itertools.islice(events, target - step):
+                    if code == POP_EVENT:
+                        cells.pop()
+                    else:
+                        x, y = cells[-1]
+                        dx, dy = DIRECTIONS[code]
+                        cells.append((x + dx, y + dy))
+                step = target
+            elif target != step:
+                # start from the keyframe before target
+                step = target
+                cells = reader.spots(step)
+                events = reader.events(step)
+
+            renderer.update(cells)
+            pygame.display.set_caption("Self-Avoiding Walk - replay, event %d of %d, %d per frame%s" % (
+                step, count, speed, " - paused" if paused else ""))
+
+    pygame.quit()
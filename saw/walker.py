@@ -0,0 +1,500 @@
+# Walker(rows, cols, start, rng, prune=(), order=RANDOM, lookahead=0, end=None, symmetries=(), stats=None)
+#   - the V1/V2/V3 search on a GridState
+#
+# It has the same attributes and methods as the other strategies:
+#   - walker.step() -> one step of the V1/V2 main loop, returns PUSH, REJECT, POP, FINISHED or EXHAUSTED
+#   - walker.run() -> the whole search like V3, without recursion
+#   - walker.cells(), walker.nodes, walker.backtracks, walker.rejected
+#
+# walker.run(max_backtracks, max_nodes) stops after that many more backtracks or that many more
+# nodes (spots added to the path) and returns None, calling it again continues the search from where
+# it stopped. A search that hardly ever backtracks (warnsdorff with pruning on a big grid) is only
+# stopped by max_nodes, so that is the one to use for slices of a given length.
+#
+# walker.low -> the shortest the path has been since it was last set (step() and run() only lower
+# it), the first low spots of the path haven't changed since then. The viewer sets it to the length
+# of the path after it has drawn it, so it only has to look at the spots after it.
+#
+# end -> (grid_x, grid_y) of the spot where the path has to end, a move to it is rejected
+#        until it is the last free spot (feasibility.has_path tells if such a path exists)
+#
+# symmetries -> cell id permutations of symmetries of the grid that keep start (and end) where they
+#               are (see symmetry.py). A path and its images are the same path turned or mirrored,
+#               so only the one with the smallest cell ids (compared spot by spot) is searched: a move
+#               is rejected (as SYMMETRY in walker.pruned) when the image of the path is smaller
+#
+# stats -> a stats.SearchStats that counts every step (and calls its hook), run() then uses a
+#          slower loop that does the same search. Without it nothing is counted.
+#
+# A step only reads and writes the flat buffers of the state:
+#   - checking if a spot is in the path is visited[cell], not a search through the path
+#   - the options of a spot are a 4-bit mask and the reverse direction is d ^ 2,
+#     so nothing is allocated per step
+#   - directions that go outside of the grid are never in the options of a spot,
+#     so the only rejected directions are the ones that go to a spot in the path
+#   - when a direction is chosen it is removed from the options straight away,
+#     so stepping back doesn't have to remove it from the options of the previous spot
+#
+# Pruning
+# The scripts only step back when a spot is stuck, but a move can make the grid impossible
+# to fill long before that and then everything after it is wasted. prune is a list of rules
+# that are checked after every move, a move that breaks one of them is rejected right away
+# (walker.pruned counts how many moves each rule has rejected):
+#   - DEAD_END -> a free spot with no free neighbour can't be reached (unless it is the last one),
+#                 and a free spot with one free neighbour that is not next to the last spot of
+#                 the path has to be where the path ends, so there can't be two of them
+#                 (or any other than end, if there is one)
+#   - CONNECTIVITY -> the free spots have to stay connected, if the spot we just moved to has
+#                     more than one free neighbour we flood fill from one of them until all of the
+#                     others are found (usually after a few spots), or the fill runs out
+#   - PARITY -> the checkerboard argument of the README on the free spots: every step changes
+#               the colour, so the number of free spots of each colour has to match the number
+#               of steps left, and a spot that has to be the end of the path must have the colour
+#               of the last step
+#
+# Move order
+#   - RANDOM -> choose one of the options randomly, like the scripts
+#   - WARNSDORFF -> go to the free neighbour with the fewest free neighbours of its own first
+#                   (the spots that are easy to cut off are filled before they are cut off),
+#                   ties are broken by the rng. With lookahead > 0 ties are broken by the fewest
+#                   free neighbours of the best spot after it, up to lookahead moves ahead.
+#                   It uses the free neighbour counts of the state, which push and pop update.
+
+from array import array
+
+from .state import MASK_DIRECTIONS, GridState
+from .strategies import EXHAUSTED, FINISHED, POP, PUSH, REJECT
+
+DEAD_END = "dead-end"
+CONNECTIVITY = "connectivity"
+PARITY = "parity"
+PRUNING_RULES = (DEAD_END, CONNECTIVITY, PARITY)
+SYMMETRY = "symmetry"
+
+RANDOM = "random"
+WARNSDORFF = "warnsdorff"
+MOVE_ORDERS = (RANDOM, WARNSDORFF)
+
+
+class Walker:
+    def __init__(self, rows, cols, start, rng, prune=(), order=RANDOM, lookahead=0, end=None, symmetries=(),
+                 stats=None):
+        self.rows = rows
+        self.cols = cols
+        self.rng = rng
+
+        for rule in prune:
+            if rule not in PRUNING_RULES:
+                raise ValueError("unknown pruning rule %r, choose from %s" % (rule, ", ".join(PRUNING_RULES)))
+        self.prune = tuple(rule for rule in PRUNING_RULES if rule in prune)
+
+        # how far (in spots) the path and each of its images are the same
+        self.symmetries = [array("i", image) for image in symmetries]
+        self.equal = [1] * len(self.symmetries)
+        start_cell = start[1] * cols + start[0]
+        for image in self.symmetries:
+            if len(image) != rows * cols or image[start_cell] != start_cell:
+                raise ValueError("symmetries have to be permutations of the cells that keep start where it is")
+        if self.symmetries:
+            self.prune += (SYMMETRY,)
+        self.pruned = {rule: 0 for rule in self.prune}
+
+        if order not in MOVE_ORDERS:
+            raise ValueError("unknown move order %r, choose from %s" % (order, ", ".join(MOVE_ORDERS)))
+        if lookahead < 0:
+            raise ValueError("lookahead can't be negative")
+        self.order = order
+        self.lookahead = lookahead
+
+        self.state = GridState(rows, cols)
+        if self.prune or order != RANDOM:
+            self.state.track_degrees()
+            self.seen = array("I", bytes(4 * self.state.size))
+            self.generation = 0
+        self.state.push(self.state.cell(*start))
+        self.end = -1 if end is None else self.state.cell(*end)
+
+        self.rejected_cell = -1
+        self.nodes = 1
+        self.backtracks = 0
+        self.low = len(self.state.path)
+
+        self.stats = stats
+        if stats is not None:
+            stats.attach(self)
+
+    @property
+    def rejected(self):
+        return self.state.position(self.rejected_cell)
+
+    def cells(self):
+        return self.state.cells()
+
+    def step(self):
+        if self.stats is None:
+            return self._step()
+        path = self.state.path
+        head = path[-1]
+        event = self._step()
+        if event == PUSH:
+            self.stats.record(event, path[-1], len(path))
+        elif event == REJECT:
+            self.stats.record(event, self.rejected_cell, len(path))
+        elif event == POP:
+            self.stats.record(event, head, len(path))
+        return event
+
+    def _step(self):
+        state = self.state
+        path, options = state.path, state.options
+
+        # Finished?
+        if len(path) == state.size:
+            return FINISHED
+
+        # Stuck? - step back, or give up if the first spot is stuck
+        head = path[-1]
+        mask = options[head]
+        if not mask:
+            if len(path) == 1:
+                return EXHAUSTED
+            state.pop()
+            self.backtracks += 1
+            self.low = min(self.low, len(path))
+            return POP
+
+        # Continue. - choose a direction
+        if self.order == WARNSDORFF:
+            d = self.warnsdorff(head, mask)
+        else:
+            d = self.rng.choice(MASK_DIRECTIONS[mask])
+        options[head] = mask & ~(1 << d)
+        next_cell = state.neighbours[head * 4 + d]
+
+        if state.visited[next_cell] or (next_cell == self.end and len(path) + 1 < state.size):
+            self.rejected_cell = next_cell
+            return REJECT
+
+        state.push(next_cell, d)
+        if self.prune:
+            rule = self.broken_rule(next_cell)
+            if rule is not None:
+                state.pop()
+                self.pruned[rule] += 1
+                self.rejected_cell = next_cell
+                return REJECT
+
+        self.nodes += 1
+        return PUSH
+
+    def run(self, max_backtracks=None, max_nodes=None):
+        if self.stats is not None:
+            found = self._run_counted(max_backtracks, max_nodes)
+            self.stats.stop()
+            return found
+        if self.prune or self.order != RANDOM:
+            return self._run_tracked(max_backtracks, max_nodes)
+
+        state = self.state
+        path, options, visited = state.path, state.options, state.visited
+        direction, neighbours, inside = state.direction, state.neighbours, state.inside
+        total = state.size
+        choice = self.rng.choice
+        end = self.end
+
+        depth = len(path)
+        nodes, backtracks, low = self.nodes, self.backtracks, self.low
+        limit = -1 if max_backtracks is None else backtracks + max_backtracks
+        node_limit = -1 if max_nodes is None else nodes + max_nodes
+
+        while depth < total:
+            head = path[-1]
+            mask = options[head]
+
+            # stuck, go back and try another direction
+            if not mask:
+                if depth == 1:
+                    break
+                if backtracks == limit:
+                    self.nodes, self.backtracks, self.low = nodes, backtracks, low
+                    return None
+                path.pop()
+                visited[head] = 0
+                depth -= 1
+                backtracks += 1
+                if depth < low:
+                    low = depth
+                continue
+
+            d = choice(MASK_DIRECTIONS[mask])
+            options[head] = mask & ~(1 << d)
+            next_cell = neighbours[head * 4 + d]
+
+            if not visited[next_cell] and (next_cell != end or depth + 1 == total):
+                visited[next_cell] = 1
+                options[next_cell] = inside[next_cell] & ~(1 << (d ^ 2))
+                direction[head] = d
+                path.append(next_cell)
+                depth += 1
+                nodes += 1
+                if nodes == node_limit and depth < total:
+                    self.nodes, self.backtracks, self.low = nodes, backtracks, low
+                    return None
+
+        self.nodes, self.backtracks, self.low = nodes, backtracks, low
+        return depth == total
+
+    # run() with the free neighbour counts of the state, for pruning and move orders
+    def _run_tracked(self, max_backtracks, max_nodes):
+        state = self.state
+        path, options, visited, neighbours = state.path, state.options, state.visited, state.neighbours
+        total = state.size
+        choice = self.rng.choice
+        warnsdorff = self.warnsdorff if self.order == WARNSDORFF else None
+        broken_rule, pruned = (self.broken_rule if self.prune else None), self.pruned
+        end = self.end
+
+        depth = len(path)
+        nodes, backtracks, low = self.nodes, self.backtracks, self.low
+        limit = -1 if max_backtracks is None else backtracks + max_backtracks
+        node_limit = -1 if max_nodes is None else nodes + max_nodes
+
+        while depth < total:
+            head = path[-1]
+            mask = options[head]
+
+            if not mask:
+                if depth == 1:
+                    break
+                if backtracks == limit:
+                    self.nodes, self.backtracks, self.low = nodes, backtracks, low
+                    return None
+                state.pop()
+                depth -= 1
+                backtracks += 1
+                if depth < low:
+                    low = depth
+                continue
+
+            d = warnsdorff(head, mask) if warnsdorff else choice(MASK_DIRECTIONS[mask])
+            options[head] = mask & ~(1 << d)
+            next_cell = neighbours[head * 4 + d]
+            if visited[next_cell] or (next_cell == end and depth + 1 < total):
+                continue
+
+            state.push(next_cell, d)
+            if broken_rule:
+                rule = broken_rule(next_cell)
+                if rule is not None:
+                    state.pop()
+                    pruned[rule] += 1
+                    continue
+            depth += 1
+            nodes += 1
+            if nodes == node_limit and depth < total:
+                self.nodes, self.backtracks, self.low = nodes, backtracks, low
+                return None
+
+        self.nodes, self.backtracks, self.low = nodes, backtracks, low
+        return depth == total
+
+    # _run_tracked() that tells stats about every step, nodes and backtracks are kept up to date
+    # on the walker so the snapshots and the hook can read them
+    def _run_counted(self, max_backtracks, max_nodes):
+        state = self.state
+        path, options, visited, neighbours = state.path, state.options, state.visited, state.neighbours
+        total = state.size
+        choice = self.rng.choice
+        warnsdorff = self.warnsdorff if self.order == WARNSDORFF else None
+        broken_rule, pruned = (self.broken_rule if self.prune else None), self.pruned
+        end = self.end
+        record = self.stats.record
+
+        depth = len(path)
+        limit = -1 if max_backtracks is None else self.backtracks + max_backtracks
+        node_limit = -1 if max_nodes is None else self.nodes + max_nodes
+
+        while depth < total:
+            head = path[-1]
+            mask = options[head]
+
+            if not mask:
+                if depth == 1:
+                    break
+                if self.backtracks == limit:
+                    return None
+                state.pop()
+                depth -= 1
+                self.backtracks += 1
+                if depth < self.low:
+                    self.low = depth
+                record(POP, head, depth)
+                continue
+
+            d = warnsdorff(head, mask) if warnsdorff else choice(MASK_DIRECTIONS[mask])
+            options[head] = mask & ~(1 << d)
+            next_cell = neighbours[head * 4 + d]
+            if visited[next_cell] or (next_cell == end and depth + 1 < total):
+                record(REJECT, next_cell, depth)
+                continue
+
+            state.push(next_cell, d)
+            if broken_rule:
+                rule = broken_rule(next_cell)
+                if rule is not None:
+                    state.pop()
+                    pruned[rule] += 1
+                    record(REJECT, next_cell, depth)
+                    continue
+            depth += 1
+            self.nodes += 1
+            record(PUSH, next_cell, depth)
+            if self.nodes == node_limit and depth < total:
+                return None
+
+        return depth == total
+
+    # the direction in mask to the free neighbour of head with the fewest free neighbours,
+    # if every direction in mask goes to a spot in the path it returns one of them (to be rejected)
+    def warnsdorff(self, head, mask):
+        state = self.state
+        free, visited, neighbours = state.free, state.visited, state.neighbours
+        lookahead = self.lookahead
+
+        best, best_key, rejected = [], None, -1
+        base = head * 4
+        for d in MASK_DIRECTIONS[mask]:
+            neighbour = neighbours[base + d]
+            if visited[neighbour]:
+                rejected = d
+                continue
+            key = self.lookahead_key(neighbour, lookahead) if lookahead else free[neighbour]
+            if best_key is None or key < best_key:
+                best, best_key = [d], key
+            elif key == best_key:
+                best.append(d)
+
+        if not best:
+            return rejected
+        return best[0] if len(best) == 1 else self.rng.choice(best)
+
+    # (free neighbours of cell, free neighbours of the best spot after it, ...) for depth moves ahead
+    def lookahead_key(self, cell, depth):
+        state = self.state
+        visited, neighbours = state.visited, state.neighbours
+
+        base = cell * 4
+        after = [neighbours[base + d] for d in MASK_DIRECTIONS[state.inside[cell]] if not visited[neighbours[base + d]]]
+        if not depth or not after:
+            return (len(after),)
+
+        # pretend we have moved to cell while looking at the spots after it
+        visited[cell] = 1
+        best = min(self.lookahead_key(neighbour, depth - 1) for neighbour in after)
+        visited[cell] = 0
+        return (len(after),) + best
+
+    # returns the first pruning rule that the path (which has just moved to head) breaks, or None
+    def broken_rule(self, head):
+        state = self.state
+        if self.symmetries and not self.smallest(head):
+            return SYMMETRY
+        remaining = state.size - len(state.path)
+        if not remaining:
+            return None
+
+        free, visited, neighbours = state.free, state.visited, state.neighbours
+        targets = []
+        ones_next_to_head = 0
+        base = head * 4
+        for d in MASK_DIRECTIONS[state.inside[head]]:
+            neighbour = neighbours[base + d]
+            if not visited[neighbour]:
+                targets.append(neighbour)
+                if free[neighbour] == 1:
+                    ones_next_to_head += 1
+
+        ones = state.ones
+        if DEAD_END in self.prune:
+            if state.zeros and remaining > 1:
+                return DEAD_END
+            forced = ones[0] + ones[1] - ones_next_to_head
+            if self.end >= 0 and forced:
+                # the forced end has to be end, which is only forced if it is not next to head
+                end = self.end
+                if free[end] == 1 and end not in targets:
+                    forced -= 1
+                if forced:
+                    return DEAD_END
+            elif forced > 1:
+                return DEAD_END
+
+        if PARITY in self.prune:
+            # the next spot has colour c, the last one has colour c if an odd number of spots is left
+            c = state.colour[head] ^ 1
+            left = state.left
+            if remaining & 1:
+                if left[c] != left[c ^ 1] + 1 or ones[c ^ 1]:
+                    return PARITY
+            elif left[c] != left[c ^ 1] or ones[c] - ones_next_to_head:
+                return PARITY
+
+        if CONNECTIVITY in self.prune and len(targets) > 1 and not self.connected(targets):
+            return CONNECTIVITY
+        return None
+
+    # False if an image of the path (which has just moved to head) is smaller than the path.
+    # equal[i] can be longer than the path after stepping back, but the spots before head are the
+    # same as they were then, so they are still equal up to head
+    def smallest(self, head):
+        last = len(self.state.path) - 1
+        equal = self.equal
+        for i, image in enumerate(self.symmetries):
+            if equal[i] >= last:
+                other = image[head]
+                if other < head:
+                    return False
+                equal[i] = last + 1 if other == head else last
+        return True
+
+    # the free spots next to the spot we just moved to are still connected if a flood fill from one
+    # of them finds all of the others. If they are not, one of the fills runs out of free spots, and
+    # that can take very long when it is on the big side of the cut, so the fills take turns with a
+    # limit that grows and the small side is always found first
+    def connected(self, targets):
+        limit = 16
+        while True:
+            for start in targets:
+                found = self.flood_fill(start, targets, limit)
+                if found is not None:
+                    return found
+            limit *= 4
+
+    # True if every one of targets is found, False if the fill ran out of spots, None after limit spots
+    def flood_fill(self, start, targets, limit):
+        state = self.state
+        visited, neighbours, inside = state.visited, state.neighbours, state.inside
+        seen = self.seen
+        self.generation += 1
+        generation = self.generation
+
+        seen[start] = generation
+        missing = len(targets) - 1
+        queue = [start]
+        i = 0
+        while i < len(queue):
+            if i == limit:
+                return None
+            cell = queue[i]
+            i += 1
+            base = cell * 4
+            for d in MASK_DIRECTIONS[inside[cell]]:
+                neighbour = neighbours[base + d]
+                if not visited[neighbour] and seen[neighbour] != generation:
+                    seen[neighbour] = generation
+                    if neighbour in targets:
+                        missing -= 1
+                        if not missing:
+                            return True
+                    queue.append(neighbour)
+        return False